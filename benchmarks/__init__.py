@@ -0,0 +1 @@
+"""Standalone benchmarks for the corpus pipeline (run with `python -m benchmarks.<name>`)."""
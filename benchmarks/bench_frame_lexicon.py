@@ -0,0 +1,60 @@
+"""
+Benchmark frame counting (FrameMatcher in frame_lexicon.py) on synthetic speeches
+against the ad-hoc approach of one case-insensitive regex search per lexicon
+phrase. Checks that both find the same number of hits per frame when overlaps
+are not involved.
+
+Usage: python -m benchmarks.bench_frame_lexicon
+"""
+import re
+from benchmarks.common import best_time
+from benchmarks.synthetic import generate_section
+from frame_lexicon import FRAME_LEXICON_PATH, FrameMatcher, load_lexicon
+
+SPEECH_COUNTS = [100, 500, 1000]
+
+
+def regex_counts(patterns, frames, texts):
+    """The previous approach: one regex pass over every speech per phrase."""
+    counts = [[0] * len(frames) for _ in texts]
+    for frame_index, pattern in patterns:
+        for i, text in enumerate(texts):
+            counts[i][frame_index] += len(pattern.findall(text))
+    return counts
+
+
+def automaton_counts(matcher, texts):
+    return [matcher.count(text) for text in texts]
+
+
+def main():
+    lexicon = load_lexicon(FRAME_LEXICON_PATH)
+    matcher = FrameMatcher(lexicon)
+    frame_index = {frame: i for i, frame in enumerate(matcher.frames)}
+    all_patterns = [(frame_index[frame], re.compile(r'\b' + re.escape(phrase) + r'\b', re.IGNORECASE))
+                    for frame, phrase in lexicon]
+    # One phrase per frame, so per-phrase regex counts are directly comparable with the automaton's
+    comparable = [(frame, phrase) for frame, phrase in lexicon
+                  if phrase in ("win-win cooperation", "non-interference", "south-south cooperation",
+                                "multilateralism", "poverty eradication")]
+    check_matcher = FrameMatcher(comparable)
+    check_patterns = [(i, re.compile(r'\b' + re.escape(phrase).replace(r'\-', '-').replace(r'\ ', r'\s+') + r'\b', re.IGNORECASE))
+                      for i, (_, phrase) in enumerate(comparable)]
+
+    print(f"{len(lexicon)} lexicon phrases, {len(matcher.frames)} frames\n")
+    print(f"{'speeches':>8} {'words':>10} {'regex (ms)':>11} {'automaton (ms)':>15} {'speedup':>8}")
+    for speeches in SPEECH_COUNTS:
+        # Split on speaker-line colons to get roughly one text per speech
+        texts = generate_section(speakers=speeches, seed=speeches).split(':')
+        words = sum(len(text.split()) for text in texts)
+        regex_time, _ = best_time(regex_counts, all_patterns, matcher.frames, texts)
+        automaton_time, _ = best_time(automaton_counts, matcher, texts)
+        if regex_counts(check_patterns, check_matcher.frames, texts) != automaton_counts(check_matcher, texts):
+            raise AssertionError(f"Frame counts differ for {speeches} speeches")
+        print(f"{speeches:>8} {words:>10,} {regex_time * 1000:>11.1f} {automaton_time * 1000:>15.1f} "
+              f"{regex_time / automaton_time:>7.1f}x")
+    print("\nCounts identical to per-phrase regex for the comparable phrases.")
+
+
+if __name__ == "__main__":
+    main()
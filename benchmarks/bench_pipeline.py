@@ -0,0 +1,113 @@
+"""
+Benchmark each stage of the corpus pipeline on synthetic UN meeting records
+(see synthetic.py), without the real corpus:
+  - speech_pattern: SPEECH_PATTERN.finditer over a General Debate section
+  - find_speaker_lines: the prefiltered strict + loose speaker-line search
+  - extract_meeting: full extraction of one meeting's text
+  - split_texts: split-txt.py end to end on a synthetic full-text corpus,
+    rebuilding everything (force) and then as an incremental re-run
+  - convert_pdfs_to_text: pdf-to-full-txt.py on synthetic PDFs
+
+Results are printed and saved as JSON (benchmarks/results/pipeline-<commit>.json
+by default); compare two runs with `python -m benchmarks.compare OLD NEW`.
+
+Usage: python -m benchmarks.bench_pipeline [--sessions 4] [--meetings 10] [--pdfs 3] [--skip-convert]
+"""
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+from benchmarks.common import best_time, save_results
+from benchmarks.synthetic import generate_meeting, generate_section, write_corpus, write_meeting_pdf
+from script_loader import load_script
+
+split_txt = load_script('split-txt.py')
+
+# A full General Debate session has roughly 190 speakers
+SPEAKER_COUNTS = [50, 190, 500]
+
+
+@contextlib.contextmanager
+def quiet_in(directory):
+    """Run a pipeline script in directory (its paths are relative), hiding its output and progress bars."""
+    cwd = os.getcwd()
+    os.chdir(directory)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            yield
+    finally:
+        os.chdir(cwd)
+
+
+def bench_patterns(repeat):
+    results = []
+    for speakers in SPEAKER_COUNTS:
+        section = generate_section(speakers=speakers, seed=speakers)
+        meeting = generate_meeting(speakers=speakers, seed=speakers)
+        params = {'speakers': speakers, 'chars': len(section)}
+        seconds, matches = best_time(lambda: list(split_txt.SPEECH_PATTERN.finditer(section)), repeat=repeat)
+        results.append({'name': 'speech_pattern', 'params': params, 'seconds': seconds, 'items': len(matches)})
+        seconds, (strict_matches, loose_matches) = best_time(split_txt.find_speaker_lines, section, repeat=repeat)
+        results.append({'name': 'find_speaker_lines', 'params': params, 'seconds': seconds,
+                        'items': len(strict_matches) + len(loose_matches)})
+        seconds, extraction = best_time(split_txt.extract_meeting, meeting, repeat=repeat)
+        results.append({'name': 'extract_meeting', 'params': params, 'seconds': seconds,
+                        'items': len(extraction['speeches'])})
+    return results
+
+
+def bench_split_texts(sessions, meetings, workers, repeat):
+    params = {'sessions': sessions, 'meetings_per_session': meetings, 'workers': workers}
+    with tempfile.TemporaryDirectory() as root:
+        files = write_corpus(root, sessions=range(48, 48 + sessions), meetings=meetings, speakers=(20, 60))
+        with quiet_in(root):
+            full, _ = best_time(split_txt.split_texts, workers, True, repeat=repeat)
+            incremental, _ = best_time(split_txt.split_texts, workers, False, repeat=repeat)
+    return [{'name': 'split_texts', 'params': params, 'seconds': full, 'items': files},
+            {'name': 'split_texts_incremental', 'params': params, 'seconds': incremental, 'items': files}]
+
+
+def bench_convert(pdfs, workers):
+    pdf_to_full_txt = load_script('pdf-to-full-txt.py')
+    params = {'pdfs': pdfs, 'speakers': 10, 'workers': workers}
+    with tempfile.TemporaryDirectory() as root:
+        pdf_session_dir = os.path.join(root, 'data', 'pdf', 'session_48')
+        os.makedirs(pdf_session_dir)
+        pages = sum(write_meeting_pdf(generate_meeting(speakers=10, seed=i, meeting=i),
+                                      os.path.join(pdf_session_dir, f'meeting_48_{i:02d}.pdf'))
+                    for i in range(1, pdfs + 1))
+        params['pages'] = pages
+        with quiet_in(root):
+            # Conversion is slow, so a single run
+            seconds, _ = best_time(pdf_to_full_txt.convert_pdfs_to_text, workers, None, True, repeat=1)
+    return [{'name': 'convert_pdfs_to_text', 'params': params, 'seconds': seconds, 'items': pdfs}]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages on synthetic meeting records.")
+    parser.add_argument("--sessions", type=int, default=4, help="Sessions in the synthetic corpus (default: 4)")
+    parser.add_argument("--meetings", type=int, default=10, help="Meetings per session (default: 10)")
+    parser.add_argument("--pdfs", type=int, default=3, help="Synthetic PDFs to convert (default: 3)")
+    parser.add_argument("--workers", type=int, default=1, help="Workers for split_texts and conversion (default: 1)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement; the best is kept (default: 3)")
+    parser.add_argument("--skip-convert", action="store_true", help="Skip the (slow) PDF conversion benchmark")
+    parser.add_argument("--output", default=None, help="JSON results path (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    results = bench_patterns(args.repeat)
+    results += bench_split_texts(args.sessions, args.meetings, args.workers, args.repeat)
+    if not args.skip_convert:
+        results += bench_convert(args.pdfs, args.workers)
+
+    print(f"{'stage':<24} {'params':<52} {'time (ms)':>10} {'items':>7} {'ms/item':>8}")
+    for result in results:
+        params = ', '.join(f"{key}={value}" for key, value in result['params'].items())
+        print(f"{result['name']:<24} {params:<52} {result['seconds'] * 1000:>10.1f} {result['items']:>7} "
+              f"{result['seconds'] * 1000 / max(result['items'], 1):>8.2f}")
+    path = save_results('pipeline', results, args.output)
+    print(f"\n📊 Results saved to: {path}")
+
+
+if __name__ == "__main__":
+    main()
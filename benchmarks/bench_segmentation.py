@@ -0,0 +1,57 @@
+"""
+Benchmark speech segmentation (find_speech_ends in split-txt.py) on synthetic
+meetings with up to 500 speakers, against the previous per-speech slice-and-search
+approach. Checks that both produce identical speech spans.
+
+Usage: python -m benchmarks.bench_segmentation
+"""
+from benchmarks.common import best_time
+from benchmarks.synthetic import generate_section
+from script_loader import load_script
+
+split_txt = load_script('split-txt.py')
+
+SPEAKER_COUNTS = [50, 100, 200, 300, 400, 500]
+
+
+def find_speech_starts(section_content):
+    return [
+        {'start': match.end(), 'match_start': match.start()}
+        for match in split_txt.SPEECH_PATTERN.finditer(section_content)
+    ]
+
+
+def legacy_speech_ends(section_content, speeches):
+    """The original approach: slice and re-search the rest of the section for every speech."""
+    ends = []
+    for i, speech in enumerate(speeches):
+        start = speech['start']
+        president_match = split_txt.PRESIDENT_PATTERN.search(section_content[start:])
+        meeting_end_match = split_txt.MEETING_END_PATTERN.search(section_content[start:])
+        next_speech_start = speeches[i + 1]['match_start'] if i + 1 < len(speeches) else len(section_content)
+        end_candidates = [next_speech_start]
+        if president_match:
+            end_candidates.append(start + president_match.start())
+        if meeting_end_match:
+            end_candidates.append(start + meeting_end_match.start())
+        ends.append(min(end_candidates))
+    return ends
+
+
+def main():
+    print(f"{'speakers':>8} {'chars':>10} {'legacy (ms)':>12} {'single-pass (ms)':>17} "
+          f"{'us/speaker':>11} {'speedup':>8}")
+    for speakers in SPEAKER_COUNTS:
+        section = generate_section(speakers=speakers, seed=speakers)
+        speeches = find_speech_starts(section)
+        legacy_time, legacy_ends = best_time(legacy_speech_ends, section, speeches)
+        new_time, new_ends = best_time(split_txt.find_speech_ends, section, speeches)
+        if legacy_ends != new_ends:
+            raise AssertionError(f"Speech spans differ for {speakers} speakers")
+        print(f"{speakers:>8} {len(section):>10,} {legacy_time * 1000:>12.1f} {new_time * 1000:>17.2f} "
+              f"{new_time / len(speeches) * 1e6:>11.2f} {legacy_time / new_time:>7.0f}x")
+    print("\nSpeech spans identical for all sizes. A flat us/speaker column means linear scaling.")
+
+
+if __name__ == "__main__":
+    main()
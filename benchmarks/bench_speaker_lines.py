@@ -0,0 +1,46 @@
+"""
+Benchmark speaker-line detection in split-txt.py: SPEECH_PATTERN and
+POTENTIAL_SPEECH_PATTERN run with finditer over the whole section (the previous
+approach) against find_speaker_lines, which only runs them on the candidate
+lines picked out by find_speaker_line_candidates. Checks that both produce
+identical matches.
+
+Usage: python -m benchmarks.bench_speaker_lines
+"""
+from benchmarks.common import best_time
+from benchmarks.synthetic import generate_section
+from script_loader import load_script
+
+split_txt = load_script('split-txt.py')
+
+# A full General Debate session has roughly 190 speakers
+SPEAKER_COUNTS = [50, 190, 500]
+
+
+def legacy_speaker_lines(section_content):
+    """The original approach: two full finditer passes over the section."""
+    return (list(split_txt.SPEECH_PATTERN.finditer(section_content)),
+            list(split_txt.POTENTIAL_SPEECH_PATTERN.finditer(section_content)))
+
+
+def spans(matches):
+    return [(match.span(), match.groups()) for match in matches]
+
+
+def main():
+    print(f"{'speakers':>8} {'lines':>8} {'candidates':>10} {'finditer (ms)':>14} {'prefiltered (ms)':>17} {'speedup':>8}")
+    for speakers in SPEAKER_COUNTS:
+        # Shorter paragraphs mean more lines per speech, as in the converted PDFs
+        section = generate_section(speakers=speakers, paragraphs=12, words_per_paragraph=40, seed=speakers)
+        legacy_time, (legacy_strict, legacy_loose) = best_time(legacy_speaker_lines, section)
+        new_time, (new_strict, new_loose) = best_time(split_txt.find_speaker_lines, section)
+        if spans(legacy_strict) != spans(new_strict) or spans(legacy_loose) != spans(new_loose):
+            raise AssertionError(f"Speaker lines differ for {speakers} speakers")
+        candidates = len(split_txt.find_speaker_line_candidates(section))
+        print(f"{speakers:>8} {section.count(chr(10)):>8,} {candidates:>10,} {legacy_time * 1000:>14.2f} "
+              f"{new_time * 1000:>17.2f} {legacy_time / new_time:>7.1f}x")
+    print("\nStrict and loose matches identical for all sizes.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_DIR, 'benchmarks', 'results')
+
+
+def best_time(func, *args, repeat=3):
+    """Run func(*args) `repeat` times and return (best wall time in seconds, last result)."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def git_commit():
+    """Short hash of the checked-out commit, with '+dirty' if the tree has changes (None outside git)."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_DIR, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_DIR,
+                               capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+dirty' if dirty else '')
+
+
+def save_results(benchmark, results, path=None):
+    """
+    Write benchmark results as JSON, with the commit and machine they were
+    measured on, so runs on different commits can be compared with
+    `python -m benchmarks.compare`. results is a list of dicts with at least
+    'name' and 'seconds'. Defaults to benchmarks/results/<benchmark>-<commit>.json.
+    Returns the path written.
+    """
+    commit = git_commit()
+    if path is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{benchmark}-{commit or 'nogit'}.json")
+    record = {
+        'benchmark': benchmark,
+        'commit': commit,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2)
+        f.write('\n')
+    return path
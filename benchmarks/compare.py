@@ -0,0 +1,64 @@
+"""
+Compare two benchmark result files written by save_results() (e.g. the same
+benchmark run on two commits) and flag measurements that got slower.
+
+Usage: python -m benchmarks.compare benchmarks/results/pipeline-abc1234.json benchmarks/results/pipeline-def5678.json
+"""
+import argparse
+import json
+
+DEFAULT_THRESHOLD = 0.10  # Flag measurements more than 10% slower
+
+
+def result_key(result):
+    return result['name'], json.dumps(result.get('params', {}), sort_keys=True)
+
+
+def compare(old, new, threshold=DEFAULT_THRESHOLD):
+    """
+    [(name, params, old seconds, new seconds, ratio new/old)] for every
+    measurement in both runs, and the number of regressions beyond threshold.
+    """
+    old_results = {result_key(result): result for result in old['results']}
+    rows = []
+    regressions = 0
+    for result in new['results']:
+        key = result_key(result)
+        if key not in old_results:
+            continue
+        old_seconds = old_results[key]['seconds']
+        ratio = result['seconds'] / old_seconds if old_seconds else float('inf')
+        rows.append((result['name'], result.get('params', {}), old_seconds, result['seconds'], ratio))
+        if ratio > 1 + threshold:
+            regressions += 1
+    return rows, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("old", help="Baseline results (JSON)")
+    parser.add_argument("new", help="Results to check (JSON)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Relative slowdown to flag (default: {DEFAULT_THRESHOLD})")
+    args = parser.parse_args()
+
+    with open(args.old, encoding='utf-8') as f:
+        old = json.load(f)
+    with open(args.new, encoding='utf-8') as f:
+        new = json.load(f)
+    if old.get('platform') != new.get('platform') or old.get('cpus') != new.get('cpus'):
+        print("⚠️  Results are from different machines; timings may not be comparable")
+
+    rows, regressions = compare(old, new, args.threshold)
+    print(f"{old.get('commit')} -> {new.get('commit')}\n")
+    print(f"{'stage':<24} {'params':<52} {'old (ms)':>9} {'new (ms)':>9} {'change':>8}")
+    for name, params, old_seconds, new_seconds, ratio in rows:
+        params_text = ', '.join(f"{key}={value}" for key, value in params.items())
+        flag = "  ⚠️" if ratio > 1 + args.threshold else ""
+        print(f"{name:<24} {params_text:<52} {old_seconds * 1000:>9.1f} {new_seconds * 1000:>9.1f} "
+              f"{(ratio - 1) * 100:>+7.0f}%{flag}")
+    print(f"\n{regressions} of {len(rows)} measurements more than {args.threshold:.0%} slower")
+
+
+if __name__ == "__main__":
+    main()
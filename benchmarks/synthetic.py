@@ -0,0 +1,149 @@
+import os
+import random
+import textwrap
+
+# A spread of country names as they appear in speaker lines
+COUNTRIES = [
+    "Algeria", "Angola", "Bangladesh", "Barbados", "Benin", "Brazil", "Cabo Verde",
+    "Cambodia", "China", "Côte d'Ivoire", "Cuba", "Democratic Republic of the Congo",
+    "Egypt", "Fiji", "France", "Germany", "Ghana", "India", "Islamic Republic of Iran",
+    "Kenya", "Lao People's Democratic Republic", "Mexico", "Nigeria", "Pakistan",
+    "Russian Federation", "Sao Tomé and Principe", "Senegal", "South Africa",
+    "Syrian Arab Republic", "Turkmenistan", "United Republic of Tanzania",
+    "United States of America", "Viet Nam", "Zimbabwe",
+]
+
+TITLES = ["Mr.", "Mrs.", "Ms.", "Sheikh", "Dame", "His Excellency Mr.", "Prime Minister", "President"]
+
+SURNAMES = [
+    "Onkeya", "Chem Widhya", "Billie Miller", "Niyazov", "Hasina", "Tong", "Wade",
+    "Asselborn", "Kamara", "Nguyen", "Okonkwo", "Silva", "Haddad", "Mensah", "Rahman",
+]
+
+LANGUAGES = ["French", "Spanish", "Arabic", "Russian", "Chinese", "Portuguese"]
+
+WORDS = (
+    "cooperation development peace security sovereignty United Nations Member States "
+    "international community multilateralism climate change sustainable development goals "
+    "win-win cooperation South-South cooperation non-interference internal affairs "
+    "community with a shared future for mankind dialogue partnership poverty eradication "
+    "the of and to in a that we our for is on with as this are by"
+).split()
+
+
+def _paragraph(rng, words):
+    return ' '.join(rng.choice(WORDS) for _ in range(words)).capitalize() + '.'
+
+
+def _speaker_line(rng):
+    title = rng.choice(TITLES)
+    name = rng.choice(SURNAMES)
+    country = rng.choice(COUNTRIES)
+    line = f"{title} {name} ({country})"
+    if rng.random() < 0.3:
+        line += f" (spoke in {rng.choice(LANGUAGES)})"
+    return line + ":"
+
+
+def generate_meeting(speakers=20, paragraphs=4, words_per_paragraph=120, seed=0,
+                     session=48, meeting=5):
+    """
+    Generate the full text of a synthetic General Debate meeting record.
+
+    Follows the layout of the converted UN records: a front page, the
+    "General debate" heading, then delegate speeches ("Mr. X (Country)
+    (spoke in French): ..."), "The President:" interjections between some
+    speeches, a few malformed speaker lines that should be flagged for
+    review, and "The meeting rose at ..." at the end.
+    """
+    rng = random.Random(seed)
+    year = 1945 + session
+    parts = [
+        "United Nations",
+        f"A/{session}/PV.{meeting}",
+        "General Assembly",
+        f"{session}th session",
+        f"{meeting}th plenary meeting",
+        f"Monday, 27 September {year}, 10 a.m.",
+        "New York",
+        "",
+        "The meeting was called to order at 10.05 a.m.",
+        "",
+        "Agenda item 9",
+        "",
+        "General debate",
+        "",
+    ]
+    for i in range(speakers):
+        body = [_paragraph(rng, words_per_paragraph) for _ in range(paragraphs)]
+        parts.append(f"{_speaker_line(rng)} {body[0]}")
+        parts.append("")
+        for paragraph in body[1:]:
+            parts.append(paragraph)
+            parts.append("")
+        roll = rng.random()
+        if roll < 0.25:
+            president = rng.choice(["The President", "The Acting President", "The President (spoke in French)"])
+            parts.append(f"{president}: On behalf of the General Assembly, I wish to thank the speaker for the statement just made.")
+            parts.append("")
+        elif roll < 0.28:
+            # Malformed / non-delegate speaker lines that only the loose pattern catches
+            parts.append(f"Mr. {rng.choice(SURNAMES)} (Under-Secretary-General for General Assembly Affairs): {_paragraph(rng, 30)}")
+            parts.append("")
+    parts.append("The meeting rose at 1.10 p.m.")
+    parts.append("")
+    parts.append("This record contains the text of speeches delivered in English and of the")
+    parts.append("interpretation of speeches delivered in the other languages.")
+    return '\n'.join(parts)
+
+
+def generate_section(speakers=20, **kwargs):
+    """Return only the part of a synthetic meeting after the "General debate" heading."""
+    text = generate_meeting(speakers=speakers, **kwargs)
+    marker = "\nGeneral debate\n"
+    return text[text.index(marker) + len(marker):]
+
+
+def write_corpus(root, sessions=(48, 60, 70, 79), meetings=5, speakers=(5, 30), seed=1, skipped_every=5):
+    """
+    Write a synthetic full-text corpus under root/data/full-txt/session_<n>/,
+    laid out like the output of pdf-to-full-txt.py.
+    Each meeting gets a random speaker count in the inclusive range `speakers`;
+    every `skipped_every`-th meeting has no "General debate" heading, so
+    split-txt.py skips it (None for no skipped meetings).
+    Returns the number of meeting files written.
+    """
+    rng = random.Random(seed)
+    written = 0
+    for session in sessions:
+        session_dir = os.path.join(root, 'data', 'full-txt', f'session_{session}')
+        os.makedirs(session_dir, exist_ok=True)
+        for meeting in range(1, meetings + 1):
+            text = generate_meeting(speakers=rng.randint(*speakers), seed=session * 100 + meeting,
+                                    session=session, meeting=meeting)
+            if skipped_every and meeting % skipped_every == 0:
+                text = text.replace('General debate', 'Election of officers')
+            with open(os.path.join(session_dir, f'meeting_{session}_{meeting:02d}.txt'), 'w', encoding='utf-8') as f:
+                f.write(text)
+            written += 1
+    return written
+
+
+def write_meeting_pdf(text, pdf_path, lines_per_page=50, width=90):
+    """
+    Typeset a synthetic meeting record as a plain single-column PDF (one line per
+    text line, long paragraphs wrapped), for benchmarking pdf-to-full-txt.py.
+    Returns the number of pages.
+    """
+    import pymupdf  # type: ignore[import-untyped]
+    lines = []
+    for line in text.split('\n'):
+        lines.extend(textwrap.wrap(line, width) or [''])
+    doc = pymupdf.open()
+    for first in range(0, len(lines), lines_per_page):
+        page = doc.new_page()
+        page.insert_text((50, 60), '\n'.join(lines[first:first + lines_per_page]), fontsize=9)
+    page_count = doc.page_count
+    doc.save(pdf_path)
+    doc.close()
+    return page_count
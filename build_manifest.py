@@ -0,0 +1,161 @@
+"""
+Build manifest shared by the pipeline stages (undl-fetch.py -> pdf-to-full-txt.py -> split-txt.py).
+
+For every artifact a stage produces, the manifest records the content hash of
+its input, a hash of the parameters it was built with, and the hash, size and
+mtime of the output. A stage can then skip any artifact whose input, parameters
+and output are all unchanged since the last run.
+
+The manifest is a single SQLite file, so it is safe to delete: the next run
+simply rebuilds everything.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+MANIFEST_PATH = "./data/manifest.sqlite"
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_bytes(data):
+    """SHA-256 hex digest of a bytes object."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_params(*parts):
+    """Stable hash of the parameters an artifact was built with (anything JSON-serializable, or its str())."""
+    return hash_bytes(json.dumps(parts, sort_keys=True, default=str).encode('utf-8'))
+
+
+def _hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class BuildManifest:
+    """
+    SQLite-backed record of what each stage built and from what.
+
+    Rows are keyed by (stage, key), where key is usually the output path.
+    File hashes are cached by (size, mtime), so unchanged files are never
+    re-read just to find out that they are unchanged.
+
+    Safe to share between threads; each process should open its own instance.
+    """
+
+    def __init__(self, path=MANIFEST_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.row_factory = sqlite3.Row
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS artifacts (
+                stage TEXT NOT NULL,
+                key TEXT NOT NULL,
+                input_hash TEXT,
+                params_hash TEXT,
+                output_hash TEXT,
+                output_size INTEGER,
+                output_mtime_ns INTEGER,
+                payload TEXT,
+                updated_at TEXT,
+                PRIMARY KEY (stage, key)
+            );
+            CREATE TABLE IF NOT EXISTS file_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL
+            );
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        with self.lock:
+            self.db.commit()
+            self.db.close()
+
+    def commit(self):
+        with self.lock:
+            self.db.commit()
+
+    def file_hash(self, path):
+        """SHA-256 of a file's contents, reusing the cached value if its size and mtime haven't changed."""
+        stat = os.stat(path)
+        with self.lock:
+            row = self.db.execute("SELECT size, mtime_ns, sha256 FROM file_hashes WHERE path = ?", (path,)).fetchone()
+        if row and row['size'] == stat.st_size and row['mtime_ns'] == stat.st_mtime_ns:
+            return row['sha256']
+        digest = _hash_file(path)
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO file_hashes (path, size, mtime_ns, sha256) VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, digest))
+        return digest
+
+    def get(self, stage, key):
+        """The recorded row for an artifact as a dict (payload decoded from JSON), or None."""
+        with self.lock:
+            row = self.db.execute("SELECT * FROM artifacts WHERE stage = ? AND key = ?", (stage, key)).fetchone()
+        if row is None:
+            return None
+        record = dict(row)
+        record['payload'] = json.loads(record['payload']) if record['payload'] is not None else None
+        return record
+
+    def is_fresh(self, stage, key, input_hash=None, params_hash=None, output_path=None):
+        """
+        True if the artifact was recorded with the same input and parameter hashes
+        and (when output_path is given) the output file is still the one we wrote.
+        """
+        record = self.get(stage, key)
+        if record is None or record['input_hash'] != input_hash or record['params_hash'] != params_hash:
+            return False
+        if output_path is not None:
+            try:
+                stat = os.stat(output_path)
+            except FileNotFoundError:
+                return False
+            if stat.st_size != record['output_size'] or stat.st_mtime_ns != record['output_mtime_ns']:
+                return False
+        return True
+
+    def record(self, stage, key, input_hash=None, params_hash=None, output_path=None, output_hash=None, payload=None):
+        """Record that an artifact was (re)built. The output is hashed if output_path is given without output_hash."""
+        output_size = output_mtime_ns = None
+        if output_path is not None:
+            if output_hash is None:
+                output_hash = self.file_hash(output_path)
+            stat = os.stat(output_path)
+            output_size, output_mtime_ns = stat.st_size, stat.st_mtime_ns
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO artifacts (stage, key, input_hash, params_hash, output_hash, "
+                "output_size, output_mtime_ns, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (stage, key, input_hash, params_hash, output_hash, output_size, output_mtime_ns,
+                 json.dumps(payload) if payload is not None else None, datetime.now().isoformat()))
+
+    def keys(self, stage):
+        """All keys recorded for a stage."""
+        with self.lock:
+            return [row['key'] for row in self.db.execute("SELECT key FROM artifacts WHERE stage = ?", (stage,))]
+
+    def forget(self, stage, key):
+        """Remove an artifact's record."""
+        with self.lock:
+            self.db.execute("DELETE FROM artifacts WHERE stage = ? AND key = ?", (stage, key))
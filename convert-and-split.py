@@ -0,0 +1,179 @@
+"""
+Fused PDF-to-speeches pipeline: converts each meeting record PDF and hands the
+text straight to the speech splitter in memory, without writing data/full-txt
+(unless --keep-full-text is given).
+
+The two stages run in separate process pools connected by generators with
+bounded queues: at most --queue-size documents are waiting or in flight per
+stage, so conversion and extraction overlap and memory use doesn't grow with
+the corpus. Results are consumed in the order the PDFs are listed, so speech
+IDs don't depend on the number of workers; the outputs are the same as running
+pdf-to-full-txt.py followed by split-txt.py, up to the order in which the two
+directories list their files.
+
+Every PDF is converted on every run (cached extractions are spans into the
+full text, so they can't be reused without it); as in split-txt.py, speech
+files whose content is unchanged are not rewritten.
+
+Usage: python convert-and-split.py [--convert-workers 4] [--split-workers 2] [--keep-full-text]
+"""
+import os
+import argparse
+import multiprocessing
+from collections import deque
+from contextlib import nullcontext
+from build_manifest import BuildManifest
+from script_loader import load_script
+
+
+pdf_to_full_txt = load_script('pdf-to-full-txt.py')
+split_txt = load_script('split-txt.py')
+
+DEFAULT_QUEUE_SIZE = 8  # Documents waiting or in flight per stage
+
+
+def list_pdf_files():
+    """List (session, txt filename, pdf_path, txt_path) for every PDF under pdf_dir, in processing order."""
+    jobs = []
+    for subdir in os.listdir(pdf_to_full_txt.pdf_dir):
+        subdir_path = os.path.join(pdf_to_full_txt.pdf_dir, subdir)
+        if not os.path.isdir(subdir_path):
+            continue
+        for filename in os.listdir(subdir_path):
+            if not filename.lower().endswith(".pdf"):
+                continue
+            pdf_path = os.path.join(subdir_path, filename)
+            txt_filename = os.path.splitext(filename)[0] + ".txt"
+            txt_path = os.path.join(pdf_to_full_txt.txt_dir, subdir, txt_filename)
+            jobs.append((subdir, txt_filename, pdf_path, txt_path))
+    return jobs
+
+
+def bounded_imap(pool, func, items, queue_size):
+    """
+    Like pool.imap(func, items), but reads items lazily and keeps at most
+    queue_size of them submitted and not yet yielded. Results come back in
+    item order. With pool=None, runs func in this process.
+    """
+    if pool is None:
+        yield from map(func, items)
+        return
+    pending = deque()
+    for item in items:
+        pending.append(pool.apply_async(func, (item,)))
+        if len(pending) >= queue_size:
+            yield pending.popleft().get()
+    while pending:
+        yield pending.popleft().get()
+
+
+def convert_job(job):
+    """
+    Conversion stage (runs in pool workers): job is (pdf_path, target_pages), as for
+    pdf_to_full_txt.convert_text(). Returns the PDF's text, or None if it failed to convert.
+    """
+    pdf_path, target_pages = job
+    try:
+        text, pages, page_count = pdf_to_full_txt.convert_text(pdf_path, target_pages)
+        if target_pages:
+            print(f"📄 {pdf_path}: converted {pages} of {page_count} pages, skipped {page_count - pages}")
+    except Exception as e:
+        print(f"Error converting {pdf_path}: {e}")
+        return None
+    if not isinstance(text, str):
+        print(f"Unexpected conversion return type for {pdf_path}")
+        return None
+    return text
+
+
+def split_job(text):
+    """Split stage (runs in pool workers): as split_txt.extract_meeting_text(), without a cached extraction."""
+    return split_txt.extract_meeting_text(text)
+
+
+def write_full_text(text, txt_path):
+    """Write one converted document to txt_path, via a temporary file as in pdf-to-full-txt.py."""
+    os.makedirs(os.path.dirname(txt_path), exist_ok=True)
+    tmp_path = txt_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp_path, txt_path)
+
+
+def convert_and_split(convert_workers=1, split_workers=1, queue_size=DEFAULT_QUEUE_SIZE, force=False,
+                      keep_full_text=False, target_pages=False, parquet=False, output='files'):
+    """
+    Convert every PDF and split it into speeches in one streaming pass.
+    Writes the same speech outputs as split-txt.py (see split_txt.split_meetings()),
+    plus the full text under txt_dir if keep_full_text is set.
+    With target_pages, only the pages the splitter uses are converted
+    (see pdf_to_full_txt.find_target_pages()).
+    """
+    params_hash = pdf_to_full_txt.TARGETED_CONVERT_PARAMS_HASH if target_pages else pdf_to_full_txt.CONVERT_PARAMS_HASH
+    manifest = BuildManifest()
+    jobs = list_pdf_files()
+    failed = []
+
+    with (multiprocessing.Pool(convert_workers) if convert_workers > 1 else nullcontext()) as convert_pool, \
+            (multiprocessing.Pool(split_workers) if split_workers > 1 else nullcontext()) as split_pool:
+
+        texts = bounded_imap(convert_pool, convert_job, ((pdf_path, target_pages) for _, _, pdf_path, _ in jobs),
+                             queue_size)
+
+        def converted():
+            # Pass on converted documents; drop the ones that failed
+            for (subdir, txt_filename, pdf_path, txt_path), text in zip(jobs, texts):
+                if text is None:
+                    failed.append(pdf_path)
+                    continue
+                if keep_full_text:
+                    write_full_text(text, txt_path)
+                    pdf_to_full_txt.record_conversion(manifest, pdf_path, txt_path, params_hash)
+                yield (subdir, txt_filename), text
+
+        keys = deque()  # Documents submitted to the split stage and not yet consumed, in order
+
+        def split_inputs():
+            for key, split_input in converted():
+                keys.append(key)
+                yield split_input
+
+        extractions = bounded_imap(split_pool, split_job, split_inputs(), queue_size)
+
+        def meetings():
+            for extraction, _ in extractions:
+                subdir, txt_filename = keys.popleft()
+                yield subdir, txt_filename, extraction
+
+        split_txt.split_meetings(meetings(), manifest, total=len(jobs), force=force, parquet=parquet,
+                                 output=output)
+
+    print(f"Converted {len(jobs) - len(failed)} PDFs, {len(failed)} failed")
+    for pdf_path in failed:
+        print(f"  {pdf_path}: conversion error")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert meeting record PDFs and split them into speeches "
+                                                 "in one pass, without intermediate full-text files.")
+    parser.add_argument("--convert-workers", type=int, default=1,
+                        help="Number of processes converting PDFs (default: 1, in this process)")
+    parser.add_argument("--split-workers", type=int, default=1,
+                        help="Number of processes extracting speeches (default: 1, in this process)")
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE,
+                        help=f"Documents waiting or in flight per stage (default: {DEFAULT_QUEUE_SIZE})")
+    parser.add_argument("--keep-full-text", action="store_true",
+                        help="Also write each converted document to data/full-txt, as pdf-to-full-txt.py does")
+    parser.add_argument("--target-pages", action="store_true",
+                        help="Only convert the pages from the general debate heading to the end of the meeting")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the build manifest and rewrite every speech file")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also write the speech and meeting metadata as typed Parquet files")
+    parser.add_argument("--output", choices=["files", "store", "both"], default="files",
+                        help="Write one .txt file per speech (files, the default), a single corpus store "
+                             "(store, see corpus_store.py), or both")
+    args = parser.parse_args()
+    convert_and_split(convert_workers=args.convert_workers, split_workers=args.split_workers,
+                      queue_size=args.queue_size, force=args.force, keep_full_text=args.keep_full_text,
+                      target_pages=args.target_pages, parquet=args.parquet, output=args.output)
@@ -0,0 +1,281 @@
+"""
+Inventory of the corpus at every stage of the pipeline: the downloaded PDFs
+(data/pdf), their full text (data/full-txt) and the speech files split from
+it (data/speech), one row per meeting with file sizes, mtimes, PDF page
+counts and the meeting's status:
+  - downloaded: PDF only, not converted yet
+  - stale_text: the full text is older than the PDF (re-downloaded since)
+  - converted: full text, but no speech files yet
+  - skipped: full text with no general debate section (from the review store)
+  - split: speech files written
+  - speeches_only: speech files without a PDF or full text
+
+The inventory is cached in data/inventory.sqlite. Session directories are
+listed with os.scandir, and a rescan only lists the ones whose mtime changed
+since the last scan, so refreshing it costs one stat per session directory.
+A directory's mtime changes when files are added, removed or renamed into it
+(as every stage does when it writes a file), not when a file is rewritten in
+place, so use `scan --full` to pick up new sizes of rewritten speech files.
+
+Usage:
+    python corpus_inventory.py scan [--full] [--no-pages]
+    python corpus_inventory.py summary
+    python corpus_inventory.py sessions
+    python corpus_inventory.py list --status downloaded [--session session_70]
+"""
+import os
+import re
+import sqlite3
+import argparse
+from collections import Counter, defaultdict
+import pymupdf
+from tqdm import tqdm
+from review_store import ReviewStore, REVIEW_STORE_PATH
+
+INVENTORY_PATH = "./data/inventory.sqlite"
+
+# (stage, directory, file suffix), in pipeline order
+STAGES = (
+    ('pdf', "./data/pdf", ".pdf"),
+    ('txt', "./data/full-txt", ".txt"),
+    ('speech', "./data/speech", ".txt"),
+)
+
+STATUSES = ('downloaded', 'stale_text', 'converted', 'skipped', 'split', 'speeches_only')
+
+# Speech files are named speech_<id>_<meeting>_<country>.txt (see split-txt.py)
+SPEECH_FILE_PATTERN = re.compile(r'^speech_\d+_(.+)_[^_]+\.txt$')
+
+
+def meeting_of(stage, filename):
+    """The meeting a file belongs to ('meeting_48_04'), or None if it isn't one of the stage's files."""
+    if stage == 'speech':
+        match = SPEECH_FILE_PATTERN.match(filename)
+        return match.group(1) if match else None
+    return os.path.splitext(filename)[0]
+
+
+def count_pages(pdf_path):
+    """Page count of a PDF, or 0 if it can't be opened."""
+    try:
+        with pymupdf.open(pdf_path) as doc:
+            return doc.page_count
+    except Exception:
+        return 0
+
+
+def meeting_status(meeting, skipped=frozenset()):
+    """Status of a meeting row (see STATUSES); skipped is a set of (session, txt filename)."""
+    if meeting['txt_size'] is None:
+        if meeting['pdf_size'] is not None:
+            return 'downloaded'
+        return 'speeches_only'
+    if meeting['pdf_mtime_ns'] is not None and meeting['txt_mtime_ns'] < meeting['pdf_mtime_ns']:
+        return 'stale_text'
+    if meeting['speech_files']:
+        return 'split'
+    if (meeting['session'], meeting['meeting'] + ".txt") in skipped:
+        return 'skipped'
+    return 'converted'
+
+
+class CorpusInventory:
+    """
+    SQLite-backed inventory of the files at every stage. scan() brings it up
+    to date; the query methods only read the cached tables.
+    """
+
+    def __init__(self, path=INVENTORY_PATH, stages=STAGES):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.stages = stages
+        self.db = sqlite3.connect(path)
+        self.db.row_factory = sqlite3.Row
+        self.db.executescript("""
+            CREATE TABLE IF NOT EXISTS directories (
+                stage TEXT NOT NULL,
+                session TEXT NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                PRIMARY KEY (stage, session)
+            );
+            CREATE TABLE IF NOT EXISTS files (
+                stage TEXT NOT NULL,
+                session TEXT NOT NULL,
+                name TEXT NOT NULL,
+                meeting TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                pages INTEGER,
+                PRIMARY KEY (stage, session, name)
+            );
+            CREATE INDEX IF NOT EXISTS files_meeting ON files (session, meeting);
+            CREATE VIEW IF NOT EXISTS meetings AS
+                SELECT session, meeting,
+                       MAX(CASE WHEN stage = 'pdf' THEN size END) AS pdf_size,
+                       MAX(CASE WHEN stage = 'pdf' THEN mtime_ns END) AS pdf_mtime_ns,
+                       MAX(CASE WHEN stage = 'pdf' THEN pages END) AS pdf_pages,
+                       MAX(CASE WHEN stage = 'txt' THEN size END) AS txt_size,
+                       MAX(CASE WHEN stage = 'txt' THEN mtime_ns END) AS txt_mtime_ns,
+                       SUM(stage = 'speech') AS speech_files,
+                       SUM(CASE WHEN stage = 'speech' THEN size ELSE 0 END) AS speech_bytes,
+                       MAX(CASE WHEN stage = 'speech' THEN mtime_ns END) AS speech_mtime_ns
+                FROM files GROUP BY session, meeting;
+        """)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.db.commit()
+        self.db.close()
+
+    def scan(self, full=False, pages=True):
+        """
+        Bring the inventory up to date: list every session directory whose mtime
+        changed since the last scan (every one with full) and, with pages, count
+        the pages of PDFs that are new or changed. Returns (directories rescanned,
+        directories unchanged).
+        """
+        rescanned = unchanged = 0
+        for stage, root, suffix in self.stages:
+            known = {row['session']: row['mtime_ns'] for row in
+                     self.db.execute("SELECT session, mtime_ns FROM directories WHERE stage = ?", (stage,))}
+            sessions = set()
+            if os.path.isdir(root):
+                with os.scandir(root) as entries:
+                    for entry in entries:
+                        if not entry.is_dir():
+                            continue
+                        sessions.add(entry.name)
+                        mtime_ns = entry.stat().st_mtime_ns
+                        if not full and known.get(entry.name) == mtime_ns:
+                            unchanged += 1
+                            continue
+                        self._scan_session(stage, entry.name, entry.path, suffix)
+                        self.db.execute("INSERT OR REPLACE INTO directories VALUES (?, ?, ?)",
+                                        (stage, entry.name, mtime_ns))
+                        rescanned += 1
+            # Sessions whose directory is gone
+            for session in set(known) - sessions:
+                self.db.execute("DELETE FROM directories WHERE stage = ? AND session = ?", (stage, session))
+                self.db.execute("DELETE FROM files WHERE stage = ? AND session = ?", (stage, session))
+        if pages:
+            self._count_pages()
+        self.db.commit()
+        return rescanned, unchanged
+
+    def _scan_session(self, stage, session, session_path, suffix):
+        """Replace a session's rows for one stage, keeping page counts of unchanged files."""
+        previous = {row['name']: row for row in self.db.execute(
+            "SELECT name, size, mtime_ns, pages FROM files WHERE stage = ? AND session = ?", (stage, session))}
+        rows = []
+        with os.scandir(session_path) as entries:
+            for entry in entries:
+                if not entry.name.lower().endswith(suffix) or not entry.is_file():
+                    continue
+                meeting = meeting_of(stage, entry.name)
+                if meeting is None:
+                    continue
+                stat = entry.stat()
+                old = previous.get(entry.name)
+                unchanged = old is not None and old['size'] == stat.st_size and old['mtime_ns'] == stat.st_mtime_ns
+                rows.append((stage, session, entry.name, meeting, stat.st_size, stat.st_mtime_ns,
+                             old['pages'] if unchanged else None))
+        self.db.execute("DELETE FROM files WHERE stage = ? AND session = ?", (stage, session))
+        self.db.executemany("INSERT INTO files VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def _count_pages(self):
+        """Count the pages of every PDF that hasn't been counted since it last changed."""
+        roots = {stage: root for stage, root, _ in self.stages}
+        if 'pdf' not in roots:
+            return
+        pending = self.db.execute(
+            "SELECT session, name FROM files WHERE stage = 'pdf' AND pages IS NULL").fetchall()
+        for row in tqdm(pending, desc="Counting PDF pages", unit="file", disable=not pending):
+            pages = count_pages(os.path.join(roots['pdf'], row['session'], row['name']))
+            self.db.execute("UPDATE files SET pages = ? WHERE stage = 'pdf' AND session = ? AND name = ?",
+                            (pages, row['session'], row['name']))
+
+    def meetings(self, status=None, session=None, review_path=REVIEW_STORE_PATH):
+        """Meeting rows as dicts with a 'status' key (see STATUSES), optionally filtered, ordered by session and meeting."""
+        query, values = "SELECT * FROM meetings", []
+        if session is not None:
+            query += " WHERE session = ?"
+            values.append(session)
+        query += " ORDER BY session, meeting"
+        skipped = skipped_files(review_path)
+        rows = []
+        for row in self.db.execute(query, values):
+            meeting = dict(row)
+            meeting['status'] = meeting_status(meeting, skipped)
+            if status is None or meeting['status'] == status:
+                rows.append(meeting)
+        return rows
+
+    def session_counts(self, stage='pdf'):
+        """{session: files} for one stage, sorted by session."""
+        return dict(self.db.execute(
+            "SELECT session, COUNT(*) FROM files WHERE stage = ? GROUP BY session ORDER BY session", (stage,)))
+
+    def stage_counts(self):
+        """{session: {stage: files}} for every stage."""
+        counts: dict = defaultdict(dict)
+        for row in self.db.execute("SELECT session, stage, COUNT(*) AS files FROM files GROUP BY session, stage"):
+            counts[row['session']][row['stage']] = row['files']
+        return dict(sorted(counts.items()))
+
+
+def skipped_files(review_path=REVIEW_STORE_PATH):
+    """(session, filename) of every meeting file split-txt.py skipped for having no general debate section."""
+    try:
+        with ReviewStore(review_path) as review:
+            return {(item['session'], item['file']) for item in review.items(kind='skipped_file')}
+    except FileNotFoundError:
+        return set()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inventory of the corpus files at every pipeline stage.")
+    parser.add_argument("--inventory", default=INVENTORY_PATH, help=f"Inventory path (default: {INVENTORY_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    scan_parser = subparsers.add_parser("scan", help="Update the inventory and count PDF pages")
+    scan_parser.add_argument("--full", action="store_true", help="Rescan every directory, not just changed ones")
+    scan_parser.add_argument("--no-pages", action="store_true", help="Don't count PDF pages")
+    for name, help_text in (("summary", "Meetings by status"), ("sessions", "Files per stage and session"),
+                            ("list", "List meetings")):
+        command_parser = subparsers.add_parser(name, help=help_text)
+        command_parser.add_argument("--no-scan", action="store_true",
+                                    help="Use the cached inventory as is, without checking for changed directories")
+        if name == "list":
+            command_parser.add_argument("--status", choices=STATUSES)
+            command_parser.add_argument("--session", help="e.g. session_70")
+    args = parser.parse_args()
+
+    with CorpusInventory(args.inventory) as inventory:
+        if args.command == "scan":
+            rescanned, unchanged = inventory.scan(full=args.full, pages=not args.no_pages)
+            print(f"✅ Rescanned {rescanned} directories, {unchanged} unchanged")
+            print(f"📋 Inventory saved to: {args.inventory}")
+        else:
+            if not args.no_scan:
+                inventory.scan(pages=False)
+            if args.command == "summary":
+                statuses = Counter(meeting['status'] for meeting in inventory.meetings())
+                print(f"📊 {sum(statuses.values())} meetings:")
+                for status in STATUSES:
+                    print(f"  {status:<14} {statuses[status]}")
+            elif args.command == "sessions":
+                print(f"  {'session':<14} {'pdf':>6} {'txt':>6} {'speech':>7}")
+                for session, counts in inventory.stage_counts().items():
+                    print(f"  {session:<14} {counts.get('pdf', 0):>6} {counts.get('txt', 0):>6} "
+                          f"{counts.get('speech', 0):>7}")
+            else:
+                meetings = inventory.meetings(args.status, args.session)
+                for meeting in meetings:
+                    pages = f"{meeting['pdf_pages']} pages" if meeting['pdf_pages'] is not None else "-"
+                    print(f"  {meeting['session']}/{meeting['meeting']}: {meeting['status']}, {pages}, "
+                          f"{meeting['speech_files']} speech files")
+                print(f"\n📋 {len(meetings)} meetings")
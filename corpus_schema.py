@@ -0,0 +1,214 @@
+"""
+Typed schemas for the speech and meeting metadata tables written by split-txt.py.
+
+The CSVs lose their dtypes on the way back in (nullable join years come back as
+floats, countries as plain strings). With --parquet, split-txt.py also writes
+the tables as Parquet using the dtypes below: categoricals for the low-cardinality
+columns, nullable Int16 for years, booleans for the membership flags. Downstream
+code should load the tables with load_speech_metadata() / load_meeting_metadata(),
+which prefer the Parquet file and fall back to the CSV with the same dtypes applied
+(also when the CSV is newer, i.e. the Parquet file is left from an earlier run).
+
+TableWriter streams a table to its CSV (and Parquet) file in batches as rows
+are produced, so the full table never has to be held in memory.
+"""
+import os
+import pandas as pd
+import pyarrow as pa  # type: ignore[import-untyped]
+import pyarrow.parquet as pq  # type: ignore[import-untyped]
+
+SPEECH_METADATA_CSV = "./data/speech/speech_metadata.csv"
+SPEECH_METADATA_PARQUET = "./data/speech/speech_metadata.parquet"
+MEETING_METADATA_CSV = "./data/speech/meeting_metadata.csv"
+MEETING_METADATA_PARQUET = "./data/speech/meeting_metadata.parquet"
+
+PARQUET_COMPRESSION = "zstd"
+
+DEFAULT_BATCH_SIZE = 1000  # Rows buffered by TableWriter between writes
+
+# speech_metadata columns, in output order
+SPEECH_DTYPES = {
+    'speech_id': 'string',
+    'meeting_id': 'category',
+    'session': 'category',
+    'year': 'Int16',
+    'source_file': 'category',
+    'output_file': 'string',
+    'output_path': 'string',
+    'speaker': 'string',
+    'country': 'category',
+    'region': 'category',
+    'language': 'category',
+    'word_count': 'Int32',
+    'paragraph_count': 'Int16',
+    'is_head_of_state': 'boolean',
+    'is_focac_member': 'boolean',
+    'is_cascf_member': 'boolean',
+    'is_sco_member': 'boolean',
+    'is_bri_member': 'boolean',
+    'focac_joined': 'Int16',
+    'cascf_joined': 'Int16',
+    'sco_joined': 'Int16',
+    'bri_joined': 'Int16',
+    'bri_exited': 'Int16',
+    'focac_at_speech': 'boolean',
+    'cascf_at_speech': 'boolean',
+    'sco_at_speech': 'boolean',
+    'bri_at_speech': 'boolean',
+    'is_celac_member': 'boolean',
+    'celac_joined': 'Int16',
+    'celac_at_speech': 'boolean',
+}
+
+# meeting_metadata columns, in output order
+MEETING_DTYPES = {
+    'meeting_id': 'string',
+    'session': 'category',
+    'meeting_file': 'string',
+    'speech_count': 'Int16',
+    'country_count': 'Int16',
+    'countries': 'string',
+    'languages': 'string',
+    'total_word_count': 'Int32',
+    'head_of_state_count': 'Int16',
+    'flagged_count': 'Int32',
+}
+
+
+class ColumnBuilder:
+    """
+    Accumulates table rows column by column (one list per column) instead of
+    as a list of per-row dicts, and turns them into a DataFrame at the end.
+    """
+
+    def __init__(self, columns):
+        self.columns = {column: [] for column in columns}
+        self.rows = 0
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, **values):
+        """Add one row; values must have exactly one entry per column."""
+        if values.keys() != self.columns.keys():
+            raise KeyError(f"Row columns don't match: {sorted(set(values) ^ set(self.columns))}")
+        for column, value in values.items():
+            self.columns[column].append(value)
+        self.rows += 1
+
+    def to_frame(self):
+        """The accumulated rows as a DataFrame, with dtypes inferred as for the CSV output."""
+        return pd.DataFrame(self.columns)
+
+
+class TableWriter:
+    """
+    Writes table rows to a CSV file (and, with parquet_path, a Parquet file)
+    in batches of batch_size rows, flushing the files after every batch, so
+    memory stays bounded and an interrupted run leaves the CSV rows written so
+    far. The Parquet file is written to parquet_path + ".tmp" and only moved
+    into place by close(), as a Parquet file is unreadable until its footer is
+    written.
+    Each batch is also passed to on_batch(frame) if given, for other outputs
+    built from the same rows.
+
+    float_columns are written as floats (e.g. "2014.0"), as the CSV of the
+    whole table would have them when the column has any missing values;
+    other columns are written as their values' inferred dtype, as before.
+    """
+
+    def __init__(self, dtypes, csv_path, parquet_path=None, batch_size=DEFAULT_BATCH_SIZE,
+                 float_columns=(), on_batch=None):
+        self.dtypes = dtypes
+        self.batch = ColumnBuilder(dtypes)
+        self.batch_size = batch_size
+        self.float_columns = list(float_columns)
+        self.on_batch = on_batch
+        self.rows = 0
+        self.csv_file = open(csv_path, 'w', encoding='utf-8', newline='')
+        self.parquet_path = parquet_path
+        self.parquet_writer = None
+        if parquet_path is not None:
+            self.parquet_writer = pq.ParquetWriter(parquet_path + ".tmp", parquet_schema(dtypes),
+                                                   compression=PARQUET_COMPRESSION)
+
+    def __len__(self):
+        return self.rows
+
+    def append(self, **values):
+        """Add one row (see ColumnBuilder.append); writes a batch once batch_size rows are buffered."""
+        self.batch.append(**values)
+        self.rows += 1
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered rows (for an empty table, just the CSV header)."""
+        if not len(self.batch) and self.rows:
+            return
+        df = self.batch.to_frame()
+        for column in self.float_columns:
+            df[column] = df[column].astype('float64')
+        df.to_csv(self.csv_file, header=self.csv_file.tell() == 0, index=False)
+        self.csv_file.flush()
+        if self.parquet_writer is not None:
+            self.parquet_writer.write_table(pa.Table.from_pandas(typed_frame(df, self.dtypes),
+                                                                 schema=self.parquet_writer.schema,
+                                                                 preserve_index=False))
+        if self.on_batch is not None:
+            self.on_batch(df)
+        self.batch = ColumnBuilder(self.dtypes)
+
+    def close(self):
+        """Write the remaining rows, close the files and move the Parquet file into place."""
+        self.flush()
+        self.csv_file.close()
+        if self.parquet_writer is not None:
+            self.parquet_writer.close()
+            os.replace(self.parquet_path + ".tmp", self.parquet_path)
+
+
+def parquet_schema(dtypes):
+    """
+    Arrow schema for a table with the given dtypes. Categoricals (all of string
+    values here) get 32-bit dictionary indexes, so batches with different
+    numbers of categories share it.
+    """
+    schema = pa.Schema.from_pandas(typed_frame(pd.DataFrame(columns=list(dtypes)), dtypes), preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_dictionary(field.type):
+            schema = schema.set(i, field.with_type(pa.dictionary(pa.int32(), pa.large_string())))
+    return schema
+
+
+def typed_frame(df, dtypes):
+    """df with the schema's dtypes applied and its columns in schema order."""
+    return df[list(dtypes)].astype(dtypes)
+
+
+def write_parquet(df, path, dtypes):
+    """Write df as Parquet with the given schema."""
+    typed_frame(df, dtypes).to_parquet(path, engine='pyarrow', compression=PARQUET_COMPRESSION, index=False)
+
+
+def _load(parquet_path, csv_path, dtypes):
+    # A Parquet file older than the CSV is left from an earlier run without --parquet
+    if os.path.exists(parquet_path) and (not os.path.exists(csv_path)
+                                         or os.path.getmtime(parquet_path) >= os.path.getmtime(csv_path)):
+        df = pd.read_parquet(parquet_path, engine='pyarrow')
+        # Categories come back in order of first appearance across batches;
+        # sort them as astype('category') does for the CSV
+        for column in df.select_dtypes('category'):
+            df[column] = df[column].cat.reorder_categories(sorted(df[column].cat.categories))
+        return df
+    return typed_frame(pd.read_csv(csv_path), dtypes)
+
+
+def load_speech_metadata(parquet_path=SPEECH_METADATA_PARQUET, csv_path=SPEECH_METADATA_CSV):
+    """Speech metadata with typed columns, from the Parquet file if it's up to date, else the CSV."""
+    return _load(parquet_path, csv_path, SPEECH_DTYPES)
+
+
+def load_meeting_metadata(parquet_path=MEETING_METADATA_PARQUET, csv_path=MEETING_METADATA_CSV):
+    """Meeting metadata with typed columns, from the Parquet file if it's up to date, else the CSV."""
+    return _load(parquet_path, csv_path, MEETING_DTYPES)
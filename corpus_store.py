@@ -0,0 +1,246 @@
+"""
+Single-file speech corpus store.
+
+split-txt.py --output store (or both) writes every speech's text, its ATLAS.ti
+[METADATA] header and its metadata row into one SQLite database instead of (or
+as well as) tens of thousands of small .txt files. Speeches can then be fetched
+by speech_id or iterated in corpus order without walking the directory tree.
+The per-speech files are a derived view: `python corpus_store.py export`
+rewrites them from the store.
+
+Downstream scripts should read speeches with iter_speeches(), which uses the
+store when there is one and falls back to the per-speech files otherwise.
+
+Usage:
+    python corpus_store.py stats
+    python corpus_store.py show speech_00042
+    python corpus_store.py export [--speech-dir ./data/speech]
+"""
+import os
+import sqlite3
+import argparse
+import pandas as pd
+from tqdm import tqdm
+from corpus_schema import SPEECH_DTYPES, load_speech_metadata, typed_frame
+
+CORPUS_STORE_PATH = "./data/speech/corpus.sqlite"
+
+METADATA_END = "[/METADATA]\n\n"
+
+# SQLite column types for the speech metadata columns
+SQLITE_TYPES = {'Int16': 'INTEGER', 'Int32': 'INTEGER', 'boolean': 'INTEGER'}
+
+
+def _metadata_table_sql():
+    columns = ',\n'.join(
+        f"    {column} {SQLITE_TYPES.get(dtype, 'TEXT')}" + (" PRIMARY KEY" if column == 'speech_id' else "")
+        for column, dtype in SPEECH_DTYPES.items())
+    return f"CREATE TABLE IF NOT EXISTS metadata (\n{columns}\n)"
+
+
+class CorpusStoreWriter:
+    """
+    Builds a new corpus store. Speeches are streamed in with add_speech() as
+    they are extracted; the metadata rows are added in batches. The store
+    is written to a temporary file and only replaces the existing one when the
+    writer is closed without an error, so readers never see a half-built store.
+    """
+
+    def __init__(self, path=CORPUS_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        self.db = sqlite3.connect(self.tmp_path)
+        self.db.execute("PRAGMA journal_mode=OFF")
+        self.db.execute("PRAGMA synchronous=OFF")
+        self.db.execute(
+            "CREATE TABLE speeches (speech_id TEXT PRIMARY KEY, position INTEGER NOT NULL, "
+            "header TEXT NOT NULL, text TEXT NOT NULL)")
+        self.position = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc_info):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def add_speech(self, speech_id, header, text):
+        """Add one speech's [METADATA] header and text, in corpus order."""
+        self.db.execute("INSERT INTO speeches VALUES (?, ?, ?, ?)", (speech_id, self.position, header, text))
+        self.position += 1
+
+    def add_metadata(self, df):
+        """
+        Add rows of the speech metadata table (one row per speech, SPEECH_DTYPES
+        columns); can be called once per batch, in corpus order.
+        """
+        df = typed_frame(df, SPEECH_DTYPES)
+        self.db.execute(_metadata_table_sql())
+        placeholders = ', '.join('?' * len(SPEECH_DTYPES))
+        rows = df.astype(object).where(df.notna(), None).itertuples(index=False, name=None)
+        self.db.executemany(f"INSERT INTO metadata VALUES ({placeholders})", rows)
+
+    def close(self):
+        """Finish the store and move it into place."""
+        self.db.execute("CREATE INDEX IF NOT EXISTS speeches_position ON speeches (position)")
+        self.db.commit()
+        self.db.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self):
+        """Discard the partially written store, leaving any existing one untouched."""
+        self.db.close()
+        os.remove(self.tmp_path)
+
+
+class CorpusStore:
+    """
+    Read access to a corpus store: random access by speech_id, iteration in
+    corpus order, and the metadata table as a typed DataFrame.
+    """
+
+    def __init__(self, path=CORPUS_STORE_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No corpus store at {path} (run split-txt.py --output store)")
+        self.path = path
+        self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.db.row_factory = sqlite3.Row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.db.close()
+
+    def __len__(self):
+        return self.db.execute("SELECT COUNT(*) FROM speeches").fetchone()[0]
+
+    def __contains__(self, speech_id):
+        return self.db.execute("SELECT 1 FROM speeches WHERE speech_id = ?", (speech_id,)).fetchone() is not None
+
+    def get(self, speech_id):
+        """One speech's metadata plus its 'header' and 'text', or None."""
+        row = self.db.execute(
+            "SELECT m.*, s.header, s.text FROM speeches s JOIN metadata m USING (speech_id) WHERE s.speech_id = ?",
+            (speech_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def text(self, speech_id):
+        """One speech's text, or None."""
+        row = self.db.execute("SELECT text FROM speeches WHERE speech_id = ?", (speech_id,)).fetchone()
+        return row['text'] if row is not None else None
+
+    def document(self, speech_id):
+        """One speech's per-file ATLAS.ti document (header + text), or None."""
+        row = self.db.execute("SELECT header, text FROM speeches WHERE speech_id = ?", (speech_id,)).fetchone()
+        return row['header'] + row['text'] if row is not None else None
+
+    def iter_speeches(self, columns=None, **filters):
+        """
+        Yield speeches in corpus order as dicts with 'speech_id', 'text' and the
+        requested metadata columns (default: all). Keyword arguments filter on
+        metadata columns by equality, e.g. iter_speeches(session='session_70').
+        """
+        columns = list(SPEECH_DTYPES) if columns is None else list(columns)
+        unknown = (set(columns) | set(filters)) - set(SPEECH_DTYPES)
+        if unknown:
+            raise KeyError(f"Unknown metadata columns: {sorted(unknown)}")
+        selected = ', '.join(f"m.{column}" for column in columns if column != 'speech_id')
+        where = ' AND '.join(f"m.{column} = ?" for column in filters)
+        query = (f"SELECT s.speech_id, s.text{', ' + selected if selected else ''} "
+                 f"FROM speeches s JOIN metadata m USING (speech_id)"
+                 f"{' WHERE ' + where if where else ''} ORDER BY s.position")
+        for row in self.db.execute(query, list(filters.values())):
+            yield dict(row)
+
+    def metadata(self):
+        """The speech metadata table as a typed DataFrame, in corpus order."""
+        df = pd.read_sql_query(
+            "SELECT m.* FROM metadata m JOIN speeches s USING (speech_id) ORDER BY s.position", self.db)
+        return typed_frame(df, SPEECH_DTYPES)
+
+    def export(self, speech_dir=None):
+        """
+        Write every speech back out as its own ATLAS.ti .txt file. Files go to
+        their recorded output_path, or under speech_dir/<session>/ if given.
+        Returns the number of files written.
+        """
+        rows = self.db.execute(
+            "SELECT m.session, m.output_file, m.output_path, s.header, s.text "
+            "FROM speeches s JOIN metadata m USING (speech_id) ORDER BY s.position")
+        written = 0
+        for row in tqdm(rows, total=len(self), desc="Speeches"):
+            if speech_dir is None:
+                path = row['output_path']
+            else:
+                path = os.path.join(speech_dir, row['session'], row['output_file'])
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(row['header'] + row['text'])
+            written += 1
+        return written
+
+
+def iter_speeches(columns=None, store_path=CORPUS_STORE_PATH, **filters):
+    """
+    Yield speeches in corpus order as dicts with 'speech_id', 'text' and the
+    requested metadata columns, from the corpus store if it exists, otherwise
+    from the per-speech files listed in the speech metadata.
+    """
+    if os.path.exists(store_path):
+        with CorpusStore(store_path) as store:
+            yield from store.iter_speeches(columns, **filters)
+        return
+    df = load_speech_metadata()
+    for column, value in filters.items():
+        df = df[df[column] == value]
+    columns = list(SPEECH_DTYPES) if columns is None else list(columns)
+    for row in df.to_dict('records'):
+        with open(row['output_path'], 'r', encoding='utf-8') as f:
+            document = f.read()
+        speech = {'speech_id': row['speech_id'], 'text': document.split(METADATA_END, 1)[-1]}
+        speech.update((column, row[column]) for column in columns if column != 'speech_id')
+        yield speech
+
+
+def count_speeches(store_path=CORPUS_STORE_PATH):
+    """Number of speeches iter_speeches() yields without filters."""
+    if os.path.exists(store_path):
+        with CorpusStore(store_path) as store:
+            return len(store)
+    return len(load_speech_metadata())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or export the single-file speech corpus store.")
+    parser.add_argument("--store", default=CORPUS_STORE_PATH, help=f"Corpus store path (default: {CORPUS_STORE_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("stats", help="Print speech, session and word counts")
+    show_parser = subparsers.add_parser("show", help="Print one speech's ATLAS.ti document")
+    show_parser.add_argument("speech_id")
+    export_parser = subparsers.add_parser("export", help="Write the per-speech .txt files from the store")
+    export_parser.add_argument("--speech-dir", default=None,
+                               help="Write under this directory instead of each speech's recorded output_path")
+    args = parser.parse_args()
+
+    with CorpusStore(args.store) as store:
+        if args.command == "stats":
+            df = store.metadata()
+            print(f"📚 {len(store)} speeches from {df['meeting_id'].nunique()} meetings across "
+                  f"{df['session'].nunique()} sessions, {df['word_count'].sum():,} words")
+        elif args.command == "show":
+            document = store.document(args.speech_id)
+            if document is None:
+                raise SystemExit(f"No speech {args.speech_id} in {args.store}")
+            print(document)
+        elif args.command == "export":
+            written = store.export(args.speech_dir)
+            print(f"✅ Exported {written} speech files")
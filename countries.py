@@ -0,0 +1,321 @@
+"""
+Canonical country resolver shared by the pipeline: maps the country strings
+captured from speaker lines ("Cape Verde", "Sao Tomé and Principe",
+"Tanzania, United Republic of", ...) to stable ISO 3166-1 alpha-3 codes.
+
+Every name and alias in COUNTRIES is normalized once, at import, into a single
+hash table (ALIAS_CODES), so resolving a known spelling is one dict lookup.
+Normalization strips accents, case, punctuation and a leading "the", expands
+"St." and "&", and turns "X, Y" / "X (Y)" into "Y X". Strings that still don't
+match fall back to a fuzzy match against the known spellings, memoized per
+string, so each unusual variant is matched once per run.
+
+The region and membership tables (split-txt.py, membership.py) list each
+country once, by canonical name, and are re-keyed by code with by_code().
+
+Usage: python countries.py "Tanzania, United Republic of" "Cote d'Ivoire" ...
+"""
+import re
+import difflib
+import argparse
+import unicodedata
+from functools import lru_cache
+
+# =============================================================================
+# CANONICAL COUNTRY NAMES AND ALIASES
+# =============================================================================
+# Format: { ISO 3166-1 alpha-3 code: (canonical name, (aliases...)) }
+# UN Member States, the two observer states and the Cook Islands and Niue
+# (BRI partners). Canonical names follow UN General Assembly usage; aliases
+# cover older UN names and common short forms. Accents, case and punctuation
+# needn't be listed (see normalize_country).
+COUNTRIES = {
+    "AFG": ("Afghanistan", ()),
+    "ALB": ("Albania", ()),
+    "DZA": ("Algeria", ()),
+    "AND": ("Andorra", ()),
+    "AGO": ("Angola", ()),
+    "ATG": ("Antigua and Barbuda", ()),
+    "ARG": ("Argentina", ()),
+    "ARM": ("Armenia", ()),
+    "AUS": ("Australia", ()),
+    "AUT": ("Austria", ()),
+    "AZE": ("Azerbaijan", ()),
+    "BHS": ("Bahamas", ()),
+    "BHR": ("Bahrain", ()),
+    "BGD": ("Bangladesh", ()),
+    "BRB": ("Barbados", ()),
+    "BLR": ("Belarus", ()),
+    "BEL": ("Belgium", ()),
+    "BLZ": ("Belize", ()),
+    "BEN": ("Benin", ()),
+    "BTN": ("Bhutan", ()),
+    "BOL": ("Bolivia", ("Plurinational State of Bolivia", "Bolivia (Plurinational State of)")),
+    "BIH": ("Bosnia and Herzegovina", ()),
+    "BWA": ("Botswana", ()),
+    "BRA": ("Brazil", ()),
+    "BRN": ("Brunei Darussalam", ("Brunei",)),
+    "BGR": ("Bulgaria", ()),
+    "BFA": ("Burkina Faso", ()),
+    "BDI": ("Burundi", ()),
+    "CPV": ("Cabo Verde", ("Cape Verde",)),
+    "KHM": ("Cambodia", ()),
+    "CMR": ("Cameroon", ()),
+    "CAN": ("Canada", ()),
+    "CAF": ("Central African Republic", ()),
+    "TCD": ("Chad", ()),
+    "CHL": ("Chile", ()),
+    "CHN": ("China", ("People's Republic of China",)),
+    "COL": ("Colombia", ()),
+    "COM": ("Comoros", ()),
+    "COG": ("Congo", ("Republic of the Congo",)),
+    "COK": ("Cook Islands", ()),
+    "CRI": ("Costa Rica", ()),
+    "CIV": ("Côte d'Ivoire", ("Ivory Coast",)),
+    "HRV": ("Croatia", ()),
+    "CUB": ("Cuba", ()),
+    "CYP": ("Cyprus", ()),
+    "CZE": ("Czechia", ("Czech Republic",)),
+    "PRK": ("Democratic People's Republic of Korea", ("North Korea",)),
+    "COD": ("Democratic Republic of the Congo", ("Zaire",)),
+    "DNK": ("Denmark", ()),
+    "DJI": ("Djibouti", ()),
+    "DMA": ("Dominica", ()),
+    "DOM": ("Dominican Republic", ()),
+    "ECU": ("Ecuador", ()),
+    "EGY": ("Egypt", ()),
+    "SLV": ("El Salvador", ()),
+    "GNQ": ("Equatorial Guinea", ()),
+    "ERI": ("Eritrea", ()),
+    "EST": ("Estonia", ()),
+    "SWZ": ("Eswatini", ("Swaziland",)),
+    "ETH": ("Ethiopia", ()),
+    "FJI": ("Fiji", ()),
+    "FIN": ("Finland", ()),
+    "FRA": ("France", ()),
+    "GAB": ("Gabon", ()),
+    "GMB": ("Gambia", ()),
+    "GEO": ("Georgia", ()),
+    "DEU": ("Germany", ()),
+    "GHA": ("Ghana", ()),
+    "GRC": ("Greece", ()),
+    "GRD": ("Grenada", ()),
+    "GTM": ("Guatemala", ()),
+    "GIN": ("Guinea", ()),
+    "GNB": ("Guinea-Bissau", ()),
+    "GUY": ("Guyana", ()),
+    "HTI": ("Haiti", ()),
+    "VAT": ("Holy See", ()),
+    "HND": ("Honduras", ()),
+    "HUN": ("Hungary", ()),
+    "ISL": ("Iceland", ()),
+    "IND": ("India", ()),
+    "IDN": ("Indonesia", ()),
+    "IRN": ("Islamic Republic of Iran", ("Iran", "Iran (Islamic Republic of)")),
+    "IRQ": ("Iraq", ()),
+    "IRL": ("Ireland", ()),
+    "ISR": ("Israel", ()),
+    "ITA": ("Italy", ()),
+    "JAM": ("Jamaica", ()),
+    "JPN": ("Japan", ()),
+    "JOR": ("Jordan", ()),
+    "KAZ": ("Kazakhstan", ()),
+    "KEN": ("Kenya", ()),
+    "KIR": ("Kiribati", ()),
+    "KWT": ("Kuwait", ()),
+    "KGZ": ("Kyrgyzstan", ()),
+    "LAO": ("Lao People's Democratic Republic", ("Laos",)),
+    "LVA": ("Latvia", ()),
+    "LBN": ("Lebanon", ()),
+    "LSO": ("Lesotho", ()),
+    "LBR": ("Liberia", ()),
+    "LBY": ("Libya", ("Libyan Arab Jamahiriya",)),
+    "LIE": ("Liechtenstein", ()),
+    "LTU": ("Lithuania", ()),
+    "LUX": ("Luxembourg", ()),
+    "MDG": ("Madagascar", ()),
+    "MWI": ("Malawi", ()),
+    "MYS": ("Malaysia", ()),
+    "MDV": ("Maldives", ()),
+    "MLI": ("Mali", ()),
+    "MLT": ("Malta", ()),
+    "MHL": ("Marshall Islands", ()),
+    "MRT": ("Mauritania", ()),
+    "MUS": ("Mauritius", ()),
+    "MEX": ("Mexico", ()),
+    "FSM": ("Federated States of Micronesia", ("Micronesia", "Micronesia (Federated States of)")),
+    "MCO": ("Monaco", ()),
+    "MNG": ("Mongolia", ()),
+    "MNE": ("Montenegro", ()),
+    "MAR": ("Morocco", ()),
+    "MOZ": ("Mozambique", ()),
+    "MMR": ("Myanmar", ("Burma",)),
+    "NAM": ("Namibia", ()),
+    "NRU": ("Nauru", ()),
+    "NPL": ("Nepal", ()),
+    "NLD": ("Netherlands", ("Kingdom of the Netherlands",)),
+    "NZL": ("New Zealand", ()),
+    "NIC": ("Nicaragua", ()),
+    "NER": ("Niger", ()),
+    "NGA": ("Nigeria", ()),
+    "NIU": ("Niue", ()),
+    "MKD": ("North Macedonia", ("The former Yugoslav Republic of Macedonia", "Macedonia")),
+    "NOR": ("Norway", ()),
+    "OMN": ("Oman", ()),
+    "PAK": ("Pakistan", ()),
+    "PLW": ("Palau", ()),
+    "PAN": ("Panama", ()),
+    "PNG": ("Papua New Guinea", ()),
+    "PRY": ("Paraguay", ()),
+    "PER": ("Peru", ()),
+    "PHL": ("Philippines", ()),
+    "POL": ("Poland", ()),
+    "PRT": ("Portugal", ()),
+    "QAT": ("Qatar", ()),
+    "KOR": ("Republic of Korea", ("South Korea",)),
+    "MDA": ("Republic of Moldova", ("Moldova",)),
+    "ROU": ("Romania", ()),
+    "RUS": ("Russian Federation", ("Russia",)),
+    "RWA": ("Rwanda", ()),
+    "KNA": ("Saint Kitts and Nevis", ()),
+    "LCA": ("Saint Lucia", ()),
+    "VCT": ("Saint Vincent and the Grenadines", ()),
+    "WSM": ("Samoa", ()),
+    "SMR": ("San Marino", ()),
+    "STP": ("Sao Tome and Principe", ("Sao Tome",)),
+    "SAU": ("Saudi Arabia", ()),
+    "SEN": ("Senegal", ()),
+    "SRB": ("Serbia", ()),
+    "SYC": ("Seychelles", ()),
+    "SLE": ("Sierra Leone", ()),
+    "SGP": ("Singapore", ()),
+    "SVK": ("Slovakia", ()),
+    "SVN": ("Slovenia", ()),
+    "SLB": ("Solomon Islands", ()),
+    "SOM": ("Somalia", ()),
+    "ZAF": ("South Africa", ()),
+    "SSD": ("South Sudan", ()),
+    "ESP": ("Spain", ()),
+    "LKA": ("Sri Lanka", ()),
+    "PSE": ("State of Palestine", ("Palestine",)),
+    "SDN": ("Sudan", ()),
+    "SUR": ("Suriname", ()),
+    "SWE": ("Sweden", ()),
+    "CHE": ("Switzerland", ()),
+    "SYR": ("Syrian Arab Republic", ("Syria",)),
+    "TJK": ("Tajikistan", ()),
+    "THA": ("Thailand", ()),
+    "TLS": ("Timor-Leste", ("East Timor",)),
+    "TGO": ("Togo", ()),
+    "TON": ("Tonga", ()),
+    "TTO": ("Trinidad and Tobago", ()),
+    "TUN": ("Tunisia", ()),
+    "TUR": ("Türkiye", ("Turkey",)),
+    "TKM": ("Turkmenistan", ()),
+    "TUV": ("Tuvalu", ()),
+    "UGA": ("Uganda", ()),
+    "UKR": ("Ukraine", ()),
+    "ARE": ("United Arab Emirates", ()),
+    "GBR": ("United Kingdom", ("United Kingdom of Great Britain and Northern Ireland",)),
+    "TZA": ("United Republic of Tanzania", ("Tanzania",)),
+    "USA": ("United States of America", ("United States",)),
+    "URY": ("Uruguay", ()),
+    "UZB": ("Uzbekistan", ()),
+    "VUT": ("Vanuatu", ()),
+    "VEN": ("Bolivarian Republic of Venezuela", ("Venezuela", "Venezuela (Bolivarian Republic of)")),
+    "VNM": ("Viet Nam", ("Vietnam",)),
+    "YEM": ("Yemen", ()),
+    "ZMB": ("Zambia", ()),
+    "ZWE": ("Zimbabwe", ()),
+}
+
+# Minimum difflib similarity for the fuzzy fallback; high enough that Niger,
+# Nigeria, Guinea and Guyana never match each other
+FUZZY_CUTOFF = 0.9
+
+_INVERTED_PATTERN = re.compile(r'^(.+?)\s*(?:,\s*(.+)|\((.+)\))$')
+_PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+
+
+def normalize_country(name):
+    """Lookup key for a country string: unaccented, casefolded, without punctuation or a leading "the"."""
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(c for c in name if not unicodedata.combining(c)).casefold().strip()
+    # "Tanzania, United Republic of" / "Iran (Islamic Republic of)" -> "United Republic of Tanzania"
+    match = _INVERTED_PATTERN.match(name)
+    if match:
+        name = f"{match.group(2) or match.group(3)} {match.group(1)}"
+    name = name.replace('&', ' and ').replace('-', ' ')
+    tokens = _PUNCTUATION_PATTERN.sub('', name).split()
+    if tokens and tokens[0] == 'the':
+        tokens = tokens[1:]
+    return ' '.join('saint' if token == 'st' else token for token in tokens)
+
+
+def _build_alias_codes():
+    alias_codes = {}
+    for code, (name, aliases) in COUNTRIES.items():
+        for alias in (name, *aliases):
+            key = normalize_country(alias)
+            if alias_codes.setdefault(key, code) != code:
+                raise ValueError(f"'{alias}' is listed for both {alias_codes[key]} and {code}")
+    return alias_codes
+
+
+# Normalized name or alias -> ISO code, built once at import. Codes are left
+# out, as lowercased codes such as "and" or "can" are also ordinary words
+ALIAS_CODES = _build_alias_codes()
+
+
+@lru_cache(maxsize=None)
+def _fuzzy_code(key):
+    matches = difflib.get_close_matches(key, ALIAS_CODES, n=1, cutoff=FUZZY_CUTOFF)
+    return ALIAS_CODES[matches[0]] if matches else None
+
+
+@lru_cache(maxsize=None)
+def country_code(name, fuzzy=True):
+    """
+    ISO 3166-1 alpha-3 code of a country name or alias, or None if unknown.
+    A code is only accepted as written (upper-case), e.g. "CAN" but not "can".
+    """
+    if not name or not isinstance(name, str):
+        return None
+    if name in COUNTRIES:
+        return name
+    key = normalize_country(name)
+    code = ALIAS_CODES.get(key)
+    if code is None and fuzzy:
+        code = _fuzzy_code(key)
+    return code
+
+
+def country_name(code):
+    """Canonical name for an ISO code, or None."""
+    entry = COUNTRIES.get(code)
+    return entry[0] if entry else None
+
+
+def by_code(table):
+    """
+    Re-key a {country name: value} table by ISO code. Names must resolve exactly
+    (no fuzzy matching), and each country may only be listed once.
+    """
+    result = {}
+    for name, value in table.items():
+        code = country_code(name, fuzzy=False)
+        if code is None:
+            raise KeyError(f"Unknown country: {name}")
+        if code in result:
+            raise ValueError(f"{name} ({code}) is listed more than once")
+        result[code] = value
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Resolve country strings to ISO codes.")
+    parser.add_argument("names", nargs="+", help="Country strings, e.g. 'Tanzania, United Republic of'")
+    args = parser.parse_args()
+    for name in args.names:
+        code = country_code(name)
+        print(f"  {name}: {code} ({country_name(code)})" if code else f"  {name}: unknown")
@@ -0,0 +1,211 @@
+"""
+Streaming sparse document-term matrix over the speech corpus.
+
+Speeches are read with corpus_store.iter_speeches() (the corpus store, or the
+per-speech files) and processed in fixed-size shards, so only one shard's
+tokens are ever held in memory. Each shard is tokenized (speech_tokens.py),
+turned into n-gram counts and emitted as a SciPy CSR matrix, either
+  - vocab-mapped: each shard has its own vocabulary, remapped to a global
+    one when the shards are merged, or
+  - hashed (--hash-features N): each n-gram goes to column crc32(n-gram) % N,
+    so shards need no merging step and memory is bounded by N.
+With --workers, shards are built in a process pool (at most two shards per
+worker in flight) and merged in corpus order, so the result doesn't depend
+on the number of workers. N-grams never span sentence or clause punctuation.
+
+After merging, columns outside the document-frequency bounds are pruned.
+
+Outputs, in data/dtm/:
+  - dtm.npz: the CSR matrix (scipy.sparse.save_npz), one row per speech
+  - dtm_index.npz: 'speech_ids' (row labels), 'features' (n-grams, or hash
+    buckets), 'document_frequency', and 'mode'
+Load both with load_dtm().
+
+Usage: python doc_term_matrix.py [--ngrams 1 2] [--min-df 5] [--max-df 0.9] [--workers 4]
+"""
+import os
+import zlib
+import argparse
+import multiprocessing
+from collections import Counter, deque
+import numpy as np
+from scipy import sparse  # type: ignore[import-untyped]
+from tqdm import tqdm
+from corpus_schema import load_speech_metadata
+from corpus_store import iter_speeches
+from speech_tokens import tokenize
+
+dtm_dir = "./data/dtm"
+dtm_path = "./data/dtm/dtm.npz"
+dtm_index_path = "./data/dtm/dtm_index.npz"
+
+DEFAULT_SHARD_SIZE = 500  # Speeches per shard
+
+BOUNDARY_TOKENS = frozenset('.;:!?')
+
+
+def ngrams(text, ngram_range=(1, 1)):
+    """All n-grams of text for n in ngram_range (inclusive), as space-joined strings."""
+    low, high = ngram_range
+    grams = []
+    segment = []
+    # Split at punctuation so n-grams stay within a clause
+    for token in tokenize(text, boundaries=True) + ['.']:
+        if token not in BOUNDARY_TOKENS:
+            segment.append(token)
+            continue
+        for n in range(low, high + 1):
+            if n == 1:
+                grams.extend(segment)
+            else:
+                grams.extend(' '.join(segment[i:i + n]) for i in range(len(segment) - n + 1))
+        segment = []
+    return grams
+
+
+def build_shard(texts, ngram_range=(1, 1), hash_features=None):
+    """
+    (CSR count matrix, features) for a list of texts. Features are the shard's
+    n-gram vocabulary in column order, or None when hashing.
+    """
+    vocabulary = {}
+    indptr = [0]
+    indices = []
+    data = []
+    for text in texts:
+        counts = Counter(ngrams(text, ngram_range))
+        if hash_features:
+            # Hash collisions within a speech add up
+            row = Counter()
+            for gram, count in counts.items():
+                row[zlib.crc32(gram.encode('utf-8')) % hash_features] += count
+            counts = row
+        else:
+            counts = Counter({vocabulary.setdefault(gram, len(vocabulary)): count for gram, count in counts.items()})
+        indices.extend(counts.keys())
+        data.extend(counts.values())
+        indptr.append(len(indices))
+    n_columns = hash_features if hash_features else len(vocabulary)
+    matrix = sparse.csr_matrix((np.array(data, dtype=np.int32), np.array(indices, dtype=np.int64),
+                                np.array(indptr, dtype=np.int64)), shape=(len(texts), n_columns))
+    matrix.sort_indices()
+    return matrix, None if hash_features else list(vocabulary)
+
+
+def _build_shard_job(job):
+    """Pool entry point: job is (texts, ngram_range, hash_features)."""
+    return build_shard(*job)
+
+
+def iter_shards(speeches, shard_size):
+    """Group an iterable of speeches into lists of at most shard_size."""
+    shard = []
+    for speech in speeches:
+        shard.append(speech)
+        if len(shard) == shard_size:
+            yield shard
+            shard = []
+    if shard:
+        yield shard
+
+
+def build_dtm(ngram_range=(1, 1), hash_features=None, min_df=1, max_df=1.0,
+              shard_size=DEFAULT_SHARD_SIZE, workers=1):
+    """
+    Build the document-term matrix for every speech.
+    Returns (CSR matrix, speech_ids, features, document frequencies).
+    """
+    total = len(load_speech_metadata())
+    speech_ids = []
+    global_vocabulary = {}
+    shard_matrices = []
+
+    def merge(result):
+        matrix, features = result
+        if features is not None:
+            # Remap the shard's column ids onto the global vocabulary
+            mapping = np.fromiter((global_vocabulary.setdefault(feature, len(global_vocabulary)) for feature in features),
+                                  dtype=np.int64, count=len(features))
+            matrix = sparse.csr_matrix((matrix.data, mapping[matrix.indices], matrix.indptr),
+                                       shape=(matrix.shape[0], len(global_vocabulary)))
+        shard_matrices.append(matrix)
+        progress.update(matrix.shape[0])
+
+    def jobs():
+        for shard in iter_shards(iter_speeches(columns=[]), shard_size):
+            speech_ids.extend(speech['speech_id'] for speech in shard)
+            yield [speech['text'] for speech in shard], ngram_range, hash_features
+
+    with tqdm(total=total, desc="Speeches") as progress:
+        if workers > 1:
+            with multiprocessing.Pool(workers) as pool:
+                pending = deque()
+                for job in jobs():
+                    pending.append(pool.apply_async(_build_shard_job, (job,)))
+                    # Bound memory: at most two shards per worker waiting or in flight
+                    if len(pending) >= 2 * workers:
+                        merge(pending.popleft().get())
+                while pending:
+                    merge(pending.popleft().get())
+        else:
+            for job in jobs():
+                merge(_build_shard_job(job))
+
+    n_columns = hash_features if hash_features else len(global_vocabulary)
+    shard_matrices = [sparse.csr_matrix((m.data, m.indices, m.indptr), shape=(m.shape[0], n_columns))
+                      for m in shard_matrices]
+    matrix = sparse.vstack(shard_matrices, format='csr') if shard_matrices \
+        else sparse.csr_matrix((0, n_columns), dtype=np.int32)
+    if hash_features:
+        features = np.arange(hash_features)
+    else:
+        features = np.array(list(global_vocabulary), dtype=object)
+
+    # Document-frequency pruning (each row holds each column at most once)
+    document_frequency = np.bincount(matrix.indices, minlength=n_columns)
+    keep = (document_frequency >= min_df) & (document_frequency <= max_df * matrix.shape[0])
+    matrix = matrix[:, np.flatnonzero(keep)]
+    matrix.sort_indices()
+    return matrix, np.array(speech_ids, dtype=object), features[keep], document_frequency[keep]
+
+
+def save_dtm(matrix, speech_ids, features, document_frequency, mode):
+    """Write the matrix and its row/column labels to dtm_dir."""
+    os.makedirs(dtm_dir, exist_ok=True)
+    sparse.save_npz(dtm_path, matrix)
+    np.savez(dtm_index_path, speech_ids=speech_ids.astype(str),
+             features=features if mode == 'hash' else features.astype(str),
+             document_frequency=document_frequency, mode=mode)
+
+
+def load_dtm(matrix_path=dtm_path, index_path=dtm_index_path):
+    """(CSR matrix, speech_ids, features, document frequencies) saved by save_dtm()."""
+    index = np.load(index_path)
+    return sparse.load_npz(matrix_path).tocsr(), index['speech_ids'], index['features'], index['document_frequency']
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build a sparse document-term matrix over all speeches.")
+    parser.add_argument("--ngrams", type=int, nargs=2, default=[1, 1], metavar=("MIN", "MAX"),
+                        help="Range of n-gram lengths, inclusive (default: 1 1)")
+    parser.add_argument("--hash-features", type=int, default=None,
+                        help="Hash n-grams into this many columns instead of building a vocabulary")
+    parser.add_argument("--min-df", type=int, default=1,
+                        help="Drop features found in fewer than this many speeches (default: 1)")
+    parser.add_argument("--max-df", type=float, default=1.0,
+                        help="Drop features found in more than this fraction of speeches (default: 1.0)")
+    parser.add_argument("--shard-size", type=int, default=DEFAULT_SHARD_SIZE,
+                        help=f"Speeches per shard (default: {DEFAULT_SHARD_SIZE})")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes building shards (default: 1, serial)")
+    args = parser.parse_args()
+
+    mode = 'hash' if args.hash_features else 'vocab'
+    matrix, speech_ids, features, document_frequency = build_dtm(
+        ngram_range=tuple(args.ngrams), hash_features=args.hash_features, min_df=args.min_df,
+        max_df=args.max_df, shard_size=args.shard_size, workers=args.workers)
+    save_dtm(matrix, speech_ids, features, document_frequency, mode)
+    print(f"\n✅ {matrix.shape[0]} speeches x {matrix.shape[1]:,} features ({mode}), "
+          f"{matrix.nnz:,} non-zeros, {int(matrix.sum()):,} n-grams")
+    print(f"📊 Matrix saved to: {dtm_path}")
+    print(f"📊 Row and column labels saved to: {dtm_index_path}")
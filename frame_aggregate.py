@@ -0,0 +1,134 @@
+"""
+Frame-prevalence cross-tabs by year, region and Chinese-led organization membership.
+
+Takes the (speech x frame) hit counts written by frame_lexicon.py and the speech
+metadata, and computes for every cell of every grouping (year, region,
+year x region, and each of those split by <org>_at_speech):
+  - speeches, words: how many speeches / words fall in the cell
+  - hits: total frame hits
+  - speeches_with_frame: speeches with at least one hit
+  - rate_per_1000_words: hits per 1,000 words
+  - share_of_speeches: speeches_with_frame / speeches
+
+Every grouping is expressed as a sparse (cell x speech) indicator matrix; the
+matrices are stacked and multiplied with the count matrix once, so all
+cross-tabs for all frames come out of a single sparse product.
+
+Output is a tidy long table (one row per cell and frame) in frame_prevalence.csv,
+with NA in the year/region/org/member columns a grouping doesn't use.
+
+Usage: python frame_aggregate.py [--counts ./data/frames/frame_counts.csv]
+"""
+import time
+import argparse
+from itertools import combinations
+import numpy as np
+import pandas as pd
+from scipy import sparse  # type: ignore[import-untyped]
+from corpus_schema import load_speech_metadata
+from frame_lexicon import METADATA_COLUMNS, frame_counts_csv
+from membership import MEMBERSHIP_ORGS
+
+frame_prevalence_csv = "./data/frames/frame_prevalence.csv"
+
+# Dimensions a cross-tab can group by; every non-empty combination of
+# year/region, with and without one membership flag, is computed
+GROUP_DIMENSIONS = ['year', 'region']
+MEMBERSHIP_FLAGS = [f'{org}_at_speech' for org in MEMBERSHIP_ORGS]
+
+
+def list_groupings():
+    """Every grouping as a tuple of metadata columns, e.g. ('year', 'region', 'focac_at_speech')."""
+    base = [combo for size in range(0, len(GROUP_DIMENSIONS) + 1) for combo in combinations(GROUP_DIMENSIONS, size)]
+    groupings = [combo for combo in base if combo]
+    groupings += [combo + (flag,) for flag in MEMBERSHIP_FLAGS for combo in base]
+    return groupings
+
+
+def indicator_matrix(metadata, groupings):
+    """
+    Stacked sparse (cell x speech) indicator matrix over all groupings, and a
+    DataFrame describing each cell (grouping, year, region, org, member).
+    Speeches with a missing value in a grouping's columns aren't in any of its cells.
+    """
+    n_speeches = len(metadata)
+    blocks = []
+    cells = []
+    offset = 0
+    for grouping in groupings:
+        grouped = metadata.groupby(list(grouping), observed=True, sort=True, dropna=True)
+        codes = grouped.ngroup().to_numpy()
+        keys = grouped.size().index.to_frame(index=False)
+        in_cell = codes >= 0
+        blocks.append((codes[in_cell] + offset, np.flatnonzero(in_cell)))
+        cell = pd.DataFrame({'grouping': ' x '.join(grouping)}, index=range(len(keys)))
+        cell['year'] = keys['year'] if 'year' in grouping else pd.NA
+        cell['region'] = keys['region'] if 'region' in grouping else pd.NA
+        flag = next((column for column in grouping if column in MEMBERSHIP_FLAGS), None)
+        cell['org'] = flag.removesuffix('_at_speech') if flag else pd.NA
+        cell['member'] = keys[flag] if flag else pd.NA
+        cells.append(cell)
+        offset += len(keys)
+    rows = np.concatenate([rows for rows, _ in blocks])
+    columns = np.concatenate([columns for _, columns in blocks])
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.int64), (rows, columns)), shape=(offset, n_speeches))
+    return matrix, pd.concat(cells, ignore_index=True)
+
+
+def aggregate_frames(counts, metadata, groupings=None):
+    """
+    Frame prevalence for every cell of every grouping, as a long DataFrame.
+    counts: DataFrame with a speech_id column and one hit-count column per frame.
+    metadata: speech metadata with speech_id, word_count and the grouping columns.
+    """
+    groupings = list_groupings() if groupings is None else groupings
+    frames = [column for column in counts.columns if column != 'speech_id']
+    metadata = metadata.merge(counts[['speech_id']], on='speech_id', how='inner', validate='one_to_one')
+    counts = counts.set_index('speech_id').loc[metadata['speech_id'], frames]
+
+    hits = sparse.csr_matrix(counts.to_numpy(dtype=np.int64))
+    present = (hits > 0).astype(np.int64)
+    words = metadata['word_count'].to_numpy(dtype=np.int64, na_value=0)[:, None]
+    speeches = np.ones((len(metadata), 1), dtype=np.int64)
+    # One product for every cell: [hits | speeches with frame | words | speeches]
+    indicators, cells = indicator_matrix(metadata, groupings)
+    totals = (indicators @ sparse.hstack([hits, present, words, speeches], format='csr')).toarray()
+    n_frames = len(frames)
+    cell_hits = totals[:, :n_frames]
+    cell_present = totals[:, n_frames:2 * n_frames]
+    cell_words = totals[:, 2 * n_frames]
+    cell_speeches = totals[:, 2 * n_frames + 1]
+
+    result = cells.loc[cells.index.repeat(n_frames)].reset_index(drop=True)
+    result['frame'] = np.tile(frames, len(cells))
+    result['speeches'] = np.repeat(cell_speeches, n_frames)
+    result['words'] = np.repeat(cell_words, n_frames)
+    result['hits'] = cell_hits.ravel()
+    result['speeches_with_frame'] = cell_present.ravel()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['rate_per_1000_words'] = np.where(result['words'] > 0, result['hits'] * 1000 / result['words'], np.nan)
+        result['share_of_speeches'] = np.where(result['speeches'] > 0,
+                                               result['speeches_with_frame'] / result['speeches'], np.nan)
+    result['year'] = result['year'].astype('Int16')
+    result['member'] = result['member'].astype('boolean')
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cross-tabulate frame prevalence by year, region and membership.")
+    parser.add_argument("--counts", default=frame_counts_csv,
+                        help=f"Per-speech frame counts from frame_lexicon.py (default: {frame_counts_csv})")
+    parser.add_argument("--output", default=frame_prevalence_csv,
+                        help=f"Long-format output table (default: {frame_prevalence_csv})")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    frame_counts = pd.read_csv(args.counts)
+    frame_counts = frame_counts.drop(columns=[column for column in METADATA_COLUMNS if column != 'speech_id'])
+    groupings = list_groupings()
+    prevalence = aggregate_frames(frame_counts, load_speech_metadata(), groupings)
+    prevalence.to_csv(args.output, index=False)
+    elapsed = time.perf_counter() - started
+    print(f"✅ {len(prevalence):,} rows: {len(groupings)} groupings x {prevalence['frame'].nunique()} frames "
+          f"in {elapsed:.2f}s")
+    print(f"📊 Frame prevalence saved to: {args.output}")
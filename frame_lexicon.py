@@ -0,0 +1,220 @@
+"""
+Frame-prevalence counting with a compiled frame lexicon.
+
+The lexicon (frame-lexicon.csv) maps each normative frame to the phrases and
+variants that signal it, e.g. win_win -> "win-win cooperation", "mutual benefit".
+All phrases are compiled into one token-level Aho-Corasick automaton, so each
+speech is tokenized and scanned exactly once, however many phrases there are.
+Matching on tokens (see speech_tokens.py) makes it case-insensitive, respects
+word boundaries, and treats "win-win", "win–win" and "win win" alike. Phrases
+never match across sentence or clause punctuation.
+
+Within a frame, overlapping matches are resolved leftmost-longest, so
+"community with a shared future for mankind" counts once for shared_future,
+not three times. A phrase may still count towards several frames.
+
+Outputs (with each speech's metadata, read along with its text):
+  - frame_counts.csv: one row per speech, one hit-count column per frame
+  - frame_hits.csv: one row per hit, with the matched phrase and its
+    character offsets in the speech text
+
+Usage: python frame_lexicon.py [--workers N] [--lexicon frame-lexicon.csv]
+"""
+import os
+import csv
+import argparse
+import multiprocessing
+from collections import deque
+from contextlib import nullcontext
+import pandas as pd
+from tqdm import tqdm
+from corpus_schema import SPEECH_DTYPES
+from corpus_store import count_speeches, iter_speeches
+from speech_tokens import token_spans, tokenize
+
+FRAME_LEXICON_PATH = "./frame-lexicon.csv"
+frames_dir = "./data/frames"
+frame_counts_csv = "./data/frames/frame_counts.csv"
+frame_hits_csv = "./data/frames/frame_hits.csv"
+
+# Speech metadata carried into frame_counts.csv
+METADATA_COLUMNS = ['speech_id', 'meeting_id', 'session', 'year', 'country', 'region', 'language', 'word_count']
+
+
+def load_lexicon(path=FRAME_LEXICON_PATH):
+    """List of (frame, phrase) pairs from a lexicon CSV with 'frame' and 'phrase' columns."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        return [(row['frame'].strip(), row['phrase'].strip()) for row in csv.DictReader(f)
+                if row['frame'].strip() and row['phrase'].strip()]
+
+
+class FrameMatcher:
+    """
+    Token-level Aho-Corasick automaton over every phrase in a frame lexicon.
+
+    The automaton is compiled into a full transition table (one dict per state,
+    holding only the transitions that don't lead back to the root), so scanning
+    costs one dict lookup per token.
+    """
+
+    def __init__(self, lexicon):
+        self.frames = list(dict.fromkeys(frame for frame, _ in lexicon))
+        frame_index = {frame: i for i, frame in enumerate(self.frames)}
+        self.phrases = []  # (frame index, phrase, length in tokens)
+        goto = [{}]
+        outputs = [[]]
+        seen = set()
+        for frame, phrase in lexicon:
+            tokens = tuple(tokenize(phrase))
+            if not tokens:
+                raise ValueError(f"Lexicon phrase {phrase!r} ({frame}) has no tokens")
+            if (frame, tokens) in seen:
+                continue
+            seen.add((frame, tokens))
+            state = 0
+            for token in tokens:
+                if token not in goto[state]:
+                    goto.append({})
+                    outputs.append([])
+                    goto[state][token] = len(goto) - 1
+                state = goto[state][token]
+            outputs[state].append(len(self.phrases))
+            self.phrases.append((frame_index[frame], phrase, len(tokens)))
+
+        # Failure links in breadth-first order; each state's transition table
+        # extends that of its failure state, and its outputs include its failure state's
+        fail = [0] * len(goto)
+        delta = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for token, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(token, 0)
+                outputs[child] = outputs[child] + outputs[fail[child]]
+                queue.append(child)
+            delta[state] = {**delta[fail[state]], **goto[state]}
+        self.delta = delta
+        self.outputs = outputs
+
+    def find(self, text):
+        """
+        Frame hits in text as (frame index, phrase index, start, end) tuples in
+        text order, with start/end character offsets into text.
+        """
+        # Punctuation tokens never continue a phrase, so they reset the automaton
+        tokens = tokenize(text, boundaries=True)
+        delta, outputs, phrases = self.delta, self.outputs, self.phrases
+        matches = []  # (frame index, first token, last token, phrase index)
+        state = 0
+        for i, token in enumerate(tokens):
+            state = delta[state].get(token, 0)
+            if outputs[state]:
+                for phrase_index in outputs[state]:
+                    frame_index, _, length = phrases[phrase_index]
+                    matches.append((frame_index, i - length + 1, i, phrase_index))
+        if not matches:
+            return []
+
+        # Leftmost-longest, non-overlapping within each frame
+        matches.sort(key=lambda m: (m[0], m[1], -m[2]))
+        spans = token_spans(text, boundaries=True)
+        hits = []
+        last_frame, last_end = -1, -1
+        for frame_index, first, last, phrase_index in matches:
+            if frame_index != last_frame:
+                last_frame, last_end = frame_index, -1
+            if first > last_end:
+                hits.append((frame_index, phrase_index, spans[first][0], spans[last][1]))
+                last_end = last
+        hits.sort(key=lambda hit: (hit[2], hit[0]))
+        return hits
+
+    def count(self, text):
+        """Hit count per frame (in self.frames order) for text."""
+        counts = [0] * len(self.frames)
+        for frame_index, _, _, _ in self.find(text):
+            counts[frame_index] += 1
+        return counts
+
+
+_matcher = None  # Compiled once per pool worker
+
+
+def _init_worker(lexicon):
+    global _matcher
+    _matcher = FrameMatcher(lexicon)
+
+
+def _scan_speech(speech):
+    """(speech_id, counts per frame, hits) for one speech (runs in pool workers)."""
+    assert _matcher is not None
+    speech_id, text = speech
+    hits = _matcher.find(text)
+    counts = [0] * len(_matcher.frames)
+    for frame_index, _, _, _ in hits:
+        counts[frame_index] += 1
+    return speech_id, counts, [(frame_index, phrase_index, start, end, text[start:end])
+                               for frame_index, phrase_index, start, end in hits]
+
+
+def count_frames(workers=1, lexicon_path=FRAME_LEXICON_PATH):
+    """
+    Scan every speech for the frames in the lexicon and write frame_counts.csv
+    and frame_hits.csv. With workers > 1, speeches are scanned in a process pool.
+    """
+    lexicon = load_lexicon(lexicon_path)
+    _init_worker(lexicon)
+    matcher = _matcher
+    assert matcher is not None
+    print(f"Compiled {len(matcher.phrases)} phrases for {len(matcher.frames)} frames "
+          f"into {len(matcher.delta)} automaton states")
+
+    # Metadata rows are collected as the speeches are read, so the counts and
+    # their metadata always come from the same source (corpus store or files)
+    metadata_rows = []
+
+    def speeches():
+        for speech in iter_speeches(columns=METADATA_COLUMNS):
+            text = speech.pop('text')
+            metadata_rows.append(speech)
+            yield speech['speech_id'], text
+
+    os.makedirs(frames_dir, exist_ok=True)
+    counts = {}
+    total_hits = 0
+    with open(frame_hits_csv, 'w', encoding='utf-8', newline='') as hits_f, \
+            (multiprocessing.Pool(workers, initializer=_init_worker, initargs=(lexicon,))
+             if workers > 1 else nullcontext()) as pool:
+        writer = csv.writer(hits_f)
+        writer.writerow(['speech_id', 'frame', 'phrase', 'start', 'end', 'matched_text'])
+        results = pool.imap(_scan_speech, speeches(), chunksize=16) if pool else map(_scan_speech, speeches())
+        for speech_id, speech_counts, hits in tqdm(results, total=count_speeches(), desc="Speeches"):
+            counts[speech_id] = speech_counts
+            total_hits += len(hits)
+            writer.writerows((speech_id, matcher.frames[frame_index], matcher.phrases[phrase_index][1],
+                              start, end, matched_text)
+                             for frame_index, phrase_index, start, end, matched_text in hits)
+
+    df_counts = pd.DataFrame.from_dict(counts, orient='index', columns=matcher.frames)
+    df_counts.index.name = 'speech_id'
+    metadata = pd.DataFrame(metadata_rows, columns=METADATA_COLUMNS)
+    metadata = metadata.astype({column: SPEECH_DTYPES[column] for column in METADATA_COLUMNS})
+    df = metadata.merge(df_counts, left_on='speech_id', right_index=True, how='left')
+    df[matcher.frames] = df[matcher.frames].fillna(0).astype(int)
+    df.to_csv(frame_counts_csv, index=False)
+
+    print(f"\n✅ Found {total_hits:,} frame hits in {len(counts)} speeches")
+    for frame in matcher.frames:
+        print(f"   {frame}: {df[frame].sum():,} hits in {(df[frame] > 0).sum()} speeches")
+    print(f"📊 Frame counts saved to: {frame_counts_csv}")
+    print(f"📊 Frame hits saved to: {frame_hits_csv}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count frame-lexicon hits in every speech.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes used to scan speeches (default: 1, serial)")
+    parser.add_argument("--lexicon", default=FRAME_LEXICON_PATH,
+                        help=f"Frame lexicon CSV with frame,phrase columns (default: {FRAME_LEXICON_PATH})")
+    args = parser.parse_args()
+    count_frames(workers=args.workers, lexicon_path=args.lexicon)
@@ -0,0 +1,89 @@
+"""
+On-disk HTTP cache for the UN Digital Library requests made by undl-fetch.py.
+
+For each URL it keeps the response validators (ETag / Last-Modified) and
+Content-Length, and optionally the response body. Later requests for the same
+URL send If-None-Match / If-Modified-Since, so an unchanged resource comes back
+as an empty 304 instead of being transferred again.
+"""
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+HTTP_CACHE_DIR = "./data/http-cache"
+
+
+class HttpCache:
+    """
+    Response validators and bodies stored under cache_dir, one pair of files per URL:
+    <sha256(url)>.json for the metadata and <sha256(url)>.body for the body (if kept).
+    Writes are atomic, so the cache is safe to share between threads.
+    """
+
+    def __init__(self, cache_dir=HTTP_CACHE_DIR):
+        self.cache_dir = cache_dir
+
+    def _path(self, url, suffix):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key[:2], key + suffix)
+
+    def _write(self, path, data):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def metadata(self, url):
+        """Stored metadata for a URL (etag, last_modified, content_length, fetched_at), or None."""
+        try:
+            with open(self._path(url, '.json'), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def body(self, url):
+        """Stored response body for a URL, or None if it wasn't kept."""
+        try:
+            with open(self._path(url, '.body'), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def conditional_headers(self, url):
+        """If-None-Match / If-Modified-Since headers for revalidating a cached URL (empty if not cached)."""
+        metadata = self.metadata(url)
+        headers = {}
+        if metadata:
+            if metadata.get('etag'):
+                headers['If-None-Match'] = metadata['etag']
+            if metadata.get('last_modified'):
+                headers['If-Modified-Since'] = metadata['last_modified']
+        return headers
+
+    def store(self, url, response, body=None, content_length=None):
+        """
+        Record a response's validators, and its body if given.
+        content_length overrides the response's Content-Length (e.g. the full size
+        of a resource fetched with a Range request).
+        Responses without an ETag or Last-Modified can't be revalidated, so they aren't cached.
+        """
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        if not etag and not last_modified:
+            return
+        if content_length is None:
+            header = response.headers.get('Content-Length')
+            content_length = int(header) if header and header.isdigit() else None
+        metadata = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'content_length': content_length,
+            'fetched_at': datetime.now().isoformat(),
+        }
+        if body is not None:
+            self._write(self._path(url, '.body'), body)
+        self._write(self._path(url, '.json'), json.dumps(metadata).encode('utf-8'))
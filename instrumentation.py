@@ -0,0 +1,228 @@
+"""
+Per-stage and per-file instrumentation for the pipeline scripts
+(undl-fetch.py, pdf-to-full-txt.py, split-txt.py), switched on with --metrics.
+
+For each stage it records wall and CPU time (including worker processes),
+peak RSS, and the files and bytes read and written; for each file (PDF
+downloaded, PDF converted, meeting extracted and written) it records wall
+time, the CPU time of the thread or pool worker that did the work (not
+measured for PDFs converted in isolated processes), bytes and status.
+Records are appended as JSON lines to data/metrics.jsonl, tagged with a run
+id, and the slowest files of the run are printed at the end.
+
+When switched off (the default), every call returns immediately: timed()
+hands out a shared no-op context and record_file() is a single attribute check.
+
+Usage:
+    python split-txt.py --metrics
+    python instrumentation.py report [--top 20] [--stage convert] [--run all]
+"""
+import os
+import json
+import time
+import argparse
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None  # type: ignore[assignment]
+
+METRICS_PATH = "./data/metrics.jsonl"
+DEFAULT_TOP = 10
+
+
+def peak_rss_bytes():
+    """Peak resident set size of this process and of its finished child processes, in bytes (None if unknown)."""
+    if resource is None:
+        return None
+    self_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux
+    return max(self_rss, children_rss) * 1024
+
+
+def children_cpu_seconds():
+    """User + system CPU time of finished child processes (e.g. pool workers)."""
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def timed_call(func, *args):
+    """
+    (func(*args), wall seconds, CPU seconds). A module-level function, so it can
+    wrap work sent to pool workers: pool.imap(partial(timed_call, func), jobs).
+    """
+    started, started_cpu = time.perf_counter(), time.process_time()
+    result = func(*args)
+    return result, time.perf_counter() - started, time.process_time() - started_cpu
+
+
+class _FileTimer:
+    """Context manager for Instrumentation.timed(); yields the record to add fields to."""
+
+    def __init__(self, metrics, path, step):
+        self.metrics = metrics
+        self.record = {'file': path, 'step': step}
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.started_cpu = time.thread_time()
+        return self.record
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is not None:
+            self.record.setdefault('status', f"error: {exc_type.__name__}")
+        self.metrics.record_file(wall=time.perf_counter() - self.started,
+                                 cpu=time.thread_time() - self.started_cpu, **self.record)
+        return False
+
+
+class _NullTimer:
+    """Shared no-op stand-in for _FileTimer when instrumentation is off."""
+
+    def __enter__(self):
+        # A fresh, discarded record per use, as threads share this timer
+        return {}
+
+    def __exit__(self, exc_type, exc, traceback):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Instrumentation:
+    """
+    Collects stage and file records for one run and appends them to a JSON lines
+    file. Safe to use from several threads. With enabled=False, nothing is
+    recorded or written.
+    """
+
+    def __init__(self, path=METRICS_PATH, enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.run_id = datetime.now().strftime("%Y%m%dT%H%M%S") + f"-{os.getpid()}"
+        self.files = []  # File records of this run
+        self.current_stage = None
+        self.lock = threading.Lock()
+
+    def _write(self, record):
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(record) + '\n')
+
+    @contextmanager
+    def stage(self, name):
+        """Time a whole stage (e.g. 'convert') and record its totals when it ends."""
+        if not self.enabled:
+            yield
+            return
+        self.current_stage = name
+        first_file = len(self.files)
+        started, started_cpu = time.perf_counter(), time.process_time()
+        started_children_cpu = children_cpu_seconds()
+        try:
+            yield
+        finally:
+            files = self.files[first_file:]
+            record = {
+                'type': 'stage', 'run': self.run_id, 'stage': name,
+                'wall': time.perf_counter() - started,
+                'cpu': time.process_time() - started_cpu + children_cpu_seconds() - started_children_cpu,
+                'peak_rss': peak_rss_bytes(),
+                'files': len({record['file'] for record in files}),
+                'bytes_read': sum(record.get('bytes_read', 0) for record in files),
+                'bytes_written': sum(record.get('bytes_written', 0) for record in files),
+            }
+            with self.lock:
+                self._write(record)
+            self.current_stage = None
+
+    def timed(self, path, step=None):
+        """
+        Context manager timing the work on one file; fields set on the record
+        it yields (bytes_read, bytes_written, status, ...) are saved with it.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        return _FileTimer(self, path, step)
+
+    def record_file(self, file, wall, cpu=None, step=None, **fields):
+        """Record the timing of one file in the current stage (for work timed elsewhere, e.g. in a worker)."""
+        if not self.enabled:
+            return
+        record = {'type': 'file', 'run': self.run_id, 'stage': self.current_stage, 'step': step,
+                  'file': file, 'wall': wall, 'cpu': cpu, **fields}
+        with self.lock:
+            self.files.append(record)
+            self._write(record)
+
+    def print_summary(self, top=DEFAULT_TOP):
+        """Print the slowest files of this run."""
+        if self.enabled:
+            print_slowest(self.files, top)
+            print(f"📊 Metrics saved to: {self.path} (run {self.run_id})")
+
+
+DISABLED = Instrumentation(enabled=False)
+
+
+def load_metrics(path=METRICS_PATH):
+    """All records in a metrics file, oldest first."""
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def print_slowest(file_records, top=DEFAULT_TOP):
+    """Table of the `top` slowest file records."""
+    slowest = sorted(file_records, key=lambda record: record['wall'], reverse=True)[:top]
+    if not slowest:
+        return
+    print(f"\n🔎 Slowest {len(slowest)} files:")
+    print(f"  {'stage':<8} {'step':<8} {'wall (s)':>9} {'cpu (s)':>8} {'read (KB)':>10} {'written (KB)':>12}  file")
+    for record in slowest:
+        cpu = f"{record['cpu']:.3f}" if record.get('cpu') is not None else "-"
+        print(f"  {record.get('stage') or '-':<8} {record.get('step') or '-':<8} {record['wall']:>9.3f} {cpu:>8} "
+              f"{record.get('bytes_read', 0) / 1024:>10.1f} {record.get('bytes_written', 0) / 1024:>12.1f}  "
+              f"{record['file']}" + (f" ({record['status']})" if record.get('status') else ""))
+
+
+def print_stages(stage_records):
+    """Table of stage totals."""
+    print(f"  {'stage':<8} {'wall (s)':>9} {'cpu (s)':>9} {'peak RSS (MB)':>14} {'files':>6} "
+          f"{'read (MB)':>10} {'written (MB)':>13}  run")
+    for record in stage_records:
+        peak_rss = f"{record['peak_rss'] / 2 ** 20:.1f}" if record.get('peak_rss') is not None else "-"
+        print(f"  {record['stage']:<8} {record['wall']:>9.2f} {record['cpu']:>9.2f} {peak_rss:>14} "
+              f"{record['files']:>6} {record['bytes_read'] / 2 ** 20:>10.2f} "
+              f"{record['bytes_written'] / 2 ** 20:>13.2f}  {record['run']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarize the metrics recorded with --metrics.")
+    parser.add_argument("--metrics", default=METRICS_PATH, help=f"Metrics file (default: {METRICS_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    report_parser = subparsers.add_parser("report", help="Stage totals and slowest files")
+    report_parser.add_argument("--top", type=int, default=DEFAULT_TOP, help=f"Files to list (default: {DEFAULT_TOP})")
+    report_parser.add_argument("--stage", help="Only this stage (fetch, convert or split)")
+    report_parser.add_argument("--run", default="latest",
+                               help="Run id, 'latest' (the latest run of each stage, the default) or 'all'")
+    args = parser.parse_args()
+
+    records = load_metrics(args.metrics)
+    if args.stage:
+        records = [record for record in records if record.get('stage') == args.stage]
+    if args.run == "latest":
+        latest = {record['stage']: record['run'] for record in records if record['type'] == 'stage'}
+        records = [record for record in records if latest.get(record.get('stage')) == record['run']]
+    elif args.run != "all":
+        records = [record for record in records if record['run'] == args.run]
+
+    print("📊 Stages:")
+    print_stages([record for record in records if record['type'] == 'stage'])
+    print_slowest([record for record in records if record['type'] == 'file'], args.top)
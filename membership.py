@@ -0,0 +1,339 @@
+"""
+Chinese-led organization membership tables, and a membership index built once
+from them for fast (country, year) lookups and vectorized joins.
+
+The index is used by split-txt.py for every speech, and can re-join membership
+columns onto an existing speech_metadata.csv without re-splitting the corpus:
+
+    python membership.py ./data/speech/speech_metadata.csv
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from countries import by_code, country_code
+
+# =============================================================================
+# CHINESE-LED ORGANIZATION MEMBERSHIP
+# =============================================================================
+# Format: { "Country": year_joined } or None if not a member
+# One entry per country, by canonical name; keyed by ISO code (see countries.py),
+# so every spelling of a country's name gets the same membership
+# For organizations founded at a specific date, countries joining at founding get that year
+
+# FOCAC - Forum on China-Africa Cooperation (founded October 2000)
+# All African states except Eswatini (which recognizes Taiwan)
+FOCAC_MEMBERS = by_code({
+    "Algeria": 2000, "Angola": 2000, "Benin": 2000, "Botswana": 2000,
+    "Burkina Faso": 2000, "Burundi": 2000, "Cabo Verde": 2000,
+    "Cameroon": 2000, "Central African Republic": 2000, "Chad": 2000, "Comoros": 2000,
+    "Congo": 2000, "Côte d'Ivoire": 2000, "Democratic Republic of the Congo": 2000,
+    "Djibouti": 2000, "Egypt": 2000, "Equatorial Guinea": 2000, "Eritrea": 2000,
+    "Ethiopia": 2000, "Gabon": 2000, "Gambia": 2016,  # Gambia switched from Taiwan in 2016
+    "Ghana": 2000, "Guinea": 2000, "Guinea-Bissau": 2000, "Kenya": 2000,
+    "Lesotho": 2000, "Liberia": 2000, "Libya": 2000, "Madagascar": 2000,
+    "Malawi": 2008,  # Malawi switched from Taiwan in 2008
+    "Mali": 2000, "Mauritania": 2000, "Mauritius": 2000, "Morocco": 2000,
+    "Mozambique": 2000, "Namibia": 2000, "Niger": 2000, "Nigeria": 2000,
+    "Rwanda": 2000, "Sao Tome and Principe": 2016,  # Switched from Taiwan in 2016
+    "Senegal": 2000, "Seychelles": 2000,
+    "Sierra Leone": 2000, "Somalia": 2000, "South Africa": 2000,
+    "South Sudan": 2011,  # South Sudan independence 2011
+    "Sudan": 2000, "Togo": 2000, "Tunisia": 2000, "Uganda": 2000,
+    "United Republic of Tanzania": 2000, "Zambia": 2000, "Zimbabwe": 2000,
+    # Eswatini/Swaziland NOT a member (recognizes Taiwan)
+})
+
+# CASCF - China-Arab States Cooperation Forum (founded January 2004)
+# All Arab League member states
+CASCF_MEMBERS = by_code({
+    "Algeria": 2004, "Bahrain": 2004, "Comoros": 2004, "Djibouti": 2004,
+    "Egypt": 2004, "Iraq": 2004, "Jordan": 2004, "Kuwait": 2004,
+    "Lebanon": 2004, "Libya": 2004, "Mauritania": 2004, "Morocco": 2004,
+    "Oman": 2004, "State of Palestine": 2004, "Qatar": 2004,
+    "Saudi Arabia": 2004, "Somalia": 2004, "Sudan": 2004,
+    "Syrian Arab Republic": 2004, "Tunisia": 2004,
+    "United Arab Emirates": 2004, "Yemen": 2004,
+})
+
+# SCO - Shanghai Cooperation Organisation
+# Founded June 2001 from Shanghai Five (1996)
+# Format: year of full membership or observer status
+SCO_MEMBERS = by_code({
+    # Founding members (2001)
+    "China": 2001, "Russian Federation": 2001, "Kazakhstan": 2001,
+    "Kyrgyzstan": 2001, "Tajikistan": 2001, "Uzbekistan": 2001,
+    # Later full members
+    "India": 2017, "Pakistan": 2017,
+    "Islamic Republic of Iran": 2023,
+    "Belarus": 2024,
+})
+
+# SCO Observers (not full members, but participating)
+SCO_OBSERVERS = by_code({
+    "Mongolia": 2004, "Afghanistan": 2012,
+})
+
+# SCO Dialogue Partners
+SCO_DIALOGUE_PARTNERS = by_code({
+    "Sri Lanka": 2010, "Türkiye": 2013,
+    "Cambodia": 2015, "Azerbaijan": 2016, "Nepal": 2016, "Armenia": 2016,
+    "Egypt": 2022, "Qatar": 2022, "Saudi Arabia": 2022,
+    "Kuwait": 2023, "Maldives": 2023, "Myanmar": 2023, "United Arab Emirates": 2023,
+    "Bahrain": 2023,
+})
+
+# BRI - Belt and Road Initiative (announced September 2013)
+# Countries with signed MoU with China
+# Based on official data and Fudan University Green Finance Center tracking
+BRI_MEMBERS = by_code({
+    # 2013 - Founding year
+    "Belarus": 2013, "Cambodia": 2013, "China": 2013, "Kyrgyzstan": 2013,
+    "Republic of Moldova": 2013, "Pakistan": 2013,
+    # 2014
+    "Thailand": 2014,
+    # 2015
+    "Armenia": 2015, "Azerbaijan": 2015, "Bulgaria": 2015, "Cameroon": 2015,
+    "Comoros": 2015, "Czechia": 2015, "Hungary": 2015,
+    "Indonesia": 2015, "Iraq": 2015, "Kazakhstan": 2015, "Poland": 2015,
+    "Romania": 2015, "Serbia": 2015, "Slovakia": 2015, "Somalia": 2015,
+    "South Africa": 2015, "Türkiye": 2015, "Uzbekistan": 2015,
+    # 2016
+    "Egypt": 2016, "Georgia": 2016, "Myanmar": 2016, "Papua New Guinea": 2016,
+    # 2017
+    "Albania": 2017, "Bosnia and Herzegovina": 2017, "Côte d'Ivoire": 2017,
+    "Croatia": 2017, "Estonia": 2017, "Kenya": 2017, "Latvia": 2017,
+    "Lithuania": 2017, "Madagascar": 2017, "Malaysia": 2017, "Maldives": 2017,
+    "Montenegro": 2017, "Morocco": 2017, "Nepal": 2017, "New Zealand": 2017,
+    "North Macedonia": 2017, "Panama": 2017, "Philippines": 2017, "Slovenia": 2017,
+    "Sri Lanka": 2017, "Timor-Leste": 2017, "Turkmenistan": 2017, "Ukraine": 2017,
+    "Viet Nam": 2017,
+    # 2018
+    "Algeria": 2018, "Angola": 2018, "Antigua and Barbuda": 2018, "Bahrain": 2018,
+    "Bangladesh": 2019, "Barbados": 2019, "Benin": 2018, "Bolivia": 2018,
+    "Brunei Darussalam": 2018, "Burundi": 2018, "Chad": 2018, "Chile": 2018,
+    "Cook Islands": 2018, "Costa Rica": 2018, "Djibouti": 2018, "Dominica": 2018,
+    "Ecuador": 2018, "El Salvador": 2018, "Equatorial Guinea": 2019,
+    "Eritrea": 2021, "Ethiopia": 2018, "Fiji": 2018, "Gabon": 2018, "Ghana": 2018,
+    "Greece": 2018, "Grenada": 2018, "Guyana": 2018,
+    "Islamic Republic of Iran": 2018, "Jamaica": 2019, "Kuwait": 2018,
+    "Lao People's Democratic Republic": 2018, "Lebanon": 2017, "Lesotho": 2019,
+    "Liberia": 2019, "Libya": 2018, "Luxembourg": 2019, "Mauritania": 2018,
+    "Federated States of Micronesia": 2018, "Mozambique": 2018,
+    "Namibia": 2018, "Niger": 2018, "Nigeria": 2018, "Niue": 2018, "Oman": 2018,
+    "Peru": 2019, "Portugal": 2018, "Qatar": 2019, "Rwanda": 2018, "Samoa": 2018,
+    "Saudi Arabia": 2018, "Senegal": 2018, "Seychelles": 2018, "Sierra Leone": 2018,
+    "Singapore": 2018, "Solomon Islands": 2019, "South Sudan": 2018, "Sudan": 2018,
+    "Suriname": 2018, "Tajikistan": 2018,
+    "United Republic of Tanzania": 2018, "Togo": 2018, "Tonga": 2018,
+    "Trinidad and Tobago": 2018, "Tunisia": 2018, "Uganda": 2018,
+    "United Arab Emirates": 2018, "Uruguay": 2018, "Vanuatu": 2018,
+    "Bolivarian Republic of Venezuela": 2018, "Yemen": 2018,
+    "Zambia": 2018, "Zimbabwe": 2018,
+    # 2019
+    "Cyprus": 2019, "Cuba": 2019, "Dominican Republic": 2019, "Italy": 2019,
+    "Kiribati": 2020, "Mali": 2019,
+    # 2020-2024
+    "Botswana": 2021, "Central African Republic": 2021, "Democratic Republic of the Congo": 2021,
+    "Guinea-Bissau": 2021, "Argentina": 2022, "Malawi": 2022, "Nicaragua": 2022,
+    "Syrian Arab Republic": 2022, "Afghanistan": 2023, "Honduras": 2023,
+    "Jordan": 2023,
+})
+
+# Countries that have exited BRI (for reference)
+BRI_EXITED = by_code({
+    "Estonia": 2022, "Latvia": 2022, "Lithuania": 2021,
+    "Italy": 2023, "Philippines": 2023, "Panama": 2025,
+})
+
+# China-CELAC Forum (Community of Latin American and Caribbean States)
+# Established July 2014 at Brasilia summit, first ministerial Jan 2015 Beijing
+# All 33 CELAC member states are members (all Latin American & Caribbean countries)
+CELAC_MEMBERS = by_code({
+    # Central America
+    "Belize": 2014, "Costa Rica": 2014, "El Salvador": 2014, "Guatemala": 2014,
+    "Honduras": 2014, "Mexico": 2014, "Nicaragua": 2014, "Panama": 2014,
+    # Caribbean
+    "Antigua and Barbuda": 2014, "Bahamas": 2014, "Barbados": 2014,
+    "Cuba": 2014, "Dominica": 2014, "Dominican Republic": 2014, "Grenada": 2014,
+    "Guyana": 2014, "Haiti": 2014, "Jamaica": 2014,
+    "Saint Kitts and Nevis": 2014, "Saint Lucia": 2014,
+    "Saint Vincent and the Grenadines": 2014, "Suriname": 2014,
+    "Trinidad and Tobago": 2014,
+    # South America
+    "Argentina": 2014, "Bolivia": 2014, "Bolivarian Republic of Venezuela": 2014,
+    "Brazil": 2014, "Chile": 2014, "Colombia": 2014, "Ecuador": 2014,
+    "Paraguay": 2014, "Peru": 2014, "Uruguay": 2014,
+})
+
+
+def get_org_membership(country):
+    """
+    Get Chinese-led organization membership for a country.
+    Returns dict with org name -> join year (or None if not member).
+    """
+    code = country_code(country)
+    return {
+        'focac': FOCAC_MEMBERS.get(code),
+        'cascf': CASCF_MEMBERS.get(code),
+        'sco': SCO_MEMBERS.get(code),
+        'sco_observer': SCO_OBSERVERS.get(code),
+        'sco_dialogue': SCO_DIALOGUE_PARTNERS.get(code),
+        'bri': BRI_MEMBERS.get(code),
+        'celac': CELAC_MEMBERS.get(code),
+    }
+
+
+def is_member_at_time(country, org_dict, speech_year, exit_dict=None):
+    """
+    Check if country was a member of an organization at the time of the speech.
+    Returns True if member during speech year (joined <= year and not yet exited).
+
+    Args:
+        country: Country name (any spelling countries.py resolves) or ISO code
+        org_dict: Dict mapping ISO code -> join year
+        speech_year: Year of the speech
+        exit_dict: Optional dict mapping ISO code -> exit year
+    """
+    country = country_code(country)
+    join_year = org_dict.get(country)
+    if join_year is None:
+        return False
+    if speech_year < join_year:
+        return False
+    # Check if country has exited
+    if exit_dict:
+        exit_year = exit_dict.get(country)
+        if exit_year is not None and speech_year >= exit_year:
+            return False
+    return True
+
+
+# =============================================================================
+# MEMBERSHIP INDEX
+# =============================================================================
+# Organizations with per-speech membership columns: org -> (join years, exit years or None)
+MEMBERSHIP_ORGS = {
+    'focac': (FOCAC_MEMBERS, None),
+    'cascf': (CASCF_MEMBERS, None),
+    'sco': (SCO_MEMBERS, None),
+    'bri': (BRI_MEMBERS, BRI_EXITED),
+    'celac': (CELAC_MEMBERS, None),
+}
+
+# Years covered by the index (sessions 1-85); other years fall back to is_member_at_time
+INDEX_FIRST_YEAR = 1946
+INDEX_LAST_YEAR = 2030
+
+
+class MembershipIndex:
+    """
+    Membership of every (country, year) pair, computed once from the org tables.
+
+    - joined[c, o] / exited[c, o]: join / exit year of country c in org o (0 if none)
+    - at_speech[c, y, o]: True if country c was a member of org o in year
+      INDEX_FIRST_YEAR + y (joined by then and not yet exited)
+
+    Countries are ISO codes (see countries.py); record() and join() resolve
+    the country names they are given. record() gives the membership columns
+    for one speech; join() adds them to a whole DataFrame at once. Pass a
+    different `orgs` mapping (keyed by country name or code) to try
+    alternative membership codings.
+    """
+
+    def __init__(self, orgs=None, first_year=INDEX_FIRST_YEAR, last_year=INDEX_LAST_YEAR):
+        self.orgs = {org: (by_code(join_years), by_code(exit_years) if exit_years is not None else None)
+                     for org, (join_years, exit_years) in (MEMBERSHIP_ORGS if orgs is None else orgs).items()}
+        self.first_year = first_year
+        self.last_year = last_year
+        countries = set()
+        for join_years, exit_years in self.orgs.values():
+            countries.update(join_years)
+            countries.update(exit_years or {})
+        self.countries = sorted(countries)
+        self.country_pos = {country: i for i, country in enumerate(self.countries)}
+
+        self.joined = np.zeros((len(self.countries), len(self.orgs)), dtype=np.int16)
+        self.exited = np.zeros_like(self.joined)
+        for o, (join_years, exit_years) in enumerate(self.orgs.values()):
+            for country, year in join_years.items():
+                self.joined[self.country_pos[country], o] = year
+            for country, year in (exit_years or {}).items():
+                self.exited[self.country_pos[country], o] = year
+
+        years = np.arange(first_year, last_year + 1, dtype=np.int16)[None, :, None]
+        joined = self.joined[:, None, :]
+        exited = self.exited[:, None, :]
+        self.at_speech = (joined > 0) & (years >= joined) & ((exited == 0) | (years < exited))
+        self._records = {}
+
+    def record(self, country, year):
+        """
+        Membership columns for a speech by `country` in `year`:
+        is_<org>_member, <org>_joined (None if never), <org>_exited (orgs with exits
+        only, None if not exited) and <org>_at_speech. Memoized per (country, year).
+        """
+        key = (country, year)
+        if key in self._records:
+            return self._records[key]
+        pos = self.country_pos.get(country_code(country))
+        in_range = year is not None and self.first_year <= year <= self.last_year
+        record = {}
+        for o, (org, (join_years, exit_years)) in enumerate(self.orgs.items()):
+            joined = int(self.joined[pos, o]) if pos is not None and self.joined[pos, o] else None
+            record[f'is_{org}_member'] = joined is not None
+            record[f'{org}_joined'] = joined
+            if exit_years is not None:
+                exited = int(self.exited[pos, o]) if pos is not None and self.exited[pos, o] else None
+                record[f'{org}_exited'] = exited
+            if pos is None:
+                record[f'{org}_at_speech'] = False
+            elif in_range:
+                record[f'{org}_at_speech'] = bool(self.at_speech[pos, year - self.first_year, o])
+            else:
+                record[f'{org}_at_speech'] = is_member_at_time(country, join_years, year, exit_years)
+        self._records[key] = record
+        return record
+
+    def join(self, df, country_col='country', year_col='year'):
+        """
+        Return a copy of df with the membership columns (see record()) computed for
+        every row in one vectorized pass. Join/exit years are nullable Int16.
+        """
+        df = df.copy()
+        # Resolve each distinct country string once
+        positions = {country: self.country_pos.get(country_code(country), -1)
+                     for country in df[country_col].dropna().unique()}
+        pos = df[country_col].map(positions).fillna(-1).astype(np.int64).to_numpy()
+        year = pd.to_numeric(df[year_col], errors='coerce').fillna(-1).astype(np.int64).to_numpy()
+        known = pos >= 0
+        in_range = known & (year >= self.first_year) & (year <= self.last_year)
+        if (known & ~in_range).any():
+            raise ValueError(f"Years outside {self.first_year}-{self.last_year} in column '{year_col}'")
+        safe_pos = np.where(known, pos, 0)
+        year_idx = np.where(in_range, year - self.first_year, 0)
+        for o, (org, (_, exit_years)) in enumerate(self.orgs.items()):
+            joined = np.where(known, self.joined[safe_pos, o], 0)
+            df[f'is_{org}_member'] = joined > 0
+            df[f'{org}_joined'] = pd.array(np.where(joined > 0, joined, None), dtype='Int16')
+            if exit_years is not None:
+                exited = np.where(known, self.exited[safe_pos, o], 0)
+                df[f'{org}_exited'] = pd.array(np.where(exited > 0, exited, None), dtype='Int16')
+            df[f'{org}_at_speech'] = in_range & self.at_speech[safe_pos, year_idx, o]
+        return df
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-join membership columns onto an existing speech metadata CSV.")
+    parser.add_argument("metadata_csv", nargs="?", default="./data/speech/speech_metadata.csv")
+    parser.add_argument("--output", help="Where to write the result (default: overwrite the input)")
+    args = parser.parse_args()
+    speeches = pd.read_csv(args.metadata_csv)
+    speeches = MembershipIndex().join(speeches)
+    # Write join/exit years as floats ("2014.0"), as split-txt.py does
+    for column in speeches.columns:
+        if column.endswith(('_joined', '_exited')):
+            speeches[column] = speeches[column].astype('float64')
+    speeches.to_csv(args.output or args.metadata_csv, index=False)
+    print(f"Re-joined membership for {len(speeches)} speeches -> {args.output or args.metadata_csv}")
@@ -1,42 +1,278 @@
+import pymupdf  # type: ignore[import-untyped]
 import pymupdf.layout  # type: ignore[import-untyped] # noqa: F401
 import pymupdf4llm  # type: ignore[import-untyped]
 import os
+import re
+import sys
+import time
+import argparse
+import multiprocessing
+import multiprocessing.connection
+from collections import deque
+from functools import partial
 from tqdm import tqdm
+from build_manifest import BuildManifest, hash_params
+from instrumentation import DISABLED, METRICS_PATH, Instrumentation
 
 pdf_dir = "./data/pdf"
 txt_dir = "./data/full-txt"
 
-def convert_pdfs_to_text():
-    for subdir in tqdm(os.listdir(pdf_dir), desc="Sessions", position=0):
+CONVERT_OPTIONS = {
+    'write_images': False,      # No image placeholders
+    'ignore_images': True,      # Skip image processing entirely
+    'header': False,
+    'footer': False,
+}
+
+# Anything that changes the converted text invalidates earlier conversions
+CONVERT_PARAMS_HASH = hash_params("pymupdf4llm.to_text", getattr(pymupdf4llm, "__version__", None), CONVERT_OPTIONS)
+
+# =============================================================================
+# PAGE TARGETING
+# =============================================================================
+# split-txt.py only keeps the text between the "general debate" heading and
+# "The meeting rose at". With --target-pages, a cheap plain-text scan of each
+# page finds the pages holding them, and the layout conversion only runs on
+# that range. Matched line by line in PyMuPDF's raw page text.
+TARGET_START_PATTERN = re.compile(r'^[ \t]*general debate[ \t]*$', re.IGNORECASE | re.MULTILINE)
+TARGET_END_PATTERN = re.compile(r'^[ \t]*The meeting rose at', re.MULTILINE)
+
+# Page-targeted output is only a part of the document, so it is cached separately
+TARGETED_CONVERT_PARAMS_HASH = hash_params(CONVERT_PARAMS_HASH, "target_pages",
+                                           TARGET_START_PATTERN.pattern, TARGET_END_PATTERN.pattern)
+
+
+def find_target_pages(pdf_path):
+    """
+    (first, last, page count): the 0-based, inclusive range of pages to convert
+    so that the text from the "general debate" heading to the end of the meeting
+    is kept. The range starts one page before the heading, so the heading is
+    preceded by a line break as split-txt.py requires. Without a heading, the
+    whole document is converted.
+    """
+    with pymupdf.open(pdf_path) as doc:
+        page_count = doc.page_count
+        first = None
+        for page_number in range(page_count):
+            text = doc[page_number].get_text()
+            offset = 0
+            if first is None:
+                start_match = TARGET_START_PATTERN.search(text)
+                if start_match is None:
+                    continue
+                first = max(page_number - 1, 0)
+                offset = start_match.end()
+            if TARGET_END_PATTERN.search(text, offset):
+                return first, page_number, page_count
+    return (0 if first is None else first), page_count - 1, page_count
+
+
+def convert_text(pdf_path, target_pages=False):
+    """
+    Convert one PDF to text with pymupdf4llm, only on the pages found by
+    find_target_pages() if target_pages is set.
+    Returns (text, pages converted, page count); the counts are None without target_pages.
+    """
+    if not target_pages:
+        text = pymupdf4llm.to_text(pdf_path, **CONVERT_OPTIONS)
+        return text, None, None
+    first, last, page_count = find_target_pages(pdf_path)
+    text = pymupdf4llm.to_text(pdf_path, pages=list(range(first, last + 1)), **CONVERT_OPTIONS)
+    return text, last - first + 1, page_count
+
+
+def needs_conversion(manifest, pdf_path, txt_path, force=False, params_hash=CONVERT_PARAMS_HASH):
+    """
+    True unless the .txt output was built from a PDF with the same content
+    hash, with the same conversion parameters, and hasn't been touched since.
+    """
+    if force or not os.path.exists(txt_path):
+        return True
+    if manifest.get("convert", txt_path) is None:
+        # Output from before the manifest existed: trust it if it is newer than the PDF
+        if os.path.getmtime(txt_path) >= os.path.getmtime(pdf_path):
+            record_conversion(manifest, pdf_path, txt_path, params_hash)
+            return False
+        return True
+    return not manifest.is_fresh("convert", txt_path, manifest.file_hash(pdf_path), params_hash,
+                                 output_path=txt_path)
+
+
+def record_conversion(manifest, pdf_path, txt_path, params_hash=CONVERT_PARAMS_HASH):
+    """Record a successful conversion in the build manifest."""
+    manifest.record("convert", txt_path, manifest.file_hash(pdf_path), params_hash, output_path=txt_path)
+    manifest.commit()
+
+
+def list_conversion_jobs(manifest, force=False, params_hash=CONVERT_PARAMS_HASH):
+    """
+    List (pdf_path, txt_path) for every PDF that needs converting, creating
+    the output subdirectories as we go.
+    Returns (jobs, number of PDFs skipped because their .txt is up to date).
+    """
+    jobs = []
+    up_to_date = 0
+    for subdir in os.listdir(pdf_dir):
         subdir_path = os.path.join(pdf_dir, subdir)
         if os.path.isdir(subdir_path):
             # Create corresponding output subdirectory
             output_subdir = os.path.join(txt_dir, subdir)
             os.makedirs(output_subdir, exist_ok=True)
 
-            # Process all PDFs in the subdirectory
-            for filename in tqdm(os.listdir(subdir_path), desc=f"PDFs in {subdir}", position=1, leave=False):
+            for filename in os.listdir(subdir_path):
                 if filename.lower().endswith(".pdf"):
                     pdf_path = os.path.join(subdir_path, filename)
                     txt_filename = os.path.splitext(filename)[0] + ".txt"
                     txt_path = os.path.join(output_subdir, txt_filename)
+                    if needs_conversion(manifest, pdf_path, txt_path, force, params_hash):
+                        jobs.append((pdf_path, txt_path))
+                    else:
+                        up_to_date += 1
+    return jobs, up_to_date
+
+
+def convert_pdf(pdf_path, txt_path, target_pages=False):
+    """
+    Convert one PDF to text. The text is written to a temporary file and renamed
+    into place, so an interrupted conversion never leaves a partial .txt behind
+    that would look up to date on the next run.
+    With target_pages, only the pages found by find_target_pages() are converted,
+    and the pages skipped are reported.
+    Returns True on success.
+    """
+    try:
+        text, pages, page_count = convert_text(pdf_path, target_pages)
+        if target_pages:
+            tqdm.write(f"📄 {pdf_path}: converted {pages} of {page_count} pages, skipped {page_count - pages}")
+        if not isinstance(text, str):
+            print(f"Unexpected conversion return type for {pdf_path}")
+            return False
+        tmp_path = txt_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, txt_path)
+        # print(f"Converted: {pdf_path} -> {txt_path}")
+        return True
+    except Exception as e:
+        print(f"Error converting {pdf_path}: {e}")
+        return False
+
+
+def _convert_in_subprocess(pdf_path, txt_path, target_pages=False):
+    """Process entry point: exit code 0 on success, 1 on a conversion error."""
+    sys.exit(0 if convert_pdf(pdf_path, txt_path, target_pages) else 1)
+
+
+def run_isolated(jobs, workers, timeout=None, on_success=None, target_pages=False, metrics=DISABLED):
+    """
+    Convert each PDF in its own process, running at most `workers` at a time.
+    A worker that crashes (e.g. a segfault inside MuPDF) or runs longer than
+    `timeout` seconds only fails its own PDF; the rest of the run carries on.
+    on_success(pdf_path, txt_path) is called as each conversion completes.
+    target_pages is passed on to convert_pdf(). metrics records each PDF's wall time.
+    Returns a list of (pdf_path, reason) for the PDFs that failed.
+    """
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    pending = deque(jobs)
+    running = {}  # process -> (pdf_path, txt_path, start time)
+    failed = []
+    with tqdm(total=len(jobs), desc="PDFs") as progress:
+        while pending or running:
+            while pending and len(running) < workers:
+                pdf_path, txt_path = pending.popleft()
+                process = multiprocessing.Process(target=_convert_in_subprocess, args=(pdf_path, txt_path, target_pages),
+                                                  daemon=True)
+                process.start()
+                running[process] = (pdf_path, txt_path, time.monotonic())
+
+            # Wake up when any worker exits, or periodically to check timeouts
+            multiprocessing.connection.wait([p.sentinel for p in running], timeout=1.0)
+
+            now = time.monotonic()
+            for process, (pdf_path, txt_path, started) in list(running.items()):
+                failures = len(failed)
+                if process.exitcode is None:
+                    if timeout is None or now - started <= timeout:
+                        continue
+                    process.kill()
+                    process.join()
+                    print(f"Timed out converting {pdf_path} after {timeout}s")
+                    failed.append((pdf_path, f"timeout after {timeout}s"))
+                else:
+                    process.join()
+                    if process.exitcode < 0:
+                        print(f"Worker crashed converting {pdf_path} (signal {-process.exitcode})")
+                        failed.append((pdf_path, f"crashed (signal {-process.exitcode})"))
+                    elif process.exitcode != 0:
+                        failed.append((pdf_path, "conversion error"))
+                    elif on_success is not None:
+                        on_success(pdf_path, txt_path)
+                if len(failed) > failures and os.path.exists(txt_path + ".tmp"):
+                    # A killed or crashed worker leaves its partial output behind
+                    os.remove(txt_path + ".tmp")
+                if metrics.enabled:
+                    succeeded = len(failed) == failures
+                    metrics.record_file(pdf_path, time.monotonic() - started, step='convert',
+                                        bytes_read=os.path.getsize(pdf_path),
+                                        bytes_written=os.path.getsize(txt_path) if succeeded else 0,
+                                        status=None if succeeded else failed[-1][1])
+                del running[process]
+                progress.update(1)
+    return failed
+
+
+def convert_pdfs_to_text(workers=1, timeout=None, force=False, target_pages=False, metrics=DISABLED):
+    """
+    Convert every PDF under pdf_dir to text under txt_dir, skipping PDFs whose
+    .txt output is up to date according to the build manifest (unless force is set).
+    With workers > 1 or a timeout, each PDF is converted in an isolated process.
+    With target_pages, only the pages split-txt.py uses are converted (see
+    find_target_pages()); the .txt files then hold only that part of each record.
+    metrics (see instrumentation.py) records the stage and per-PDF timings.
+    """
+    params_hash = TARGETED_CONVERT_PARAMS_HASH if target_pages else CONVERT_PARAMS_HASH
+    with metrics.stage('convert'), BuildManifest() as manifest:
+        jobs, up_to_date = list_conversion_jobs(manifest, force, params_hash)
+        print(f"{len(jobs)} PDFs to convert, {up_to_date} already up to date")
+
+        on_success = partial(record_conversion, manifest, params_hash=params_hash)
+        if workers <= 1 and timeout is None:
+            failed = []
+            for pdf_path, txt_path in tqdm(jobs, desc="PDFs"):
+                with metrics.timed(pdf_path, step='convert') as record:
+                    if convert_pdf(pdf_path, txt_path, target_pages):
+                        on_success(pdf_path, txt_path)
+                        record['bytes_written'] = os.path.getsize(txt_path)
+                    else:
+                        failed.append((pdf_path, "conversion error"))
+                        record['status'] = "conversion error"
+                    record['bytes_read'] = os.path.getsize(pdf_path)
+        else:
+            failed = run_isolated(jobs, workers, timeout, on_success, target_pages, metrics)
+
+    print(f"Converted {len(jobs) - len(failed)} PDFs, {len(failed)} failed")
+    for pdf_path, reason in failed:
+        print(f"  {pdf_path}: {reason}")
 
-                    try:
-                        text = pymupdf4llm.to_text(
-                            pdf_path,
-                            write_images=False,      # No image placeholders
-                            ignore_images=True,      # Skip image processing entirely
-                            header=False,
-                            footer=False
-                        )
-                        if not isinstance(text, str):
-                            print(f"Unexpected conversion return type for {pdf_path}")
-                            continue
-                        with open(txt_path, "w", encoding="utf-8") as f:
-                            f.write(text)
-                        # print(f"Converted: {pdf_path} -> {txt_path}")
-                    except Exception as e:
-                        print(f"Error converting {pdf_path}: {e}")
 
 if __name__ == "__main__":
-    convert_pdfs_to_text()
+    parser = argparse.ArgumentParser(description="Convert meeting record PDFs to full text.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of PDFs converted in parallel, each in its own process (default: 1)")
+    parser.add_argument("--timeout", type=float, default=None,
+                        help="Give up on a PDF after this many seconds (default: no limit)")
+    parser.add_argument("--force", action="store_true",
+                        help="Reconvert every PDF, even if the build manifest says its .txt output is up to date")
+    parser.add_argument("--target-pages", action="store_true",
+                        help="Only convert the pages from the general debate heading to the end of the meeting, "
+                             "found with a quick plain-text scan (the .txt files then hold only that part)")
+    parser.add_argument("--metrics", nargs="?", const=METRICS_PATH, default=None, metavar="PATH",
+                        help=f"Record stage and per-PDF timings as JSON lines (default path: {METRICS_PATH})")
+    args = parser.parse_args()
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    metrics = Instrumentation(args.metrics) if args.metrics else DISABLED
+    convert_pdfs_to_text(workers=args.workers, timeout=args.timeout, force=args.force,
+                         target_pages=args.target_pages, metrics=metrics)
+    metrics.print_summary()
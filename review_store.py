@@ -0,0 +1,182 @@
+"""
+Structured review queue for the items split-txt.py sets aside for manual review:
+  - flagged_line: speaker-like lines that failed strict pattern validation
+  - skipped_file: meeting files with no general debate section
+  - head_of_state: head-of-state/government speeches
+
+Items are written to a SQLite database (data/speech/review.sqlite) indexed by
+session, file and reason, alongside the plain-text extraction log. Per-file
+counts are kept in memory as items are added, so count() is a dict lookup
+rather than a scan over everything added so far, and are stored in the
+review_counts table.
+
+Usage:
+    python review_store.py summary
+    python review_store.py list --kind flagged_line --session session_70
+    python review_store.py list --file meeting_70_03.txt
+    python review_store.py list --reason "strict pattern"
+"""
+import os
+import sqlite3
+import argparse
+from collections import Counter
+
+REVIEW_STORE_PATH = "./data/speech/review.sqlite"
+
+REVIEW_KINDS = ('flagged_line', 'skipped_file', 'head_of_state')
+
+REVIEW_FIELDS = ('session', 'file', 'speaker', 'country', 'line', 'reason')
+
+
+class ReviewStoreWriter:
+    """
+    Builds a new review store for one extraction run. Like CorpusStoreWriter,
+    it writes to a temporary file that replaces the existing store on close().
+    """
+
+    def __init__(self, path=REVIEW_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        if os.path.exists(self.tmp_path):
+            os.remove(self.tmp_path)
+        self.db = sqlite3.connect(self.tmp_path)
+        self.db.executescript("""
+            CREATE TABLE review_items (
+                id INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                session TEXT,
+                file TEXT,
+                speaker TEXT,
+                country TEXT,
+                line TEXT,
+                reason TEXT
+            );
+            CREATE TABLE review_counts (
+                kind TEXT NOT NULL,
+                session TEXT,
+                file TEXT,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (kind, session, file)
+            );
+        """)
+        self.counts = Counter()  # (kind, session, file) -> items added
+        self.file_counts = Counter()  # (kind, file) -> items added, across sessions
+        self.kind_counts = Counter()  # kind -> items added
+
+    def add(self, kind, **fields):
+        """
+        Add one review item (fields from REVIEW_FIELDS) and return its fields
+        as a dict, for callers that also keep the items in memory.
+        """
+        if kind not in REVIEW_KINDS:
+            raise ValueError(f"Unknown review item kind: {kind}")
+        unknown = set(fields) - set(REVIEW_FIELDS)
+        if unknown:
+            raise KeyError(f"Unknown review item fields: {sorted(unknown)}")
+        self.db.execute("INSERT INTO review_items (kind, session, file, speaker, country, line, reason) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?)", (kind, *(fields.get(field) for field in REVIEW_FIELDS)))
+        self.counts[kind, fields.get('session'), fields.get('file')] += 1
+        self.file_counts[kind, fields.get('file')] += 1
+        self.kind_counts[kind] += 1
+        return fields
+
+    def count(self, kind, file=None, session=None):
+        """Items of a kind added so far, for one file (optionally within one session)."""
+        if session is None:
+            return self.file_counts[kind, file]
+        return self.counts[kind, session, file]
+
+    def total(self, kind):
+        """Items of a kind added so far."""
+        return self.kind_counts[kind]
+
+    def iter_items(self, kind, order_by=('id',)):
+        """
+        Items of a kind added so far, as dicts of REVIEW_FIELDS, read back from
+        the database one at a time (ordered by the given columns).
+        """
+        order = ', '.join(column for column in order_by if column in REVIEW_FIELDS + ('id',))
+        cursor = self.db.execute(f"SELECT {', '.join(REVIEW_FIELDS)} FROM review_items WHERE kind = ? ORDER BY {order}",
+                                 (kind,))
+        for row in cursor:
+            yield dict(zip(REVIEW_FIELDS, row))
+
+    def close(self):
+        """Write the counts and indexes and move the store into place."""
+        self.db.executemany("INSERT INTO review_counts VALUES (?, ?, ?, ?)",
+                            ((kind, session, file, count) for (kind, session, file), count in self.counts.items()))
+        self.db.executescript("""
+            CREATE INDEX review_items_file ON review_items (file);
+            CREATE INDEX review_items_session ON review_items (session, file);
+            CREATE INDEX review_items_reason ON review_items (kind, reason);
+        """)
+        self.db.commit()
+        self.db.close()
+        os.replace(self.tmp_path, self.path)
+
+
+class ReviewStore:
+    """Read access to the review store."""
+
+    def __init__(self, path=REVIEW_STORE_PATH):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"No review store at {path} (run split-txt.py)")
+        self.db = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+        self.db.row_factory = sqlite3.Row
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.db.close()
+
+    def items(self, kind=None, session=None, file=None, reason=None, limit=None):
+        """Review items as dicts, in the order they were added. reason matches as a substring."""
+        conditions, values = [], []
+        for column, value in (('kind', kind), ('session', session), ('file', file)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                values.append(value)
+        if reason is not None:
+            conditions.append("reason LIKE ?")
+            values.append(f"%{reason}%")
+        query = "SELECT * FROM review_items"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        return [dict(row) for row in self.db.execute(query, values)]
+
+    def summary(self):
+        """[(kind, session, items)] from the stored counts."""
+        return [tuple(row) for row in self.db.execute(
+            "SELECT kind, session, SUM(count) FROM review_counts GROUP BY kind, session ORDER BY kind, session")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the review queue written by split-txt.py.")
+    parser.add_argument("--store", default=REVIEW_STORE_PATH, help=f"Review store path (default: {REVIEW_STORE_PATH})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("summary", help="Item counts by kind and session")
+    list_parser = subparsers.add_parser("list", help="List review items")
+    list_parser.add_argument("--kind", choices=REVIEW_KINDS)
+    list_parser.add_argument("--session", help="e.g. session_70")
+    list_parser.add_argument("--file", help="Meeting file name, e.g. meeting_70_03.txt")
+    list_parser.add_argument("--reason", help="Substring of the review reason")
+    list_parser.add_argument("--limit", type=int, default=None)
+    args = parser.parse_args()
+
+    with ReviewStore(args.store) as store:
+        if args.command == "summary":
+            for kind, session, count in store.summary():
+                print(f"  {kind:<14} {session}: {count}")
+        else:
+            items = store.items(args.kind, args.session, args.file, args.reason, args.limit)
+            for item in items:
+                detail = item['line'] or (f"{item['speaker']} ({item['country']})" if item['speaker'] else "")
+                print(f"[{item['kind']}] {item['session']}/{item['file']}: {detail}")
+                if item['reason']:
+                    print(f"    Reason: {item['reason']}")
+            print(f"\n📋 {len(items)} review items")
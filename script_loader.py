@@ -0,0 +1,27 @@
+"""
+Import the pipeline scripts with hyphenated names (e.g. 'split-txt.py') as
+modules, for convert-and-split.py, the benchmarks and the tests.
+"""
+import importlib.util
+import os
+import sys
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_script(filename):
+    """
+    Import one of the pipeline scripts in the repository directory as a
+    module named after the file ('split-txt.py' becomes split_txt). A script
+    that's already imported is returned as is.
+    """
+    module_name = os.path.splitext(filename)[0].replace('-', '_')
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(REPO_DIR, filename))
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load {filename}")
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
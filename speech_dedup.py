@@ -0,0 +1,230 @@
+"""
+Near-duplicate detection over the extracted speeches, run after split-txt.py.
+
+The same meeting record is sometimes published twice, and SPEECH_PATTERN can
+split one speech into overlapping pieces; either way the duplicated text is
+counted twice by the frame analysis. Comparing every pair of speeches is
+quadratic, so instead:
+  - each speech is tokenized (speech_tokens.py) and cut into word 5-shingles,
+    hashed to 32 bits with NumPy
+  - a 128-value MinHash signature is computed per speech, with multiply-shift
+    hashes standing in for random permutations; the fraction of equal values
+    in two signatures estimates the Jaccard similarity of their shingle sets
+  - locality-sensitive hashing splits each signature into bands and buckets
+    speeches by band, so only speeches sharing a bucket in some band are
+    compared (pairs with a similarity around (1/bands)^(rows/band) and above
+    are likely to become candidates)
+  - candidates whose estimated similarity reaches --threshold are duplicates.
+Duplicates are grouped, and each group is kept as its first speech in corpus
+order. Meetings are compared the same way: a meeting's signature is the
+element-wise minimum of its speeches' signatures, which is the MinHash of the
+union of their shingles.
+
+Outputs, in data/speech/:
+  - speech_duplicates.csv: one row per duplicate speech, with the speech it
+    duplicates and both meetings
+  - meeting_duplicates.csv: one row per duplicate meeting record
+With --exclude, the duplicate speeches are also dropped from the speech
+metadata (speech_metadata.csv, speech_metadata.parquet and the corpus store's
+metadata table), so every downstream script skips them; re-running
+split-txt.py restores them. meeting_metadata.csv is left as extracted.
+
+Usage: python speech_dedup.py [--threshold 0.8] [--bands 16] [--exclude]
+"""
+import os
+import zlib
+import sqlite3
+import argparse
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from corpus_schema import (SPEECH_DTYPES, SPEECH_METADATA_CSV, SPEECH_METADATA_PARQUET, load_speech_metadata,
+                           write_parquet)
+from corpus_store import CORPUS_STORE_PATH, iter_speeches
+from speech_tokens import tokenize
+
+speech_duplicates_csv = "./data/speech/speech_duplicates.csv"
+meeting_duplicates_csv = "./data/speech/meeting_duplicates.csv"
+
+SHINGLE_SIZE = 5  # Words per shingle
+NUM_PERM = 128  # MinHash values per signature
+DEFAULT_BANDS = 16  # LSH bands (of NUM_PERM / bands values each)
+DEFAULT_THRESHOLD = 0.8  # Estimated Jaccard similarity for a duplicate
+SEED = 42
+
+SHINGLE_BASE = np.uint64(1000003)  # Polynomial base for combining token hashes into shingle hashes
+MASK_32 = np.uint64(0xFFFFFFFF)
+EMPTY_SIGNATURE_VALUE = np.uint32(0xFFFFFFFF)
+
+
+def shingle_hashes(text, size=SHINGLE_SIZE):
+    """Unique 32-bit hashes (as uint64) of the word size-shingles of text; one shingle if it's shorter."""
+    tokens = tokenize(text)
+    if not tokens:
+        return np.empty(0, dtype=np.uint64)
+    token_hashes = np.fromiter((zlib.crc32(token.encode('utf-8')) for token in tokens),
+                               dtype=np.uint64, count=len(tokens))
+    n_shingles = max(len(tokens) - size + 1, 1)
+    hashes = np.zeros(n_shingles, dtype=np.uint64)
+    for offset in range(min(size, len(tokens))):
+        # Wraps around modulo 2**64
+        hashes = hashes * SHINGLE_BASE + token_hashes[offset:offset + n_shingles]
+    return np.unique((hashes >> np.uint64(32)) ^ (hashes & MASK_32))
+
+
+def hash_functions(num_perm=NUM_PERM, seed=SEED):
+    """(a, b) parameters of num_perm multiply-shift hash functions ((a * x + b) mod 2**64) >> 32, with a odd."""
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False) | np.uint64(1)
+    b = rng.integers(0, 2 ** 64, size=num_perm, dtype=np.uint64, endpoint=False)
+    return a, b
+
+
+def minhash(shingles, a, b):
+    """MinHash signature (uint32, one value per hash function) of a set of shingle hashes."""
+    if len(shingles) == 0:
+        return np.full(len(a), EMPTY_SIGNATURE_VALUE, dtype=np.uint32)
+    hashed = (a[:, None] * shingles[None, :] + b[:, None]) >> np.uint64(32)
+    return hashed.min(axis=1).astype(np.uint32)
+
+
+def candidate_pairs(signatures, bands=DEFAULT_BANDS):
+    """
+    (i, j) row pairs, i < j, whose signatures are equal in at least one band,
+    as an (n, 2) array.
+    """
+    n, num_perm = signatures.shape
+    if num_perm % bands:
+        raise ValueError(f"{num_perm} signature values can't be split into {bands} bands")
+    rows = num_perm // bands
+    pairs = set()
+    for band in range(bands):
+        # One opaque key per row, so np.unique buckets whole bands
+        keys = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        keys = keys.view(np.dtype((np.void, keys.dtype.itemsize * rows))).ravel()
+        _, buckets = np.unique(keys, return_inverse=True)
+        order = np.argsort(buckets, kind='stable')
+        boundaries = np.flatnonzero(np.diff(buckets[order])) + 1
+        for bucket in np.split(order, boundaries):
+            if len(bucket) > 1:
+                pairs.update((int(i), int(j)) for k, i in enumerate(bucket) for j in bucket[k + 1:])
+    return np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+
+
+def similarities(signatures, pairs):
+    """Estimated Jaccard similarity of each row pair."""
+    if len(pairs) == 0:
+        return np.empty(0)
+    return (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+
+
+def find_duplicates(signatures, bands=DEFAULT_BANDS, threshold=DEFAULT_THRESHOLD, valid=None):
+    """
+    For each row that duplicates an earlier one, (row, first row of its
+    duplicate group, estimated similarity to that row). Rows where valid is
+    False (e.g. empty texts) are never duplicates.
+    """
+    if valid is None:
+        valid = np.ones(len(signatures), dtype=bool)
+    rows = np.flatnonzero(valid)
+    pairs = rows[candidate_pairs(signatures[rows], bands)]
+    pairs = pairs[similarities(signatures, pairs) >= threshold]
+
+    # Union-find, with the earliest row of each group as its root
+    parent = list(range(len(signatures)))
+
+    def root(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs:
+        root_i, root_j = root(i), root(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+
+    duplicates = [(i, root(i)) for i in range(len(signatures)) if root(i) != i]
+    if not duplicates:
+        return []
+    found = similarities(signatures, np.array(duplicates, dtype=np.int64))
+    return [(i, first, float(similarity)) for (i, first), similarity in zip(duplicates, found)]
+
+
+def speech_signatures(num_perm=NUM_PERM, seed=SEED):
+    """(speech_ids, meeting_ids, signatures) for every speech, in corpus order."""
+    a, b = hash_functions(num_perm, seed)
+    speech_ids, meeting_ids, signatures = [], [], []
+    for speech in tqdm(iter_speeches(columns=['meeting_id']), total=len(load_speech_metadata()), desc="Speeches"):
+        speech_ids.append(speech['speech_id'])
+        meeting_ids.append(speech['meeting_id'])
+        signatures.append(minhash(shingle_hashes(speech['text']), a, b))
+    signatures = np.vstack(signatures) if signatures else np.empty((0, num_perm), dtype=np.uint32)
+    return np.array(speech_ids, dtype=object), np.array(meeting_ids, dtype=object), signatures
+
+
+def meeting_signatures(meeting_ids, signatures):
+    """(meeting ids in order of first appearance, one signature per meeting): the minimum over its speeches."""
+    codes, meetings = pd.factorize(meeting_ids)
+    order = np.argsort(codes, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(codes[order]) != 0])
+    if len(order) == 0:
+        return np.asarray(meetings, dtype=object), signatures
+    return np.asarray(meetings, dtype=object), np.minimum.reduceat(signatures[order], starts, axis=0)
+
+
+def detect_duplicates(bands=DEFAULT_BANDS, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM):
+    """(speech duplicates, meeting duplicates) DataFrames, as written to the duplicates reports."""
+    speech_ids, meeting_ids, signatures = speech_signatures(num_perm)
+    valid = (signatures != EMPTY_SIGNATURE_VALUE).any(axis=1)
+    speech_rows = [{'speech_id': speech_ids[i], 'duplicate_of': speech_ids[first],
+                    'meeting_id': meeting_ids[i], 'duplicate_of_meeting_id': meeting_ids[first],
+                    'similarity': round(similarity, 4)}
+                   for i, first, similarity in find_duplicates(signatures, bands, threshold, valid)]
+
+    meetings, signatures = meeting_signatures(meeting_ids, signatures)
+    valid = (signatures != EMPTY_SIGNATURE_VALUE).any(axis=1)
+    meeting_rows = [{'meeting_id': meetings[i], 'duplicate_of': meetings[first], 'similarity': round(similarity, 4)}
+                    for i, first, similarity in find_duplicates(signatures, bands, threshold, valid)]
+    return (pd.DataFrame(speech_rows, columns=['speech_id', 'duplicate_of', 'meeting_id',
+                                               'duplicate_of_meeting_id', 'similarity']),
+            pd.DataFrame(meeting_rows, columns=['meeting_id', 'duplicate_of', 'similarity']))
+
+
+def exclude_speeches(speech_ids, csv_path=SPEECH_METADATA_CSV, parquet_path=SPEECH_METADATA_PARQUET,
+                     store_path=CORPUS_STORE_PATH):
+    """Drop speeches from the speech metadata (CSV, Parquet and corpus store, where present). Returns rows dropped."""
+    speech_ids = set(speech_ids)
+    # Read as strings so the remaining rows are written back unchanged
+    df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    keep = ~df['speech_id'].isin(speech_ids)
+    df[keep].to_csv(csv_path, index=False)
+    if os.path.exists(parquet_path):
+        typed = load_speech_metadata(parquet_path, csv_path)
+        write_parquet(typed[~typed['speech_id'].isin(speech_ids)], parquet_path, SPEECH_DTYPES)
+    if os.path.exists(store_path):
+        with sqlite3.connect(store_path) as db:
+            db.executemany("DELETE FROM metadata WHERE speech_id = ?", ((speech_id,) for speech_id in speech_ids))
+        db.close()
+    return int((~keep).sum())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Find near-duplicate speeches and meeting records with MinHash/LSH.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help=f"Estimated Jaccard similarity for a duplicate (default: {DEFAULT_THRESHOLD})")
+    parser.add_argument("--bands", type=int, default=DEFAULT_BANDS,
+                        help=f"LSH bands; must divide {NUM_PERM} (default: {DEFAULT_BANDS})")
+    parser.add_argument("--exclude", action="store_true",
+                        help="Drop the duplicate speeches from the speech metadata")
+    args = parser.parse_args()
+
+    speech_duplicates, meeting_duplicates = detect_duplicates(args.bands, args.threshold)
+    speech_duplicates.to_csv(speech_duplicates_csv, index=False)
+    meeting_duplicates.to_csv(meeting_duplicates_csv, index=False)
+    print(f"\n✅ Found {len(speech_duplicates)} duplicate speeches "
+          f"and {len(meeting_duplicates)} duplicate meeting records")
+    print(f"📋 Duplicates saved to: {speech_duplicates_csv}, {meeting_duplicates_csv}")
+    if args.exclude and len(speech_duplicates):
+        dropped = exclude_speeches(speech_duplicates['speech_id'])
+        print(f"♻️  Excluded {dropped} duplicate speeches from the speech metadata")
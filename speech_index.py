@@ -0,0 +1,434 @@
+"""
+Positional inverted index and phrase search over the extracted speeches.
+
+`python speech_index.py build` tokenizes every speech once (speech_tokens.py)
+and writes a compact on-disk index to data/index/:
+  - terms.json: the vocabulary, in term-id order
+  - docs.bin / docs_offsets.npy: per term, (doc gap, term frequency) pairs
+  - positions.bin / positions_offsets.npy: per term and doc, position gaps
+  - metadata.parquet: the typed speech metadata, one row per doc
+  - index.json: corpus statistics
+All integers in docs.bin and positions.bin are delta-encoded varints. The two
+.bin files and the offset arrays are memory-mapped, so opening the index only
+reads the vocabulary and the metadata, and a query only touches the postings
+of its own terms.
+
+Sentence and clause punctuation takes up a position without being indexed,
+so phrases don't match across a full stop.
+
+Query syntax (see SpeechIndex.search):
+    taiwan                      speeches containing the term
+    "one china" / one-china     the phrase
+    taiwan "one china"          both (implicit AND)
+    taiwan OR tibet             either
+    taiwan NEAR/5 sovereignty   within 5 words of each other, in either order
+    -hegemonism                 excluding speeches with the term (not with OR or NEAR)
+
+Usage:
+    python speech_index.py build
+    python speech_index.py search 'taiwan OR "one china"' --where year=2010..2020 --where region=Africa
+"""
+import os
+import re
+import json
+import time
+import argparse
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from tqdm import tqdm
+from corpus_schema import SPEECH_DTYPES, load_speech_metadata, write_parquet
+from corpus_store import iter_speeches
+from speech_tokens import tokenize
+
+INDEX_DIR = "./data/index"
+
+INDEX_FORMAT_VERSION = 1
+
+# Punctuation tokens produced by tokenize(..., boundaries=True)
+BOUNDARY_TOKENS = frozenset('.;:!?')
+
+QUERY_TOKEN_PATTERN = re.compile(r'(-?)"([^"]*)"|NEAR/(\d+)|(OR)\b|(-?)([^\s"]+)')
+
+# Metadata columns shown with search results
+RESULT_COLUMNS = ['speech_id', 'year', 'session', 'country', 'region', 'word_count']
+
+
+# =============================================================================
+# VARINT ENCODING
+# =============================================================================
+
+def encode_varints(values):
+    """LEB128 varint encoding of an array of non-negative integers, as a uint8 array."""
+    values = np.asarray(values, dtype=np.uint64)
+    lengths = np.ones(len(values), dtype=np.int64)
+    for k in range(1, 10):
+        lengths += values >= np.uint64(1 << (7 * k))
+    starts = np.cumsum(lengths) - lengths
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max(initial=0))):
+        has_byte = lengths > k
+        byte = (values[has_byte] >> np.uint64(7 * k)) & np.uint64(0x7f)
+        more = (lengths[has_byte] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[has_byte] + k] = (byte | more).astype(np.uint8)
+    return out, lengths
+
+
+def decode_varints(data):
+    """Decode a uint8 array of LEB128 varints into an int64 array."""
+    data = np.asarray(data, dtype=np.uint8)
+    if len(data) == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.flatnonzero(data < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = 7 * (np.arange(len(data)) - np.repeat(starts, ends - starts + 1))
+    parts = (data & 0x7f).astype(np.uint64) << shifts.astype(np.uint64)
+    return np.add.reduceat(parts, starts).astype(np.int64)
+
+
+# =============================================================================
+# INDEX BUILDING
+# =============================================================================
+
+def _grouped_byte_offsets(lengths, groups, n_groups):
+    """Byte offset of each group's start in a stream sorted by group (n_groups + 1 entries)."""
+    offsets = np.zeros(n_groups + 1, dtype=np.uint64)
+    offsets[1:] = np.cumsum(np.bincount(groups, weights=lengths, minlength=n_groups)).astype(np.uint64)
+    return offsets
+
+
+def build_index(index_dir=INDEX_DIR):
+    """Tokenize every speech once and write the positional inverted index to index_dir."""
+    metadata = load_speech_metadata()
+    vocabulary = {}
+    term_chunks, doc_chunks, position_chunks = [], [], []
+    speech_ids = []
+    total_tokens = 0
+    for doc, speech in enumerate(tqdm(iter_speeches(columns=[]), total=len(metadata), desc="Speeches")):
+        speech_ids.append(speech['speech_id'])
+        tokens = tokenize(speech['text'], boundaries=True)
+        term_ids = [vocabulary.setdefault(token, len(vocabulary))
+                    for token in tokens if token not in BOUNDARY_TOKENS]
+        positions = [position for position, token in enumerate(tokens) if token not in BOUNDARY_TOKENS]
+        term_chunks.append(np.array(term_ids, dtype=np.int32))
+        position_chunks.append(np.array(positions, dtype=np.int32))
+        doc_chunks.append(np.full(len(term_ids), doc, dtype=np.int32))
+        total_tokens += len(term_ids)
+
+    terms = np.concatenate(term_chunks) if term_chunks else np.zeros(0, dtype=np.int32)
+    docs = np.concatenate(doc_chunks) if doc_chunks else np.zeros(0, dtype=np.int32)
+    positions = np.concatenate(position_chunks) if position_chunks else np.zeros(0, dtype=np.int32)
+    del term_chunks, doc_chunks, position_chunks
+    order = np.lexsort((positions, docs, terms))
+    terms, docs, positions = terms[order], docs[order], positions[order]
+    n_terms = len(vocabulary)
+
+    # One posting per (term, doc)
+    new_posting = np.ones(len(terms), dtype=bool)
+    new_posting[1:] = (terms[1:] != terms[:-1]) | (docs[1:] != docs[:-1])
+    posting_starts = np.flatnonzero(new_posting)
+    posting_terms = terms[posting_starts]
+    posting_docs = docs[posting_starts].astype(np.int64)
+    term_freqs = np.diff(np.append(posting_starts, len(terms)))
+
+    # Doc gaps restart at each term; position gaps restart at each posting
+    doc_gaps = posting_docs.copy()
+    same_term = np.zeros(len(posting_docs), dtype=bool)
+    same_term[1:] = posting_terms[1:] == posting_terms[:-1]
+    doc_gaps[same_term] -= posting_docs[:-1][same_term[1:]]
+    position_gaps = positions.astype(np.int64)
+    position_gaps[~new_posting] -= positions[:-1][~new_posting[1:]]
+
+    docs_bytes, docs_lengths = encode_varints(np.column_stack((doc_gaps, term_freqs)).ravel())
+    positions_bytes, positions_lengths = encode_varints(position_gaps)
+    docs_offsets = _grouped_byte_offsets(docs_lengths, np.repeat(posting_terms, 2), n_terms)
+    positions_offsets = _grouped_byte_offsets(positions_lengths, terms, n_terms)
+
+    os.makedirs(index_dir, exist_ok=True)
+    docs_bytes.tofile(os.path.join(index_dir, "docs.bin"))
+    positions_bytes.tofile(os.path.join(index_dir, "positions.bin"))
+    np.save(os.path.join(index_dir, "docs_offsets.npy"), docs_offsets)
+    np.save(os.path.join(index_dir, "positions_offsets.npy"), positions_offsets)
+    with open(os.path.join(index_dir, "terms.json"), 'w', encoding='utf-8') as f:
+        json.dump(sorted(vocabulary, key=vocabulary.__getitem__), f, ensure_ascii=False)
+    doc_metadata = metadata.set_index('speech_id').loc[speech_ids].reset_index()
+    write_parquet(doc_metadata, os.path.join(index_dir, "metadata.parquet"), SPEECH_DTYPES)
+    stats = {
+        'format_version': INDEX_FORMAT_VERSION,
+        'built_at': datetime.now().isoformat(),
+        'documents': len(speech_ids),
+        'terms': n_terms,
+        'tokens': total_tokens,
+        'postings': len(posting_starts),
+        'index_bytes': int(len(docs_bytes) + len(positions_bytes)),
+    }
+    with open(os.path.join(index_dir, "index.json"), 'w', encoding='utf-8') as f:
+        json.dump(stats, f, indent=2)
+    return stats
+
+
+# =============================================================================
+# QUERIES
+# =============================================================================
+
+class Occurrences:
+    """Matches of one query item: parallel arrays of doc, first and last token position."""
+
+    def __init__(self, docs, starts, ends):
+        self.docs, self.starts, self.ends = docs, starts, ends
+
+    @classmethod
+    def empty(cls):
+        return cls(*(np.zeros(0, dtype=np.int64) for _ in range(3)))
+
+    def keys(self, positions):
+        """Sortable (doc, position) keys; all distinct as long as the positions are."""
+        return (self.docs << 32) + positions
+
+
+class SpeechIndex:
+    """
+    Read-only access to an index built by build_index(). Postings are decoded
+    straight from the memory-mapped .bin files.
+    """
+
+    def __init__(self, index_dir=INDEX_DIR):
+        if not os.path.exists(os.path.join(index_dir, "index.json")):
+            raise FileNotFoundError(f"No speech index in {index_dir} (run python speech_index.py build)")
+        with open(os.path.join(index_dir, "index.json"), 'r', encoding='utf-8') as f:
+            self.stats = json.load(f)
+        if self.stats['format_version'] != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Index in {index_dir} has format {self.stats['format_version']}, "
+                             f"expected {INDEX_FORMAT_VERSION}; rebuild it")
+        with open(os.path.join(index_dir, "terms.json"), 'r', encoding='utf-8') as f:
+            self.term_ids = {term: i for i, term in enumerate(json.load(f))}
+        self.docs_bin = np.memmap(os.path.join(index_dir, "docs.bin"), dtype=np.uint8, mode='r') \
+            if self.stats['index_bytes'] else np.zeros(0, dtype=np.uint8)
+        self.positions_bin = np.memmap(os.path.join(index_dir, "positions.bin"), dtype=np.uint8, mode='r') \
+            if self.stats['index_bytes'] else np.zeros(0, dtype=np.uint8)
+        self.docs_offsets = np.load(os.path.join(index_dir, "docs_offsets.npy"), mmap_mode='r')
+        self.positions_offsets = np.load(os.path.join(index_dir, "positions_offsets.npy"), mmap_mode='r')
+        self.metadata = pd.read_parquet(os.path.join(index_dir, "metadata.parquet"), engine='pyarrow')
+
+    def __len__(self):
+        return self.stats['documents']
+
+    def postings(self, term):
+        """(doc ids, term frequencies) for a normalized term (empty if unknown)."""
+        term_id = self.term_ids.get(term)
+        if term_id is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        start, end = int(self.docs_offsets[term_id]), int(self.docs_offsets[term_id + 1])
+        pairs = decode_varints(self.docs_bin[start:end]).reshape(-1, 2)
+        return np.cumsum(pairs[:, 0]), pairs[:, 1]
+
+    def occurrences(self, term):
+        """Every occurrence of a normalized term, as Occurrences."""
+        docs, term_freqs = self.postings(term)
+        if len(docs) == 0:
+            return Occurrences.empty()
+        term_id = self.term_ids[term]
+        start, end = int(self.positions_offsets[term_id]), int(self.positions_offsets[term_id + 1])
+        gaps = decode_varints(self.positions_bin[start:end])
+        # Undo the per-posting delta encoding: cumulative sum, restarted at each posting
+        totals = np.cumsum(gaps)
+        posting_starts = np.cumsum(term_freqs) - term_freqs
+        positions = totals - np.repeat(totals[posting_starts] - gaps[posting_starts], term_freqs)
+        return Occurrences(np.repeat(docs, term_freqs), positions, positions)
+
+    def phrase(self, tokens):
+        """Occurrences of a sequence of normalized tokens at consecutive positions."""
+        first = self.occurrences(tokens[0])
+        keys = first.keys(first.starts)
+        for offset, token in enumerate(tokens[1:], start=1):
+            if len(keys) == 0:
+                break
+            following = self.occurrences(token)
+            keys = np.intersect1d(keys, following.keys(following.starts) - offset, assume_unique=True)
+        docs, starts = keys >> 32, keys & 0xffffffff
+        return Occurrences(docs, starts, starts + len(tokens) - 1)
+
+    @staticmethod
+    def near(left, right, distance):
+        """
+        Occurrences of left at most `distance` positions away from an occurrence
+        of right, on either side (adjacent words are 1 apart). Each match spans
+        both occurrences, so NEAR can be chained.
+        """
+        if len(left.docs) == 0 or len(right.docs) == 0:
+            return Occurrences.empty()
+        order = np.argsort(right.keys(right.starts), kind='stable')
+        right_keys = right.keys(right.starts)[order]
+        right_starts, right_ends = right.starts[order], right.ends[order]
+        left_keys = left.keys(left.starts)
+        index = np.searchsorted(right_keys, left_keys)
+        matched = np.zeros(len(left_keys), dtype=bool)
+        span_starts, span_ends = left.starts.copy(), left.ends.copy()
+        # The closest right occurrences in the same doc start just before or just after
+        for candidate in (index - 1, index):
+            valid = (candidate >= 0) & (candidate < len(right_keys))
+            candidate = np.clip(candidate, 0, len(right_keys) - 1)
+            same_doc = valid & ((right_keys[candidate] >> 32) == left.docs)
+            gap = np.maximum(right_starts[candidate] - left.ends, left.starts - right_ends[candidate])
+            hit = same_doc & (gap <= distance) & ~matched
+            span_starts[hit] = np.minimum(left.starts[hit], right_starts[candidate][hit])
+            span_ends[hit] = np.maximum(left.ends[hit], right_ends[candidate][hit])
+            matched |= hit
+        return Occurrences(left.docs[matched], span_starts[matched], span_ends[matched])
+
+    def _evaluate(self, text):
+        tokens = [token for token in tokenize(text, boundaries=True) if token not in BOUNDARY_TOKENS]
+        if not tokens:
+            raise ValueError(f"Query item {text!r} has no searchable words")
+        return self.occurrences(tokens[0]) if len(tokens) == 1 else self.phrase(tokens)
+
+    def mask(self, **filters):
+        """
+        Boolean doc mask for metadata filters. Each filter is column=value
+        (equality) or column=[values] / range(...) (membership).
+        """
+        mask = np.ones(len(self), dtype=bool)
+        for column, value in filters.items():
+            if column not in self.metadata.columns:
+                raise KeyError(f"Unknown metadata column: {column}")
+            if isinstance(value, (list, tuple, set, range)):
+                mask &= self.metadata[column].isin(list(value)).to_numpy(dtype=bool, na_value=False)
+            else:
+                mask &= (self.metadata[column] == value).to_numpy(dtype=bool, na_value=False)
+        return mask
+
+    def search(self, query, mask=None, **filters):
+        """
+        Speeches matching the query (see the module docstring for the syntax)
+        and the metadata filters, in corpus order, as a DataFrame of their
+        metadata plus a 'hits' column counting the matches of the positive
+        query items. mask is an optional precomputed boolean doc mask (e.g.
+        from speech_query.BitmapIndex), combined with the filters.
+        """
+        clauses = _parse_query(query)
+        mask = self.mask(**filters) if mask is None else mask & self.mask(**filters)
+        hits = np.zeros(len(self), dtype=np.int64)
+        for negated, alternatives in clauses:
+            occurrences = []
+            for items in alternatives:
+                result = self._evaluate(items[0][1])
+                for distance, text in items[1:]:
+                    result = self.near(result, self._evaluate(text), distance)
+                occurrences.append(result.docs)
+            docs = np.concatenate(occurrences)
+            counts = np.bincount(docs, minlength=len(self))
+            if negated:
+                mask &= counts == 0
+            else:
+                mask &= counts > 0
+                hits += counts
+        result = self.metadata[mask].copy()
+        result.insert(1, 'hits', hits[mask])
+        return result.reset_index(drop=True)
+
+
+def _parse_query(query):
+    """
+    Parse a query into AND-ed clauses: [(negated, alternatives)], where the
+    alternatives are OR-ed and each is a NEAR chain [(distance, text), ...]
+    (the first distance is unused). A negated item must stand on its own:
+    it can't be combined with OR or NEAR/n on either side.
+    """
+    clauses = []
+    pending_or = pending_near = False
+    for match in QUERY_TOKEN_PATTERN.finditer(query):
+        quoted_negation, quoted, near, or_operator, bare_negation, bare = match.groups()
+        if near is not None:
+            if not clauses or pending_or or pending_near is not False:
+                raise ValueError(f"NEAR/{near} needs a word or phrase on both sides")
+            if clauses[-1][0]:
+                raise ValueError(f"A negated item can't be combined with NEAR/{near}")
+            pending_near = int(near)
+            continue
+        if or_operator:
+            if not clauses or pending_or or pending_near is not False:
+                raise ValueError("OR needs a word or phrase on both sides")
+            if clauses[-1][0]:
+                raise ValueError("A negated item can't be combined with OR")
+            pending_or = True
+            continue
+        negated = bool(quoted_negation or bare_negation)
+        text = quoted if quoted is not None else bare
+        if negated and (pending_or or pending_near is not False):
+            raise ValueError(f"A negated item can't be combined with {'OR' if pending_or else f'NEAR/{pending_near}'}")
+        if pending_near is not False:
+            clauses[-1][1][-1].append((pending_near, text))
+        elif pending_or:
+            clauses[-1][1].append([(0, text)])
+        else:
+            clauses.append((negated, [[(0, text)]]))
+        pending_or = pending_near = False
+    if pending_or or pending_near is not False:
+        raise ValueError("Query ends with an operator")
+    if not clauses:
+        raise ValueError("Empty query")
+    return clauses
+
+
+def parse_filter(column, value):
+    """
+    Parse a filter value given as text using the column's dtype: "a,b" is a
+    list of values and "2010..2020" an inclusive range (integer columns).
+    """
+    if column not in SPEECH_DTYPES:
+        raise KeyError(f"Unknown metadata column: {column}")
+    dtype = SPEECH_DTYPES[column]
+
+    def convert(text):
+        if dtype.startswith('Int'):
+            return int(text)
+        if dtype == 'boolean':
+            return text.lower() in ('true', '1', 'yes')
+        return text
+
+    if dtype.startswith('Int') and '..' in value:
+        low, high = value.split('..', 1)
+        return range(int(low), int(high) + 1)
+    if ',' in value:
+        return [convert(part) for part in value.split(',')]
+    return convert(value)
+
+
+def _parse_filter(expression):
+    """Parse a --where column=value expression using the column's dtype."""
+    column, _, value = expression.partition('=')
+    try:
+        return column, parse_filter(column, value)
+    except KeyError:
+        raise SystemExit(f"Unknown metadata column in --where: {column}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or search the positional inverted index of speeches.")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help=f"Index directory (default: {INDEX_DIR})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("build", help="Tokenize every speech and write the index")
+    search_parser = subparsers.add_parser("search", help="Search the index")
+    search_parser.add_argument("query", help='e.g. \'taiwan OR "one china"\', \'taiwan NEAR/5 sovereignty\'')
+    search_parser.add_argument("--where", action="append", default=[], metavar="COLUMN=VALUE",
+                               help="Metadata filter, e.g. region=Africa, year=2010..2020, "
+                                    "focac_at_speech=true, country=Kenya,Ghana (repeatable)")
+    search_parser.add_argument("--limit", type=int, default=20, help="Number of speeches to list (default: 20)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        stats = build_index(args.index_dir)
+        print(f"\n✅ Indexed {stats['documents']} speeches: {stats['tokens']:,} tokens, {stats['terms']:,} terms, "
+              f"{stats['index_bytes'] / 1e6:.1f} MB of postings")
+        print(f"📂 Index written to: {args.index_dir}")
+    else:
+        started = time.perf_counter()
+        index = SpeechIndex(args.index_dir)
+        opened = time.perf_counter()
+        filters = dict(_parse_filter(expression) for expression in args.where)
+        results = index.search(args.query, **filters)
+        searched = time.perf_counter()
+        print(f"🔎 {len(results)} speeches, {results['hits'].sum():,} hits "
+              f"(opened in {(opened - started) * 1000:.0f} ms, searched in {(searched - opened) * 1000:.1f} ms)")
+        if len(results):
+            print(results[RESULT_COLUMNS[:1] + ['hits'] + RESULT_COLUMNS[1:]].head(args.limit).to_string(index=False))
@@ -0,0 +1,290 @@
+"""
+Local query service over the speech corpus: filtered counts, breakdowns and
+full-text search from warm memory, e.g. "all BRI members' speeches in
+2013-2019 containing 'connectivity'".
+
+The speech metadata is loaded once (from the speech index if there is one,
+so that rows line up with its docs, otherwise with load_speech_metadata())
+and indexed as bitmaps: one packed bit array per value of the *_at_speech
+and is_* flags, region, language, year, session and country. A filter is
+then a few ANDs/ORs of bitmaps and a count is a popcount; other columns are
+filtered on the metadata directly. Text queries go through the positional
+index (speech_index.py, same query syntax) restricted to the filtered
+speeches, and single speeches are read from the corpus store or their files.
+
+Run it as a localhost HTTP server answering JSON, or query it in-process
+from the command line (or from Python, via QueryService); neither needs a
+network connection.
+
+Filters use the speech_index.py --where syntax: column=value, a,b for any of
+several values, and 2013..2019 for an inclusive range of years.
+
+Usage:
+    python speech_query.py serve [--port 8765]
+        GET /count?bri_at_speech=true&year=2013..2019
+        GET /facets?column=region&bri_at_speech=true
+        GET /search?q=connectivity&bri_at_speech=true&year=2013..2019&limit=20
+        GET /speech/speech_00042
+    python speech_query.py count --where bri_at_speech=true --where year=2013..2019
+    python speech_query.py facets region --where bri_at_speech=true
+    python speech_query.py search connectivity --where bri_at_speech=true --where year=2013..2019
+"""
+import os
+import json
+import time
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+import numpy as np
+import pandas as pd
+from corpus_schema import SPEECH_DTYPES, load_speech_metadata
+from corpus_store import CORPUS_STORE_PATH, METADATA_END, CorpusStore
+from speech_index import INDEX_DIR, RESULT_COLUMNS, SpeechIndex, parse_filter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 20
+
+# Columns indexed as one bitmap per value
+BITMAP_COLUMNS = ['region', 'language', 'year', 'session', 'country'] + [
+    column for column in SPEECH_DTYPES if column.startswith('is_') or column.endswith('_at_speech')]
+
+# Set bits in each byte value, for counting packed bitmaps
+POPCOUNT = np.array([bin(byte).count('1') for byte in range(256)], dtype=np.int64)
+
+
+def _python_value(value):
+    """Plain Python value for numpy/pandas scalars, so bitmap keys compare and hash like parsed filters."""
+    return value.item() if hasattr(value, 'item') else value
+
+
+class BitmapIndex:
+    """
+    Packed bitmaps over the rows of a metadata DataFrame: bitmaps[column][value]
+    has bit i set if row i has that value (missing values have no bitmap).
+    """
+
+    def __init__(self, metadata, columns=BITMAP_COLUMNS):
+        self.metadata = metadata.reset_index(drop=True)
+        self.rows = len(self.metadata)
+        self.bitmaps = {}
+        for column in columns:
+            if column not in self.metadata.columns:
+                continue
+            codes, values = pd.factorize(self.metadata[column])
+            self.bitmaps[column] = {_python_value(value): np.packbits(codes == code)
+                                    for code, value in enumerate(values)}
+        self.all = np.packbits(np.ones(self.rows, dtype=bool))
+        self.none = np.zeros_like(self.all)
+
+    def bitmap(self, column, value):
+        """Bitmap of the rows where column equals value, or is any of a list/range of values."""
+        values = list(value) if isinstance(value, (list, tuple, set, range)) else [value]
+        if column in self.bitmaps:
+            bitmap = self.none.copy()
+            for item in values:
+                bitmap |= self.bitmaps[column].get(item, self.none)
+            return bitmap
+        if column not in self.metadata.columns:
+            raise KeyError(f"Unknown metadata column: {column}")
+        # Not bitmap-indexed: compare the column directly
+        return np.packbits(self.metadata[column].isin(values).to_numpy(dtype=bool, na_value=False))
+
+    def select(self, **filters):
+        """Bitmap of the rows matching every filter."""
+        bitmap = self.all.copy()
+        for column, value in filters.items():
+            bitmap &= self.bitmap(column, value)
+        return bitmap
+
+    def count(self, bitmap):
+        """Number of rows in a bitmap."""
+        return int(POPCOUNT[bitmap].sum())
+
+    def mask(self, bitmap):
+        """A bitmap as a boolean row mask."""
+        return np.unpackbits(bitmap, count=self.rows).astype(bool)
+
+    def facets(self, column, bitmap):
+        """{value: rows in bitmap with that value} for a bitmap-indexed column, largest first."""
+        if column not in self.bitmaps:
+            raise KeyError(f"Column is not bitmap-indexed: {column} (one of {', '.join(self.bitmaps)})")
+        counts = {value: self.count(bitmap & value_bitmap) for value, value_bitmap in self.bitmaps[column].items()}
+        return dict(sorted(((value, count) for value, count in counts.items() if count),
+                           key=lambda item: -item[1]))
+
+
+class QueryService:
+    """
+    The speech metadata, its bitmap index and (if built) the positional text
+    index, loaded once and queried in memory.
+    """
+
+    def __init__(self, index_dir=INDEX_DIR, store_path=CORPUS_STORE_PATH):
+        try:
+            self.text_index = SpeechIndex(index_dir)
+            metadata = self.text_index.metadata
+        except FileNotFoundError:
+            self.text_index = None
+            metadata = load_speech_metadata()
+        self.bitmaps = BitmapIndex(metadata)
+        self.metadata = self.bitmaps.metadata
+        self.positions = {speech_id: i for i, speech_id in enumerate(self.metadata['speech_id'])}
+        self.store_path = store_path
+
+    def __len__(self):
+        return self.bitmaps.rows
+
+    def count(self, **filters):
+        """Number of speeches matching the filters."""
+        return self.bitmaps.count(self.bitmaps.select(**filters))
+
+    def facets(self, column, **filters):
+        """Speeches matching the filters, by value of a bitmap-indexed column."""
+        return self.bitmaps.facets(column, self.bitmaps.select(**filters))
+
+    def search(self, query, limit=DEFAULT_LIMIT, **filters):
+        """
+        (speeches matching, total hits, the first `limit` as dicts of
+        RESULT_COLUMNS plus 'hits') for a speech_index.py query and filters.
+        """
+        if self.text_index is None:
+            raise FileNotFoundError("Text search needs the speech index (run python speech_index.py build)")
+        mask = self.bitmaps.mask(self.bitmaps.select(**filters))
+        results = self.text_index.search(query, mask=mask)
+        rows = results[RESULT_COLUMNS + ['hits']].head(limit)
+        return len(results), int(results['hits'].sum()), _records(rows)
+
+    def speech(self, speech_id):
+        """One speech's metadata and text, or None."""
+        position = self.positions.get(speech_id)
+        if position is None:
+            return None
+        record = _records(self.metadata.iloc[[position]])[0]
+        if os.path.exists(self.store_path):
+            with CorpusStore(self.store_path) as store:
+                record['text'] = store.text(speech_id)
+        else:
+            with open(record['output_path'], 'r', encoding='utf-8') as f:
+                record['text'] = f.read().split(METADATA_END, 1)[-1]
+        return record
+
+    def parse_filters(self, pairs):
+        """Filters from (column, text value) pairs, e.g. the query string of a request."""
+        return dict((column, parse_filter(column, value)) for column, value in pairs)
+
+
+def _records(df):
+    """DataFrame rows as JSON-serializable dicts (missing values as None)."""
+    return [{column: _python_value(value) for column, value in row.items()}
+            for row in df.astype(object).where(df.notna(), None).to_dict('records')]
+
+
+def _message(error):
+    """An exception's message (KeyError's str() adds quotes)."""
+    return str(error.args[0]) if error.args else str(error)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET /count, /facets, /search and /speech/<speech_id>, answering JSON."""
+
+    service: QueryService
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        params = parse_qsl(url.query)
+        reserved = {name: value for name, value in params if name in ('q', 'limit', 'column')}
+        try:
+            filters = self.service.parse_filters((name, value) for name, value in params if name not in reserved)
+            if url.path == '/count':
+                response = {'count': self.service.count(**filters)}
+            elif url.path == '/facets':
+                if 'column' not in reserved:
+                    raise ValueError("Missing column parameter")
+                response = {'column': reserved['column'], 'counts': self.service.facets(reserved['column'], **filters)}
+            elif url.path == '/search':
+                if 'q' not in reserved:
+                    raise ValueError("Missing q parameter")
+                speeches, hits, results = self.service.search(
+                    reserved['q'], limit=int(reserved.get('limit', DEFAULT_LIMIT)), **filters)
+                response = {'speeches': speeches, 'hits': hits, 'results': results}
+            elif url.path.startswith('/speech/'):
+                response = self.service.speech(unquote(url.path[len('/speech/'):]))
+                if response is None:
+                    return self._send(404, {'error': f"No speech {url.path[len('/speech/'):]}"})
+            else:
+                return self._send(404, {'error': f"Unknown endpoint {url.path}"})
+        except (KeyError, ValueError, FileNotFoundError) as e:
+            return self._send(400, {'error': _message(e)})
+        response['ms'] = round((time.perf_counter() - started) * 1000, 2)
+        self._send(200, response)
+
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """An HTTP server answering queries from service (port 0 picks a free port)."""
+    handler = type('BoundQueryHandler', (QueryHandler,), {'service': service})
+    return ThreadingHTTPServer((host, port), handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query the speech corpus by metadata and text, from warm memory.")
+    parser.add_argument("--index-dir", default=INDEX_DIR, help=f"Speech index directory (default: {INDEX_DIR})")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    serve_parser = subparsers.add_parser("serve", help="Answer queries over HTTP on localhost")
+    serve_parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port (default: {DEFAULT_PORT})")
+    count_parser = subparsers.add_parser("count", help="Count speeches matching the filters")
+    facets_parser = subparsers.add_parser("facets", help="Count matching speeches by value of a column")
+    facets_parser.add_argument("column", help="e.g. region, year, language, country")
+    search_parser = subparsers.add_parser("search", help="Full-text search within the matching speeches")
+    search_parser.add_argument("query", help='e.g. \'connectivity\', \'"win-win cooperation"\'')
+    search_parser.add_argument("--limit", type=int, default=DEFAULT_LIMIT,
+                               help=f"Number of speeches to list (default: {DEFAULT_LIMIT})")
+    for command_parser in (count_parser, facets_parser, search_parser):
+        command_parser.add_argument("--where", action="append", default=[], metavar="COLUMN=VALUE",
+                                    help="Metadata filter, e.g. bri_at_speech=true, year=2013..2019, "
+                                         "region=Africa,Asia-Pacific (repeatable)")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    service = QueryService(args.index_dir)
+    loaded = time.perf_counter()
+    print(f"📚 Loaded {len(service)} speeches in {(loaded - started) * 1000:.0f} ms"
+          + ("" if service.text_index else " (no speech index: text search disabled)"))
+
+    if args.command == "serve":
+        server = make_server(service, port=args.port)
+        print(f"🔎 Serving queries on http://{DEFAULT_HOST}:{server.server_port}/ (Ctrl+C to stop)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+    else:
+        try:
+            filters = service.parse_filters(expression.partition('=')[::2] for expression in args.where)
+            if args.command == "count":
+                print(f"✅ {service.count(**filters)} speeches")
+            elif args.command == "facets":
+                for value, count in service.facets(args.column, **filters).items():
+                    print(f"  {value}: {count}")
+            else:
+                speeches, hits, results = service.search(args.query, limit=args.limit, **filters)
+                print(f"🔎 {speeches} speeches, {hits:,} hits")
+                if results:
+                    print(pd.DataFrame(results)[RESULT_COLUMNS[:1] + ['hits'] + RESULT_COLUMNS[1:]].to_string(index=False))
+        except (KeyError, ValueError, FileNotFoundError) as e:
+            raise SystemExit(f"⚠️  {_message(e)}")
+        print(f"   ({(time.perf_counter() - loaded) * 1000:.1f} ms)")
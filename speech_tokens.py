@@ -0,0 +1,39 @@
+"""
+Shared word tokenizer for the speech analysis scripts (frame lexicon, index, ...).
+
+Tokens are runs of letters/digits, with internal apostrophes kept ("China's",
+"people's"). Hyphens and dashes separate tokens, so "win-win", "win–win" and
+"win win" all tokenize the same way. Tokens are lowercased; non-ASCII tokens are
+also NFKC-normalized and casefolded, with typographic apostrophes mapped to "'".
+Offsets always refer to the original, unnormalized text.
+
+With boundaries=True, sentence and clause punctuation (. ; : ! ?) is kept as a
+token of its own, so phrase matchers can avoid matching across a full stop.
+"""
+import re
+import unicodedata
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+(?:['’][^\W_]+)*")
+TOKEN_OR_BOUNDARY_PATTERN = re.compile(r"[^\W_]+(?:['’][^\W_]+)*|[.;:!?]")
+
+
+def normalize_token(token):
+    """Normalized form of one token as it appears in the text."""
+    if token.isascii():
+        return token.lower()
+    return unicodedata.normalize('NFKC', token).casefold().replace('’', "'")
+
+
+def tokenize(text, boundaries=False):
+    """List of normalized tokens in text."""
+    pattern = TOKEN_OR_BOUNDARY_PATTERN if boundaries else TOKEN_PATTERN
+    if text.isascii():
+        # Lowercasing ASCII text keeps every character in place, so tokenize it in one go
+        return pattern.findall(text.lower())
+    return [normalize_token(token) for token in pattern.findall(text)]
+
+
+def token_spans(text, boundaries=False):
+    """(start, end) character span in text of each token returned by tokenize(text, boundaries)."""
+    pattern = TOKEN_OR_BOUNDARY_PATTERN if boundaries else TOKEN_PATTERN
+    return [match.span() for match in pattern.finditer(text)]
@@ -1,9 +1,21 @@
 import os
 import re
+import time
 import unicodedata
+import multiprocessing
+import argparse
+from contextlib import nullcontext
+from functools import partial
 from tqdm import tqdm
 from datetime import datetime
-import pandas as pd
+from build_manifest import BuildManifest, hash_bytes, hash_params
+from countries import by_code, country_code
+from membership import MembershipIndex
+from collections import Counter
+from corpus_schema import MEETING_DTYPES, SPEECH_DTYPES, TableWriter
+from corpus_store import CORPUS_STORE_PATH, CorpusStoreWriter
+from review_store import REVIEW_STORE_PATH, ReviewStoreWriter
+from instrumentation import DISABLED, METRICS_PATH, Instrumentation, timed_call
 
 fulltxt_dir = "./data/full-txt"
 speech_dir = "./data/speech"
@@ -11,6 +23,10 @@ log_file = "./data/speech/extraction_log.txt"
 metadata_csv = "./data/speech/speech_metadata.csv"
 meeting_metadata_csv = "./data/speech/meeting_metadata.csv"
 atlasti_variables_csv = "./data/speech/atlasti_document_variables.csv"
+metadata_parquet = "./data/speech/speech_metadata.parquet"
+meeting_metadata_parquet = "./data/speech/meeting_metadata.parquet"
+corpus_store_path = CORPUS_STORE_PATH
+review_store_path = REVIEW_STORE_PATH
 
 # =============================================================================
 # SESSION TO YEAR MAPPING
@@ -22,41 +38,42 @@ SESSION_YEAR_MAP = {f"session_{s}": 1945 + s for s in range(48, 80)}
 # =============================================================================
 # COUNTRY TO REGION MAPPING (UN Regional Groups)
 # =============================================================================
-REGION_MAP = {
+# One entry per country, by canonical name; keyed by ISO code (see countries.py)
+REGION_MAP = by_code({
     # African Group
     "Algeria": "Africa", "Angola": "Africa", "Benin": "Africa", "Botswana": "Africa",
-    "Burkina Faso": "Africa", "Burundi": "Africa", "Cabo Verde": "Africa", "Cape Verde": "Africa",
+    "Burkina Faso": "Africa", "Burundi": "Africa", "Cabo Verde": "Africa",
     "Cameroon": "Africa", "Central African Republic": "Africa", "Chad": "Africa", "Comoros": "Africa",
     "Congo": "Africa", "Côte d'Ivoire": "Africa", "Democratic Republic of the Congo": "Africa",
     "Djibouti": "Africa", "Egypt": "Africa", "Equatorial Guinea": "Africa", "Eritrea": "Africa",
-    "Eswatini": "Africa", "Swaziland": "Africa", "Ethiopia": "Africa", "Gabon": "Africa",
+    "Eswatini": "Africa", "Ethiopia": "Africa", "Gabon": "Africa",
     "Gambia": "Africa", "Ghana": "Africa", "Guinea": "Africa", "Guinea-Bissau": "Africa",
     "Kenya": "Africa", "Lesotho": "Africa", "Liberia": "Africa", "Libya": "Africa",
     "Madagascar": "Africa", "Malawi": "Africa", "Mali": "Africa", "Mauritania": "Africa",
     "Mauritius": "Africa", "Morocco": "Africa", "Mozambique": "Africa", "Namibia": "Africa",
     "Niger": "Africa", "Nigeria": "Africa", "Rwanda": "Africa", "Sao Tome and Principe": "Africa",
-    "Sao Tomé and Principe": "Africa", "Senegal": "Africa", "Seychelles": "Africa",
+    "Senegal": "Africa", "Seychelles": "Africa",
     "Sierra Leone": "Africa", "Somalia": "Africa", "South Africa": "Africa", "South Sudan": "Africa",
     "Sudan": "Africa", "Togo": "Africa", "Tunisia": "Africa", "Uganda": "Africa",
-    "United Republic of Tanzania": "Africa", "Tanzania": "Africa", "Zambia": "Africa", "Zimbabwe": "Africa",
+    "United Republic of Tanzania": "Africa", "Zambia": "Africa", "Zimbabwe": "Africa",
 
     # Asia-Pacific Group
     "Afghanistan": "Asia-Pacific", "Bahrain": "Asia-Pacific", "Bangladesh": "Asia-Pacific",
     "Bhutan": "Asia-Pacific", "Brunei Darussalam": "Asia-Pacific", "Cambodia": "Asia-Pacific",
     "China": "Asia-Pacific", "Cyprus": "Asia-Pacific", "Democratic People's Republic of Korea": "Asia-Pacific",
     "Fiji": "Asia-Pacific", "India": "Asia-Pacific", "Indonesia": "Asia-Pacific",
-    "Iran": "Asia-Pacific", "Islamic Republic of Iran": "Asia-Pacific", "Iraq": "Asia-Pacific",
+    "Islamic Republic of Iran": "Asia-Pacific", "Iraq": "Asia-Pacific",
     "Japan": "Asia-Pacific", "Jordan": "Asia-Pacific", "Kazakhstan": "Asia-Pacific",
     "Kiribati": "Asia-Pacific", "Kuwait": "Asia-Pacific", "Kyrgyzstan": "Asia-Pacific",
     "Lao People's Democratic Republic": "Asia-Pacific", "Lebanon": "Asia-Pacific",
     "Malaysia": "Asia-Pacific", "Maldives": "Asia-Pacific", "Marshall Islands": "Asia-Pacific",
-    "Micronesia": "Asia-Pacific", "Federated States of Micronesia": "Asia-Pacific",
+    "Federated States of Micronesia": "Asia-Pacific",
     "Mongolia": "Asia-Pacific", "Myanmar": "Asia-Pacific", "Nauru": "Asia-Pacific",
     "Nepal": "Asia-Pacific", "Oman": "Asia-Pacific", "Pakistan": "Asia-Pacific",
     "Palau": "Asia-Pacific", "Papua New Guinea": "Asia-Pacific", "Philippines": "Asia-Pacific",
     "Qatar": "Asia-Pacific", "Republic of Korea": "Asia-Pacific", "Samoa": "Asia-Pacific",
     "Saudi Arabia": "Asia-Pacific", "Singapore": "Asia-Pacific", "Solomon Islands": "Asia-Pacific",
-    "Sri Lanka": "Asia-Pacific", "Syrian Arab Republic": "Asia-Pacific", "Syria": "Asia-Pacific",
+    "Sri Lanka": "Asia-Pacific", "Syrian Arab Republic": "Asia-Pacific",
     "Tajikistan": "Asia-Pacific", "Thailand": "Asia-Pacific", "Timor-Leste": "Asia-Pacific",
     "Tonga": "Asia-Pacific", "Turkmenistan": "Asia-Pacific", "Tuvalu": "Asia-Pacific",
     "United Arab Emirates": "Asia-Pacific", "Uzbekistan": "Asia-Pacific", "Vanuatu": "Asia-Pacific",
@@ -65,237 +82,45 @@ REGION_MAP = {
     # Eastern European Group
     "Albania": "Eastern Europe", "Armenia": "Eastern Europe", "Azerbaijan": "Eastern Europe",
     "Belarus": "Eastern Europe", "Bosnia and Herzegovina": "Eastern Europe", "Bulgaria": "Eastern Europe",
-    "Croatia": "Eastern Europe", "Czech Republic": "Eastern Europe", "Czechia": "Eastern Europe",
+    "Croatia": "Eastern Europe", "Czechia": "Eastern Europe",
     "Estonia": "Eastern Europe", "Georgia": "Eastern Europe", "Hungary": "Eastern Europe",
     "Latvia": "Eastern Europe", "Lithuania": "Eastern Europe", "Montenegro": "Eastern Europe",
     "North Macedonia": "Eastern Europe", "Poland": "Eastern Europe", "Republic of Moldova": "Eastern Europe",
-    "Moldova": "Eastern Europe", "Romania": "Eastern Europe", "Russian Federation": "Eastern Europe",
+    "Romania": "Eastern Europe", "Russian Federation": "Eastern Europe",
     "Serbia": "Eastern Europe", "Slovakia": "Eastern Europe", "Slovenia": "Eastern Europe",
     "Ukraine": "Eastern Europe",
 
     # Latin American and Caribbean Group (GRULAC)
     "Antigua and Barbuda": "GRULAC", "Argentina": "GRULAC", "Bahamas": "GRULAC",
     "Barbados": "GRULAC", "Belize": "GRULAC", "Bolivia": "GRULAC",
-    "Plurinational State of Bolivia": "GRULAC", "Brazil": "GRULAC", "Chile": "GRULAC",
+    "Brazil": "GRULAC", "Chile": "GRULAC",
     "Colombia": "GRULAC", "Costa Rica": "GRULAC", "Cuba": "GRULAC", "Dominica": "GRULAC",
     "Dominican Republic": "GRULAC", "Ecuador": "GRULAC", "El Salvador": "GRULAC",
     "Grenada": "GRULAC", "Guatemala": "GRULAC", "Guyana": "GRULAC", "Haiti": "GRULAC",
     "Honduras": "GRULAC", "Jamaica": "GRULAC", "Mexico": "GRULAC", "Nicaragua": "GRULAC",
     "Panama": "GRULAC", "Paraguay": "GRULAC", "Peru": "GRULAC",
     "Saint Kitts and Nevis": "GRULAC", "Saint Lucia": "GRULAC",
-    "Saint Vincent and the Grenadines": "GRULAC", "St. Vincent and the Grenadines": "GRULAC",
-    "Suriname": "GRULAC", "Trinidad and Tobago": "GRULAC", "Uruguay": "GRULAC",
-    "Venezuela": "GRULAC", "Bolivarian Republic of Venezuela": "GRULAC",
+    "Saint Vincent and the Grenadines": "GRULAC", "Suriname": "GRULAC",
+    "Trinidad and Tobago": "GRULAC", "Uruguay": "GRULAC", "Bolivarian Republic of Venezuela": "GRULAC",
 
     # Western European and Others Group (WEOG)
     "Andorra": "WEOG", "Australia": "WEOG", "Austria": "WEOG", "Belgium": "WEOG",
     "Canada": "WEOG", "Denmark": "WEOG", "Finland": "WEOG", "France": "WEOG",
     "Germany": "WEOG", "Greece": "WEOG", "Iceland": "WEOG", "Ireland": "WEOG",
     "Israel": "WEOG", "Italy": "WEOG", "Liechtenstein": "WEOG", "Luxembourg": "WEOG",
-    "Malta": "WEOG", "Monaco": "WEOG", "Netherlands": "WEOG", "Kingdom of the Netherlands": "WEOG",
+    "Malta": "WEOG", "Monaco": "WEOG", "Netherlands": "WEOG",
     "New Zealand": "WEOG", "Norway": "WEOG", "Portugal": "WEOG", "San Marino": "WEOG",
-    "Spain": "WEOG", "Sweden": "WEOG", "Switzerland": "WEOG", "Turkey": "WEOG",
-    "Türkiye": "WEOG", "United Kingdom": "WEOG", "United States": "WEOG", "United States of America": "WEOG",
+    "Spain": "WEOG", "Sweden": "WEOG", "Switzerland": "WEOG",
+    "Türkiye": "WEOG", "United Kingdom": "WEOG", "United States of America": "WEOG",
 
     # Observers / Special
-    "Holy See": "Observer", "State of Palestine": "Observer", "Palestine": "Observer",
-}
-
-# =============================================================================
-# CHINESE-LED ORGANIZATION MEMBERSHIP
-# =============================================================================
-# Format: { "Country": year_joined } or None if not a member
-# For organizations founded at a specific date, countries joining at founding get that year
-
-# FOCAC - Forum on China-Africa Cooperation (founded October 2000)
-# All African states except Eswatini (which recognizes Taiwan)
-FOCAC_MEMBERS = {
-    "Algeria": 2000, "Angola": 2000, "Benin": 2000, "Botswana": 2000,
-    "Burkina Faso": 2000, "Burundi": 2000, "Cabo Verde": 2000, "Cape Verde": 2000,
-    "Cameroon": 2000, "Central African Republic": 2000, "Chad": 2000, "Comoros": 2000,
-    "Congo": 2000, "Côte d'Ivoire": 2000, "Democratic Republic of the Congo": 2000,
-    "Djibouti": 2000, "Egypt": 2000, "Equatorial Guinea": 2000, "Eritrea": 2000,
-    "Ethiopia": 2000, "Gabon": 2000, "Gambia": 2016,  # Gambia switched from Taiwan in 2016
-    "Ghana": 2000, "Guinea": 2000, "Guinea-Bissau": 2000, "Kenya": 2000,
-    "Lesotho": 2000, "Liberia": 2000, "Libya": 2000, "Madagascar": 2000,
-    "Malawi": 2008,  # Malawi switched from Taiwan in 2008
-    "Mali": 2000, "Mauritania": 2000, "Mauritius": 2000, "Morocco": 2000,
-    "Mozambique": 2000, "Namibia": 2000, "Niger": 2000, "Nigeria": 2000,
-    "Rwanda": 2000, "Sao Tome and Principe": 2016,  # Switched from Taiwan in 2016
-    "Sao Tomé and Principe": 2016, "Senegal": 2000, "Seychelles": 2000,
-    "Sierra Leone": 2000, "Somalia": 2000, "South Africa": 2000,
-    "South Sudan": 2011,  # South Sudan independence 2011
-    "Sudan": 2000, "Togo": 2000, "Tunisia": 2000, "Uganda": 2000,
-    "United Republic of Tanzania": 2000, "Tanzania": 2000, "Zambia": 2000, "Zimbabwe": 2000,
-    # Eswatini/Swaziland NOT a member (recognizes Taiwan)
-}
-
-# CASCF - China-Arab States Cooperation Forum (founded January 2004)
-# All Arab League member states
-CASCF_MEMBERS = {
-    "Algeria": 2004, "Bahrain": 2004, "Comoros": 2004, "Djibouti": 2004,
-    "Egypt": 2004, "Iraq": 2004, "Jordan": 2004, "Kuwait": 2004,
-    "Lebanon": 2004, "Libya": 2004, "Mauritania": 2004, "Morocco": 2004,
-    "Oman": 2004, "State of Palestine": 2004, "Palestine": 2004, "Qatar": 2004,
-    "Saudi Arabia": 2004, "Somalia": 2004, "Sudan": 2004,
-    "Syrian Arab Republic": 2004, "Syria": 2004, "Tunisia": 2004,
-    "United Arab Emirates": 2004, "Yemen": 2004,
-}
-
-# SCO - Shanghai Cooperation Organisation
-# Founded June 2001 from Shanghai Five (1996)
-# Format: year of full membership or observer status
-SCO_MEMBERS = {
-    # Founding members (2001)
-    "China": 2001, "Russian Federation": 2001, "Kazakhstan": 2001,
-    "Kyrgyzstan": 2001, "Tajikistan": 2001, "Uzbekistan": 2001,
-    # Later full members
-    "India": 2017, "Pakistan": 2017,
-    "Iran": 2023, "Islamic Republic of Iran": 2023,
-    "Belarus": 2024,
-}
-
-# SCO Observers (not full members, but participating)
-SCO_OBSERVERS = {
-    "Mongolia": 2004, "Afghanistan": 2012,
-}
-
-# SCO Dialogue Partners
-SCO_DIALOGUE_PARTNERS = {
-    "Sri Lanka": 2010, "Turkey": 2013, "Türkiye": 2013,
-    "Cambodia": 2015, "Azerbaijan": 2016, "Nepal": 2016, "Armenia": 2016,
-    "Egypt": 2022, "Qatar": 2022, "Saudi Arabia": 2022,
-    "Kuwait": 2023, "Maldives": 2023, "Myanmar": 2023, "United Arab Emirates": 2023,
-    "Bahrain": 2023,
-}
-
-# BRI - Belt and Road Initiative (announced September 2013)
-# Countries with signed MoU with China
-# Based on official data and Fudan University Green Finance Center tracking
-BRI_MEMBERS = {
-    # 2013 - Founding year
-    "Belarus": 2013, "Cambodia": 2013, "China": 2013, "Kyrgyzstan": 2013,
-    "Moldova": 2013, "North Macedonia": 2013, "Pakistan": 2013,
-    # 2014
-    "Thailand": 2014,
-    # 2015
-    "Armenia": 2015, "Azerbaijan": 2015, "Bulgaria": 2015, "Cameroon": 2015,
-    "Comoros": 2015, "Czech Republic": 2015, "Czechia": 2015, "Hungary": 2015,
-    "Indonesia": 2015, "Iraq": 2015, "Kazakhstan": 2015, "Poland": 2015,
-    "Romania": 2015, "Serbia": 2015, "Slovakia": 2015, "Somalia": 2015,
-    "South Africa": 2015, "Turkey": 2015, "Türkiye": 2015, "Uzbekistan": 2015,
-    # 2016
-    "Egypt": 2016, "Georgia": 2016, "Myanmar": 2016, "Papua New Guinea": 2016,
-    # 2017
-    "Albania": 2017, "Bosnia and Herzegovina": 2017, "Côte d'Ivoire": 2017,
-    "Croatia": 2017, "Estonia": 2017, "Kenya": 2017, "Latvia": 2017,
-    "Lithuania": 2017, "Madagascar": 2017, "Malaysia": 2017, "Maldives": 2017,
-    "Montenegro": 2017, "Morocco": 2017, "Nepal": 2017, "New Zealand": 2017,
-    "North Macedonia": 2017, "Panama": 2017, "Philippines": 2017, "Slovenia": 2017,
-    "Sri Lanka": 2017, "Timor-Leste": 2017, "Turkmenistan": 2017, "Ukraine": 2017,
-    "Viet Nam": 2017,
-    # 2018
-    "Algeria": 2018, "Angola": 2018, "Antigua and Barbuda": 2018, "Bahrain": 2018,
-    "Bangladesh": 2019, "Barbados": 2019, "Benin": 2018, "Bolivia": 2018,
-    "Brunei Darussalam": 2018, "Burundi": 2018, "Chad": 2018, "Chile": 2018,
-    "Cook Islands": 2018, "Costa Rica": 2018, "Djibouti": 2018, "Dominica": 2018,
-    "Ecuador": 2018, "El Salvador": 2018, "Equatorial Guinea": 2019,
-    "Eritrea": 2021, "Ethiopia": 2018, "Fiji": 2018, "Gabon": 2018, "Ghana": 2018,
-    "Greece": 2018, "Grenada": 2018, "Guyana": 2018, "Iran": 2018,
-    "Islamic Republic of Iran": 2018, "Jamaica": 2019, "Kuwait": 2018,
-    "Lao People's Democratic Republic": 2018, "Lebanon": 2017, "Lesotho": 2019,
-    "Liberia": 2019, "Libya": 2018, "Luxembourg": 2019, "Mauritania": 2018,
-    "Micronesia": 2018, "Federated States of Micronesia": 2018, "Mozambique": 2018,
-    "Namibia": 2018, "Niger": 2018, "Nigeria": 2018, "Niue": 2018, "Oman": 2018,
-    "Peru": 2019, "Portugal": 2018, "Qatar": 2019, "Rwanda": 2018, "Samoa": 2018,
-    "Saudi Arabia": 2018, "Senegal": 2018, "Seychelles": 2018, "Sierra Leone": 2018,
-    "Singapore": 2018, "Solomon Islands": 2019, "South Sudan": 2018, "Sudan": 2018,
-    "Suriname": 2018, "Tajikistan": 2018, "Tanzania": 2018,
-    "United Republic of Tanzania": 2018, "Togo": 2018, "Tonga": 2018,
-    "Trinidad and Tobago": 2018, "Tunisia": 2018, "Uganda": 2018,
-    "United Arab Emirates": 2018, "Uruguay": 2018, "Vanuatu": 2018,
-    "Venezuela": 2018, "Bolivarian Republic of Venezuela": 2018, "Yemen": 2018,
-    "Zambia": 2018, "Zimbabwe": 2018,
-    # 2019
-    "Cyprus": 2019, "Cuba": 2019, "Dominican Republic": 2019, "Italy": 2019,
-    "Kiribati": 2020, "Mali": 2019,
-    # 2020-2024
-    "Botswana": 2021, "Central African Republic": 2021, "Democratic Republic of the Congo": 2021,
-    "Guinea-Bissau": 2021, "Argentina": 2022, "Malawi": 2022, "Nicaragua": 2022,
-    "Syria": 2022, "Syrian Arab Republic": 2022, "Afghanistan": 2023, "Honduras": 2023,
-    "Jordan": 2023,
-}
-
-# Countries that have exited BRI (for reference)
-BRI_EXITED = {
-    "Estonia": 2022, "Latvia": 2022, "Lithuania": 2021,
-    "Italy": 2023, "Philippines": 2023, "Panama": 2025,
-}
-
-# China-CELAC Forum (Community of Latin American and Caribbean States)
-# Established July 2014 at Brasilia summit, first ministerial Jan 2015 Beijing
-# All 33 CELAC member states are members (all Latin American & Caribbean countries)
-CELAC_MEMBERS = {
-    # Central America
-    "Belize": 2014, "Costa Rica": 2014, "El Salvador": 2014, "Guatemala": 2014,
-    "Honduras": 2014, "Mexico": 2014, "Nicaragua": 2014, "Panama": 2014,
-    # Caribbean
-    "Antigua and Barbuda": 2014, "Bahamas": 2014, "Barbados": 2014,
-    "Cuba": 2014, "Dominica": 2014, "Dominican Republic": 2014, "Grenada": 2014,
-    "Guyana": 2014, "Haiti": 2014, "Jamaica": 2014,
-    "Saint Kitts and Nevis": 2014, "Saint Lucia": 2014,
-    "Saint Vincent and the Grenadines": 2014, "Suriname": 2014,
-    "Trinidad and Tobago": 2014,
-    # South America
-    "Argentina": 2014, "Bolivia": 2014, "Bolivarian Republic of Venezuela": 2014,
-    "Brazil": 2014, "Chile": 2014, "Colombia": 2014, "Ecuador": 2014,
-    "Paraguay": 2014, "Peru": 2014, "Uruguay": 2014, "Venezuela": 2014,
-}
-
-
-def get_org_membership(country):
-    """
-    Get Chinese-led organization membership for a country.
-    Returns dict with org name -> join year (or None if not member).
-    """
-    return {
-        'focac': FOCAC_MEMBERS.get(country),
-        'cascf': CASCF_MEMBERS.get(country),
-        'sco': SCO_MEMBERS.get(country),
-        'sco_observer': SCO_OBSERVERS.get(country),
-        'sco_dialogue': SCO_DIALOGUE_PARTNERS.get(country),
-        'bri': BRI_MEMBERS.get(country),
-        'celac': CELAC_MEMBERS.get(country),
-    }
-
-
-def is_member_at_time(country, org_dict, speech_year, exit_dict=None):
-    """
-    Check if country was a member of an organization at the time of the speech.
-    Returns True if member during speech year (joined <= year and not yet exited).
-
-    Args:
-        country: Country name
-        org_dict: Dict mapping country -> join year
-        speech_year: Year of the speech
-        exit_dict: Optional dict mapping country -> exit year
-    """
-    join_year = org_dict.get(country)
-    if join_year is None:
-        return False
-    if speech_year < join_year:
-        return False
-    # Check if country has exited
-    if exit_dict:
-        exit_year = exit_dict.get(country)
-        if exit_year is not None and speech_year >= exit_year:
-            return False
-    return True
+    "Holy See": "Observer", "State of Palestine": "Observer",
+})
 
 
 def get_region(country):
-    """Get UN regional group for a country, or 'Unknown' if not found."""
-    return REGION_MAP.get(country, "Unknown")
+    """Get UN regional group for a country (any spelling countries.py resolves), or 'Unknown' if not found."""
+    return REGION_MAP.get(country_code(country), "Unknown")
 
 
 def get_year(session):
@@ -435,240 +260,237 @@ POTENTIAL_SPEECH_PATTERN = re.compile(r'''
     [ \t]*:
 ''', re.VERBOSE)
 
+# Both speaker-line patterns can only match at a newline followed by a line
+# whose first "(" opens a parenthetical (optionally followed by a second one)
+# and then a colon. Such lines are rare, and every one of them contains a ")"
+# followed by a colon, which a literal scan finds cheaply (PAREN_COLON_END_PATTERN).
+# The expensive SPEAKER_TITLES alternation then only runs on the lines that
+# SPEAKER_LINE_CANDIDATE_PATTERN confirms near each hit.
+PAREN_COLON_END_PATTERN = re.compile(r'\)[ \t]*:')
+SPEAKER_LINE_CANDIDATE_PATTERN = re.compile(r'\n[^\n(]*+\([^)]*+\)(?:[ \t]++\([^)]*+\))?[ \t]*:')
 
-def split_texts():
-    # Initialize log
-    os.makedirs(speech_dir, exist_ok=True)
-    flagged_lines = []  # Lines that look like speeches but didn't match
-    head_of_state_speeches = []  # Head-of-state speeches for review
-    skipped_files = []  # Files skipped (no general debate pattern found)
-    all_speeches = []  # All speech metadata for DataFrame export
-    all_meetings = []  # Meeting-level metadata for DataFrame export
-    speech_counter = 0  # Global counter for unique speech IDs
-    for subdir in tqdm(os.listdir(fulltxt_dir), desc="Sessions", position=0):
+# End-of-speech markers, in addition to the start of the next speech
+SPEECH_END_PATTERNS = (PRESIDENT_PATTERN, MEETING_END_PATTERN)
+
+
+def find_speaker_line_candidates(section_content):
+    """
+    Sorted positions of the newlines where SPEECH_PATTERN or
+    POTENTIAL_SPEECH_PATTERN could match (a superset of the actual matches).
+    """
+    candidates = set()
+    for hit in PAREN_COLON_END_PATTERN.finditer(section_content):
+        close = hit.start()
+        # A match ending in this ")" has at most one more ")" before it, so the
+        # "(" that opens it comes after the second ")" back. Each "(" in that
+        # range is checked on its own line.
+        previous_close = section_content.rfind(')', 0, close)
+        earlier_close = section_content.rfind(')', 0, previous_close) if previous_close > 0 else -1
+        open_paren = close
+        while True:
+            open_paren = section_content.rfind('(', earlier_close + 1, open_paren)
+            if open_paren == -1:
+                break
+            line_start = section_content.rfind('\n', 0, open_paren)
+            if line_start != -1 and line_start not in candidates \
+                    and SPEAKER_LINE_CANDIDATE_PATTERN.match(section_content, line_start):
+                candidates.add(line_start)
+    return sorted(candidates)
+
+
+def find_speaker_lines(section_content):
+    """
+    Run SPEECH_PATTERN and POTENTIAL_SPEECH_PATTERN over the section in one
+    shared pass over the candidate lines. Returns (strict matches, loose
+    matches), identical to what finditer would give for each pattern: matches
+    are in order and don't overlap other matches of the same pattern.
+    """
+    strict_matches = []
+    loose_matches = []
+    strict_end = loose_end = 0
+    for position in find_speaker_line_candidates(section_content):
+        if position >= strict_end:
+            match = SPEECH_PATTERN.match(section_content, position)
+            if match:
+                strict_matches.append(match)
+                strict_end = match.end()
+        if position >= loose_end:
+            match = POTENTIAL_SPEECH_PATTERN.match(section_content, position)
+            if match:
+                loose_matches.append(match)
+                loose_end = match.end()
+    return strict_matches, loose_matches
+
+
+def find_speech_ends(section_content, speeches):
+    """
+    Find where each speech ends, scanning the section once.
+    A speech ends at the earliest of: the next speech's intro line, the next
+    "The President:" interjection, or "The meeting rose at".
+
+    Speech starts are already sorted, so each end-marker pattern keeps a
+    lookahead (the next match at or after the current speech start) and is
+    only searched again once a speech starts past it. The marker streams are
+    merged with the speech starts as we go, so the section is scanned once
+    per pattern instead of once per speech, and without copying the rest of
+    the section for every speech.
+
+    Returns a list of end positions, one per speech.
+    """
+    text_length = len(section_content)
+    # Start of the next known match for each end marker (text_length if none left)
+    next_marker = [-1] * len(SPEECH_END_PATTERNS)
+    ends = []
+    for i, speech in enumerate(speeches):
+        start = speech['start']
+        end = speeches[i + 1]['match_start'] if i + 1 < len(speeches) else text_length
+        for k, pattern in enumerate(SPEECH_END_PATTERNS):
+            if next_marker[k] < start:
+                match = pattern.search(section_content, start)
+                next_marker[k] = match.start() if match else text_length
+            end = min(end, next_marker[k])
+        ends.append(end)
+    return ends
+
+
+# Bump when the extraction code changes in a way the patterns don't capture
+EXTRACTION_VERSION = 1
+
+# Cached extractions are reused only while the patterns they were made with are unchanged
+EXTRACTION_PARAMS_HASH = hash_params(EXTRACTION_VERSION, [
+    (pattern.pattern, pattern.flags) for pattern in
+    (GENERAL_DEBATE_PATTERN, SPEECH_PATTERN, POTENTIAL_SPEECH_PATTERN, PRESIDENT_PATTERN, MEETING_END_PATTERN)
+])
+
+
+def extract_meeting(content):
+    """
+    Extract the delegate speeches from one meeting's full text.
+    Returns None if the file has no "general debate" section, otherwise a dict with:
+      - 'speeches': speaker, country, language (None if not noted), and the
+        start/end offsets of each speech's text in content
+      - 'flagged_lines': speaker-like lines that failed strict pattern validation
+    """
+    # Find the "general debate" section (case insensitive)
+    general_debate_match = GENERAL_DEBATE_PATTERN.search(content)
+    if not general_debate_match:
+        return None
+
+    # Get content from general debate section onwards
+    section_offset = general_debate_match.end()
+    section_content = content[section_offset:]
+
+    # Candidate speaker lines through both the strict and the loose pattern
+    strict_matches, loose_matches = find_speaker_lines(section_content)
+
+    # Find all speech starts (strict pattern)
+    speeches = []
+    strict_match_positions = set()
+    for match in strict_matches:
+        speeches.append({
+            'speaker': match.group(1).strip(),
+            'country': match.group(2).strip(),
+            'language': match.group(3).strip() if match.group(3) else None,
+            'start': match.end(),
+            'match_start': match.start()  # Where the intro line begins
+        })
+        strict_match_positions.add(match.start())
+
+    # Find potential speeches that didn't match strict pattern (for manual review)
+    flagged_lines = []
+    for potential_match in loose_matches:
+        if potential_match.start() not in strict_match_positions:
+            # This looks like a speech but didn't pass strict validation
+            flagged_lines.append(potential_match.group(0).strip()[:100])
+
+    # Extract speech content (ends at next speech, "The President:", or meeting end)
+    speech_ends = find_speech_ends(section_content, speeches)
+    for speech, end in zip(speeches, speech_ends):
+        speech['start'] += section_offset
+        speech['end'] = end + section_offset
+        del speech['match_start']
+
+    return {'speeches': speeches, 'flagged_lines': flagged_lines}
+
+
+def extract_meeting_file(job):
+    """
+    Read one meeting's full-text file and extract its speeches (runs in pool workers).
+    job is (txt_path, cached), where cached is {'extraction': ...} from the build
+    manifest if the file and patterns are unchanged since it was made, else None.
+    Returns the same as extract_meeting_text().
+    """
+    txt_path, cached = job
+    with open(txt_path, 'r', encoding='utf-8') as f:
+        content = f.read()
+    return extract_meeting_text(content, cached)
+
+
+def extract_meeting_text(content, cached=None):
+    """
+    Extract the speeches from one meeting's full text, reusing a cached
+    extraction ({'extraction': ...}) if given.
+    Returns (extraction with each speech's 'text' filled in, or None if skipped,
+             the new cache payload, or None if the cached one was used).
+    """
+    payload = None
+    if cached is None:
+        payload = {'extraction': extract_meeting(content)}
+        cached = payload
+    extraction = cached['extraction']
+    if extraction is None:
+        return None, payload
+    speeches = [dict(speech, text=content[speech['start']:speech['end']].strip()) for speech in extraction['speeches']]
+    return {'speeches': speeches, 'flagged_lines': extraction['flagged_lines']}, payload
+
+
+def list_meeting_files():
+    """
+    List (session, filename) for every meeting .txt file, in processing order,
+    creating the matching output subdirectory for each session.
+    """
+    meeting_files = []
+    for subdir in os.listdir(fulltxt_dir):
         subdir_path = os.path.join(fulltxt_dir, subdir)
         if os.path.isdir(subdir_path):
             # Create corresponding output subdirectory
-            output_subdir = os.path.join(speech_dir, subdir)
-            os.makedirs(output_subdir, exist_ok=True)
-
-            # Process all .txt files in the subdirectory
-            for filename in tqdm(os.listdir(subdir_path), desc=f".txt files in {subdir}", position=1, leave=False):
+            os.makedirs(os.path.join(speech_dir, subdir), exist_ok=True)
+            for filename in os.listdir(subdir_path):
                 if filename.lower().endswith(".txt"):
-                    txt_path = os.path.join(subdir_path, filename)
-                    with open(txt_path, 'r', encoding='utf-8') as f:
-                        content = f.read()
-
-                    # Find the "general debate" section (case insensitive)
-                    general_debate_match = GENERAL_DEBATE_PATTERN.search(content)
-                    if not general_debate_match:
-                        skipped_files.append({
-                            'session': subdir,
-                            'file': filename,
-                            'reason': 'No general debate pattern found'
-                        })
-                        continue
-
-                    # Get content from general debate section onwards
-                    section_content = content[general_debate_match.end():]
-
-                    # Initialize meeting-level accumulators
-                    meeting_word_count = 0
-                    meeting_countries = set()
-                    meeting_languages = set()
-                    meeting_speech_count = 0
-                    meeting_head_of_state_count = 0
-
-                    # Find all speech starts (strict pattern)
-                    speeches = []
-                    strict_match_positions = set()
-                    for match in SPEECH_PATTERN.finditer(section_content):
-                        speaker_name = match.group(1).strip()
-                        country = match.group(2).strip()
-                        language = match.group(3).strip() if match.group(3) else None
-                        start_pos = match.end()
-                        speeches.append({
-                            'speaker': speaker_name,
-                            'country': country,
-                            'language': language,
-                            'start': start_pos,
-                            'match_start': match.start()  # Where the intro line begins
-                        })
-                        strict_match_positions.add(match.start())
-
-                        # Track head-of-state speeches for review
-                        if HEAD_OF_STATE_PATTERN.match(speaker_name):
-                            head_of_state_speeches.append({
-                                'file': filename,
-                                'speaker': speaker_name,
-                                'country': country
-                            })
-
-                    # Find potential speeches that didn't match strict pattern (for manual review)
-                    for potential_match in POTENTIAL_SPEECH_PATTERN.finditer(section_content):
-                        if potential_match.start() not in strict_match_positions:
-                            # This looks like a speech but didn't pass strict validation
-                            line = potential_match.group(0).strip()
-                            flagged_lines.append({
-                                'file': filename,
-                                'line': line[:100],
-                                'reason': 'Potential speech - failed strict pattern validation'
-                            })
-
-                    # Extract speech content (ends at next speech, "The President:", or meeting end)
-                    for i, speech in enumerate(speeches):
-                        start = speech['start']
-
-                        # Find potential end markers
-                        president_match = PRESIDENT_PATTERN.search(section_content[start:])
-                        meeting_end_match = MEETING_END_PATTERN.search(section_content[start:])
-
-                        # Next speech starts where the next intro line begins
-                        next_speech_start = speeches[i + 1]['match_start'] if i + 1 < len(speeches) else len(section_content)
-
-                        # Determine end position from the earliest end marker
-                        end_candidates = [next_speech_start]
-                        if president_match:
-                            end_candidates.append(start + president_match.start())
-                        if meeting_end_match:
-                            end_candidates.append(start + meeting_end_match.start())
-                        end = min(end_candidates)
-
-                        speech_text = section_content[start:end].strip()
-
-                        # Calculate additional metadata
-                        year = get_year(subdir)
-                        region = get_region(speech['country'])
-                        paragraph_count = len([p for p in speech_text.split('\n\n') if p.strip()])
-                        language = speech['language'] if speech['language'] else 'English'
-
-                        # Generate unique speech ID and filename
-                        speech_counter += 1
-                        speech_id = f"speech_{speech_counter:05d}"
-                        base_name = os.path.splitext(filename)[0]
-                        safe_country = sanitize_filename(speech['country'])
-                        speech_filename = f"{speech_id}_{base_name}_{safe_country}.txt"
-                        speech_path = os.path.join(output_subdir, speech_filename)
-
-                        # Write speech file with comprehensive header for ATLAS.ti
-                        with open(speech_path, 'w', encoding='utf-8') as out_f:
-                            out_f.write(f"[METADATA]\n")
-                            out_f.write(f"Speech ID: {speech_id}\n")
-                            out_f.write(f"Year: {year}\n")
-                            out_f.write(f"Session: {subdir.replace('session_', '')}\n")
-                            out_f.write(f"Meeting: {base_name}\n")
-                            out_f.write(f"Country: {speech['country']}\n")
-                            out_f.write(f"Region: {region}\n")
-                            out_f.write(f"Speaker: {speech['speaker']}\n")
-                            out_f.write(f"Language: {language}\n")
-                            # Chinese-led organization membership (at time of speech)
-                            out_f.write(f"FOCAC Member: {is_member_at_time(speech['country'], FOCAC_MEMBERS, year)}\n")
-                            out_f.write(f"CASCF Member: {is_member_at_time(speech['country'], CASCF_MEMBERS, year)}\n")
-                            out_f.write(f"SCO Member: {is_member_at_time(speech['country'], SCO_MEMBERS, year)}\n")
-                            out_f.write(f"BRI Member: {is_member_at_time(speech['country'], BRI_MEMBERS, year, BRI_EXITED)}\n")
-                            out_f.write(f"CELAC Member: {is_member_at_time(speech['country'], CELAC_MEMBERS, year)}\n")
-                            out_f.write(f"[/METADATA]\n\n")
-                            out_f.write(speech_text)
-
-                        # Calculate Chinese org membership
-                        country = speech['country']
-                        focac_joined = FOCAC_MEMBERS.get(country)
-                        cascf_joined = CASCF_MEMBERS.get(country)
-                        sco_joined = SCO_MEMBERS.get(country)
-                        bri_joined = BRI_MEMBERS.get(country)
-                        bri_exited = BRI_EXITED.get(country)
-                        celac_joined = CELAC_MEMBERS.get(country)
-
-                        # Boolean: is member (ever joined, regardless of exit)
-                        is_focac = focac_joined is not None
-                        is_cascf = cascf_joined is not None
-                        is_sco = sco_joined is not None
-                        is_bri = bri_joined is not None
-                        is_celac = celac_joined is not None
-
-                        # Boolean: was member at time of speech (accounts for exits)
-                        focac_at_speech = is_member_at_time(country, FOCAC_MEMBERS, year)
-                        cascf_at_speech = is_member_at_time(country, CASCF_MEMBERS, year)
-                        sco_at_speech = is_member_at_time(country, SCO_MEMBERS, year)
-                        bri_at_speech = is_member_at_time(country, BRI_MEMBERS, year, BRI_EXITED)
-                        celac_at_speech = is_member_at_time(country, CELAC_MEMBERS, year)
-
-                        # Track metadata for all speeches
-                        # meeting_id: filename without extension (e.g., "meeting_48_05")
-                        meeting_id = os.path.splitext(filename)[0]
-                        is_head_of_state = bool(HEAD_OF_STATE_PATTERN.match(speech['speaker']))
-                        word_count = len(speech_text.split())
-                        all_speeches.append({
-                            'speech_id': speech_id,
-                            'meeting_id': meeting_id,
-                            'session': subdir,
-                            'year': year,
-                            'source_file': filename,
-                            'output_file': speech_filename,
-                            'output_path': speech_path,
-                            'speaker': speech['speaker'],
-                            'country': speech['country'],
-                            'region': region,
-                            'language': language,
-                            'word_count': word_count,
-                            'paragraph_count': paragraph_count,
-                            'is_head_of_state': is_head_of_state,
-                            # Chinese-led organization membership (boolean: ever member)
-                            'is_focac_member': is_focac,
-                            'is_cascf_member': is_cascf,
-                            'is_sco_member': is_sco,
-                            'is_bri_member': is_bri,
-                            # Join year (None if not member)
-                            'focac_joined': focac_joined,
-                            'cascf_joined': cascf_joined,
-                            'sco_joined': sco_joined,
-                            'bri_joined': bri_joined,
-                            # Exit year (None if not exited) - currently only BRI has exits
-                            'bri_exited': bri_exited,
-                            # Was member at time of speech (accounts for exits)
-                            'focac_at_speech': focac_at_speech,
-                            'cascf_at_speech': cascf_at_speech,
-                            'sco_at_speech': sco_at_speech,
-                            'bri_at_speech': bri_at_speech,
-                            # China-CELAC Forum membership
-                            'is_celac_member': is_celac,
-                            'celac_joined': celac_joined,
-                            'celac_at_speech': celac_at_speech,
-                        })
-
-                        # Accumulate for meeting-level metadata
-                        meeting_word_count += word_count
-                        meeting_countries.add(speech['country'])
-                        meeting_languages.add(language)
-                        meeting_speech_count += 1
-                        if is_head_of_state:
-                            meeting_head_of_state_count += 1
-
-                    # Track meeting-level metadata (aggregated from extracted speeches)
-                    meeting_id = os.path.splitext(filename)[0]
-                    meeting_flagged_count = sum(1 for f in flagged_lines if f['file'] == filename)
-                    all_meetings.append({
-                        'meeting_id': meeting_id,
-                        'session': subdir,
-                        'meeting_file': filename,
-                        'speech_count': meeting_speech_count,
-                        'country_count': len(meeting_countries),
-                        'countries': '; '.join(sorted(meeting_countries)),
-                        'languages': '; '.join(sorted(meeting_languages)),
-                        'total_word_count': meeting_word_count,
-                        'head_of_state_count': meeting_head_of_state_count,
-                        'flagged_count': meeting_flagged_count
-                    })
-
-    # Create DataFrames and save to CSV
-    df = pd.DataFrame(all_speeches)
-    df.to_csv(metadata_csv, index=False)
-
-    df_meetings = pd.DataFrame(all_meetings)
-
-    # Create ATLAS.ti-compatible document variables CSV
-    # ATLAS.ti expects: Document Name, Variable1, Variable2, ...
-    # Document Name must match the filename exactly (without path)
+                    meeting_files.append((subdir, filename))
+    return meeting_files
+
+
+# Membership columns of speech_metadata.csv, in output order
+SPEECH_MEMBERSHIP_COLUMNS = [
+    # Boolean: is member (ever joined, regardless of exit)
+    'is_focac_member', 'is_cascf_member', 'is_sco_member', 'is_bri_member',
+    # Join year (None if not member)
+    'focac_joined', 'cascf_joined', 'sco_joined', 'bri_joined',
+    # Exit year (None if not exited) - currently only BRI has exits
+    'bri_exited',
+    # Was member at time of speech (accounts for exits)
+    'focac_at_speech', 'cascf_at_speech', 'sco_at_speech', 'bri_at_speech',
+    # China-CELAC Forum membership
+    'is_celac_member', 'celac_joined', 'celac_at_speech',
+]
+
+# Join/exit years are None for most countries, so the metadata CSV has always
+# written them as floats ("2014.0")
+SPEECH_YEAR_COLUMNS = [column for column in SPEECH_MEMBERSHIP_COLUMNS if column.endswith(('_joined', '_exited'))]
+
+
+def mean(total, count):
+    """total / count, or NaN for no items (as pandas' mean of an empty column)."""
+    return total / count if count else float('nan')
+
+
+def atlasti_frame(df):
+    """
+    ATLAS.ti-compatible document variables for a batch of speech metadata rows.
+    ATLAS.ti expects: Document Name, Variable1, Variable2, ...
+    Document Name must match the filename exactly (without path)
+    """
     df_atlasti = df[['output_file', 'speech_id', 'session', 'year', 'country', 'region',
                       'speaker', 'language', 'word_count', 'paragraph_count', 'is_head_of_state',
                       'is_focac_member', 'is_cascf_member', 'is_sco_member', 'is_bri_member', 'is_celac_member',
@@ -703,10 +525,309 @@ def split_texts():
         'bri_at_speech': 'BRI At Speech',
         'celac_at_speech': 'CELAC At Speech',
     })
-    df_atlasti.to_csv(atlasti_variables_csv, index=False)
-    df_meetings.to_csv(meeting_metadata_csv, index=False)
+    return df_atlasti
+
+
+def list_extraction_jobs(manifest, force=False):
+    """
+    List (session, filename, txt_path, input_hash, cached) for every meeting
+    .txt file, where cached is the manifest's cached extraction if the file and
+    the extraction patterns are unchanged since it was made (and not force), else None.
+    """
+    jobs = []
+    for subdir, filename in list_meeting_files():
+        txt_path = os.path.join(fulltxt_dir, subdir, filename)
+        input_hash = manifest.file_hash(txt_path)
+        cached = None
+        if not force and manifest.is_fresh('split', txt_path, input_hash, EXTRACTION_PARAMS_HASH):
+            cached = manifest.get('split', txt_path)['payload']
+        jobs.append((subdir, filename, txt_path, input_hash, cached))
+    return jobs
+
+
+def extract_meetings(manifest, jobs, workers=1, metrics=DISABLED):
+    """
+    Yield (session, filename, extraction) for each job from list_extraction_jobs(),
+    in job order, recording new extractions in the manifest.
+    With workers > 1, meetings are extracted in a process pool.
+    With metrics enabled, each meeting's extraction is timed where it runs.
+    """
+    extract = partial(timed_call, extract_meeting_file) if metrics.enabled else extract_meeting_file
+    with (multiprocessing.Pool(workers) if workers > 1 else nullcontext()) as pool:
+        file_jobs = [(txt_path, cached) for _, _, txt_path, _, cached in jobs]
+        # imap yields results in submission order, whatever order the workers finish in
+        results = pool.imap(extract, file_jobs) if pool else map(extract, file_jobs)
+        for (subdir, filename, txt_path, input_hash, cached), result in zip(jobs, results):
+            if metrics.enabled:
+                result, wall, cpu = result
+                metrics.record_file(txt_path, wall, cpu, step='extract', bytes_read=os.path.getsize(txt_path),
+                                    status='cached' if cached is not None else None)
+            extraction, payload = result
+            if payload is not None:
+                manifest.record('split', txt_path, input_hash, EXTRACTION_PARAMS_HASH, payload=payload)
+            yield subdir, filename, extraction
+
+
+def split_texts(workers=1, force=False, parquet=False, output='files', metrics=DISABLED):
+    """
+    Split every meeting into per-speech files and write the metadata CSVs and log.
+    With workers > 1, meetings are extracted in a process pool; results are
+    consumed in the same order as a serial run, so speech IDs are identical.
+
+    The build manifest makes re-runs incremental: meetings whose text and
+    extraction patterns are unchanged reuse their cached speech spans, and
+    speech files whose content is unchanged are not rewritten. Speech files
+    from earlier runs that this run no longer produces are removed.
+    force ignores the manifest and rebuilds everything.
+    With parquet, the speech and meeting metadata are also written as typed
+    Parquet files (see corpus_schema.py).
+    output is 'files' (one ATLAS.ti .txt file per speech), 'store' (a single
+    corpus store, see corpus_store.py) or 'both'; with 'files', a corpus store
+    from an earlier run is removed so it can't shadow the new files, and with
+    'store', speech files from earlier runs are removed (`python corpus_store.py
+    export` writes them back to their output_path).
+    metrics (see instrumentation.py) records the stage and per-meeting timings.
+    """
+    with metrics.stage('split'):
+        manifest = BuildManifest()
+        jobs = list_extraction_jobs(manifest, force)
+        reused_meetings = sum(1 for job in jobs if job[-1] is not None)
+        split_meetings(extract_meetings(manifest, jobs, workers, metrics), manifest, total=len(jobs), force=force,
+                       parquet=parquet, output=output, reused_meetings=reused_meetings, metrics=metrics)
+
+
+def split_meetings(meetings, manifest, total=None, force=False, parquet=False, output='files', reused_meetings=0,
+                   metrics=DISABLED):
+    """
+    Write the speech outputs, metadata CSVs, review store and log for an
+    iterable of (session, filename, extraction) in processing order, where
+    extraction is as returned by extract_meeting_text() (None if skipped).
+    Speech IDs are assigned in that order. Closes the manifest when done.
+    See split_texts() for force, parquet, output and metrics.
+
+    If the run is interrupted, the metadata CSVs and the ATLAS.ti variables
+    file keep the batches written so far. The Parquet files, corpus store and
+    review store are written to .tmp files that only replace the previous
+    ones when the run completes, and the log is written last, so none of
+    those is left half-written.
+    """
+    # Initialize log
+    os.makedirs(speech_dir, exist_ok=True)
+    speech_counter = 0  # Global counter for unique speech IDs
+    membership_index = MembershipIndex()
+    written_speeches = 0
+    speech_paths = set()  # Every speech file this run produces
+    write_files = output in ('files', 'both')
+    store = CorpusStoreWriter(corpus_store_path) if output in ('store', 'both') else None
+    if store is None and os.path.exists(corpus_store_path):
+        # iter_speeches() prefers the store, which would still hold an earlier run's speeches
+        os.remove(corpus_store_path)
+    # Review items (flagged lines, skipped files, head-of-state speeches) go
+    # straight to the review store, which keeps running counts
+    review = ReviewStoreWriter(review_store_path)
+
+    # Metadata rows are written in batches as meetings finish, with running
+    # counters for the log's summary statistics
+    atlasti_file = open(atlasti_variables_csv, 'w', encoding='utf-8', newline='')
+
+    def write_speech_batch(df):
+        atlasti_frame(df).to_csv(atlasti_file, header=atlasti_file.tell() == 0, index=False)
+        atlasti_file.flush()
+        if store is not None:
+            store.add_metadata(df)
+
+    all_speeches = TableWriter(SPEECH_DTYPES, metadata_csv, metadata_parquet if parquet else None,
+                               float_columns=SPEECH_YEAR_COLUMNS, on_batch=write_speech_batch)
+    all_meetings = TableWriter(MEETING_DTYPES, meeting_metadata_csv, meeting_metadata_parquet if parquet else None)
+    if not parquet:
+        # Parquet files from an earlier --parquet run no longer match the CSVs
+        for path in (metadata_parquet, meeting_metadata_parquet):
+            if os.path.exists(path):
+                os.remove(path)
+    session_counts = Counter()
+    country_counts = Counter()
+    language_counts = Counter()
+    total_word_count = 0
+    head_of_state_count = 0
+    for subdir, filename, extraction in tqdm(meetings, total=total, desc="Meetings"):
+        if extraction is None:
+            review.add(
+                'skipped_file',
+                session=subdir,
+                file=filename,
+                reason='No general debate pattern found'
+            )
+            continue
+        meeting_started, meeting_started_cpu = time.perf_counter(), time.process_time()
+        meeting_bytes_written = 0
+        output_subdir = os.path.join(speech_dir, subdir)
+        if write_files:
+            os.makedirs(output_subdir, exist_ok=True)
 
-    # Write log file with summary statistics and review items
+        # Initialize meeting-level accumulators
+        meeting_word_count = 0
+        meeting_countries = set()
+        meeting_languages = set()
+        meeting_speech_count = 0
+        meeting_head_of_state_count = 0
+
+        # Track head-of-state speeches for review
+        for speech in extraction['speeches']:
+            if HEAD_OF_STATE_PATTERN.match(speech['speaker']):
+                review.add(
+                    'head_of_state',
+                    session=subdir,
+                    file=filename,
+                    speaker=speech['speaker'],
+                    country=speech['country']
+                )
+
+        for line in extraction['flagged_lines']:
+            review.add(
+                'flagged_line',
+                session=subdir,
+                file=filename,
+                line=line,
+                reason='Potential speech - failed strict pattern validation'
+            )
+
+        for speech in extraction['speeches']:
+            speech_text = speech['text']
+
+            # Calculate additional metadata
+            year = get_year(subdir)
+            region = get_region(speech['country'])
+            paragraph_count = len([p for p in speech_text.split('\n\n') if p.strip()])
+            language = speech['language'] if speech['language'] else 'English'
+
+            # Generate unique speech ID and filename
+            speech_counter += 1
+            speech_id = f"speech_{speech_counter:05d}"
+            base_name = os.path.splitext(filename)[0]
+            safe_country = sanitize_filename(speech['country'])
+            speech_filename = f"{speech_id}_{base_name}_{safe_country}.txt"
+            speech_path = os.path.join(output_subdir, speech_filename)
+
+            # Chinese-led organization membership, looked up once per (country, year)
+            membership = membership_index.record(speech['country'], year)
+
+            # Speech file with comprehensive header for ATLAS.ti
+            header = (
+                f"[METADATA]\n"
+                f"Speech ID: {speech_id}\n"
+                f"Year: {year}\n"
+                f"Session: {subdir.replace('session_', '')}\n"
+                f"Meeting: {base_name}\n"
+                f"Country: {speech['country']}\n"
+                f"Region: {region}\n"
+                f"Speaker: {speech['speaker']}\n"
+                f"Language: {language}\n"
+                # Chinese-led organization membership (at time of speech)
+                f"FOCAC Member: {membership['focac_at_speech']}\n"
+                f"CASCF Member: {membership['cascf_at_speech']}\n"
+                f"SCO Member: {membership['sco_at_speech']}\n"
+                f"BRI Member: {membership['bri_at_speech']}\n"
+                f"CELAC Member: {membership['celac_at_speech']}\n"
+                f"[/METADATA]\n\n"
+            )
+            if store is not None:
+                store.add_speech(speech_id, header, speech_text)
+
+            # Only rewrite the file if its content changed since the last run
+            if write_files:
+                document = header + speech_text
+                document_bytes = document.encode('utf-8')
+                document_hash = hash_bytes(document_bytes)
+                speech_paths.add(speech_path)
+                if force or not manifest.is_fresh('speech', speech_path, document_hash, output_path=speech_path):
+                    with open(speech_path, 'w', encoding='utf-8') as out_f:
+                        out_f.write(document)
+                    manifest.record('speech', speech_path, document_hash, output_path=speech_path, output_hash=document_hash)
+                    written_speeches += 1
+                    meeting_bytes_written += len(document_bytes)
+
+            # Track metadata for all speeches
+            # meeting_id: filename without extension (e.g., "meeting_48_05")
+            meeting_id = os.path.splitext(filename)[0]
+            is_head_of_state = bool(HEAD_OF_STATE_PATTERN.match(speech['speaker']))
+            word_count = len(speech_text.split())
+            all_speeches.append(
+                speech_id=speech_id,
+                meeting_id=meeting_id,
+                session=subdir,
+                year=year,
+                source_file=filename,
+                output_file=speech_filename,
+                output_path=speech_path,
+                speaker=speech['speaker'],
+                country=speech['country'],
+                region=region,
+                language=language,
+                word_count=word_count,
+                paragraph_count=paragraph_count,
+                is_head_of_state=is_head_of_state,
+                # Chinese-led organization membership (ever member, join/exit years,
+                # member at time of speech), in SPEECH_MEMBERSHIP_COLUMNS order
+                **{column: membership[column] for column in SPEECH_MEMBERSHIP_COLUMNS},
+            )
+
+            # Accumulate for meeting-level metadata
+            meeting_word_count += word_count
+            meeting_countries.add(speech['country'])
+            meeting_languages.add(language)
+            meeting_speech_count += 1
+            if is_head_of_state:
+                meeting_head_of_state_count += 1
+
+            # Running counters for the summary statistics
+            session_counts[subdir] += 1
+            country_counts[speech['country']] += 1
+            language_counts[language] += 1
+            total_word_count += word_count
+            head_of_state_count += is_head_of_state
+
+        # Track meeting-level metadata (aggregated from extracted speeches)
+        meeting_id = os.path.splitext(filename)[0]
+        meeting_flagged_count = review.count('flagged_line', file=filename)
+        all_meetings.append(
+            meeting_id=meeting_id,
+            session=subdir,
+            meeting_file=filename,
+            speech_count=meeting_speech_count,
+            country_count=len(meeting_countries),
+            countries='; '.join(sorted(meeting_countries)),
+            languages='; '.join(sorted(meeting_languages)),
+            total_word_count=meeting_word_count,
+            head_of_state_count=meeting_head_of_state_count,
+            flagged_count=meeting_flagged_count
+        )
+        metrics.record_file(os.path.join(fulltxt_dir, subdir, filename), time.perf_counter() - meeting_started,
+                            time.process_time() - meeting_started_cpu, step='write',
+                            bytes_written=meeting_bytes_written, speeches=meeting_speech_count)
+
+    # Remove speech files written by earlier runs that this run no longer produces
+    # (e.g. speech IDs shifted after a pattern change, or all of them with
+    # output 'store', so output_path never points at an outdated file)
+    removed_speeches = 0
+    for stale_path in set(manifest.keys('speech')) - speech_paths:
+        if os.path.exists(stale_path):
+            os.remove(stale_path)
+            removed_speeches += 1
+        manifest.forget('speech', stale_path)
+    manifest.close()
+
+    # Write the remaining metadata rows
+    all_speeches.close()
+    all_meetings.close()
+    atlasti_file.close()
+    if store is not None:
+        store.close()
+
+    # Write log file with summary statistics and review items, reading the
+    # review items back from the review store
+    skipped_count = review.total('skipped_file')
+    head_of_state_total = review.total('head_of_state')
+    flagged_count = review.total('flagged_line')
     with open(log_file, 'w', encoding='utf-8') as f:
         f.write(f"Speech Extraction Log - {datetime.now().isoformat()}\n")
         f.write("=" * 80 + "\n\n")
@@ -714,27 +835,25 @@ def split_texts():
         # Section 0: Summary Statistics
         f.write("SUMMARY STATISTICS\n")
         f.write("-" * 40 + "\n")
-        f.write(f"Total files found: {len(all_meetings) + len(skipped_files)}\n")
+        f.write(f"Total files found: {len(all_meetings) + skipped_count}\n")
         f.write(f"Total meetings processed: {len(all_meetings)}\n")
-        f.write(f"Files skipped (no general debate): {len(skipped_files)}\n")
+        f.write(f"Files skipped (no general debate): {skipped_count}\n")
         f.write(f"Total speeches extracted: {len(all_speeches)}\n")
-        f.write(f"Total sessions processed: {df['session'].nunique()}\n")
-        f.write(f"Total countries represented: {df['country'].nunique()}\n")
-        f.write(f"Total word count: {df['word_count'].sum():,}\n")
-        f.write(f"Average speech length: {df['word_count'].mean():.0f} words\n")
-        f.write(f"Average speeches per meeting: {df_meetings['speech_count'].mean():.1f}\n")
-        f.write(f"Head-of-state speeches: {df['is_head_of_state'].sum()}\n")
+        f.write(f"Total sessions processed: {len(session_counts)}\n")
+        f.write(f"Total countries represented: {len(country_counts)}\n")
+        f.write(f"Total word count: {total_word_count:,}\n")
+        f.write(f"Average speech length: {mean(total_word_count, len(all_speeches)):.0f} words\n")
+        f.write(f"Average speeches per meeting: {mean(len(all_speeches), len(all_meetings)):.1f}\n")
+        f.write(f"Head-of-state speeches: {head_of_state_count}\n")
         f.write(f"\nSpeeches by session:\n")
-        session_counts = df.groupby('session').size().sort_index()
-        for session, count in session_counts.items():
+        for session, count in sorted(session_counts.items()):
             f.write(f"  {session}: {count}\n")
         f.write(f"\nTop 10 countries by speech count:\n")
-        country_counts = df['country'].value_counts().head(10)
-        for country, count in country_counts.items():
+        # most_common() keeps first-seen order among ties
+        for country, count in country_counts.most_common(10):
             f.write(f"  {country}: {count}\n")
         f.write(f"\nLanguage breakdown:\n")
-        lang_counts = df['language'].value_counts()
-        for lang, count in lang_counts.items():
+        for lang, count in language_counts.most_common():
             f.write(f"  {lang}: {count}\n")
         f.write("\n" + "=" * 80 + "\n\n")
 
@@ -744,9 +863,9 @@ def split_texts():
         f.write("These are speeches by heads of state (titled 'President [Name]') during the\n")
         f.write("General Debate. They are legitimate GA speeches but may warrant separate\n")
         f.write("consideration in your analysis. Discuss with research partners.\n\n")
-        if head_of_state_speeches:
-            f.write(f"Found {len(head_of_state_speeches)} head-of-state speeches:\n\n")
-            for item in head_of_state_speeches:
+        if head_of_state_total:
+            f.write(f"Found {head_of_state_total} head-of-state speeches:\n\n")
+            for item in review.iter_items('head_of_state'):
                 f.write(f"  {item['speaker']} ({item['country']}) - {item['file']}\n")
         else:
             f.write("No head-of-state speeches found.\n")
@@ -757,9 +876,9 @@ def split_texts():
         f.write("-" * 40 + "\n")
         f.write("These files were skipped because they don't contain the 'Agenda item ... General debate'\n")
         f.write("pattern. They may be procedural meetings, elections, or other non-debate sessions.\n\n")
-        if skipped_files:
-            f.write(f"Skipped {len(skipped_files)} files:\n\n")
-            for item in sorted(skipped_files, key=lambda x: (x['session'], x['file'])):
+        if skipped_count:
+            f.write(f"Skipped {skipped_count} files:\n\n")
+            for item in review.iter_items('skipped_file', order_by=('session', 'file', 'id')):
                 f.write(f"  {item['session']}/{item['file']}\n")
         else:
             f.write("No files skipped - all files contained general debate section.\n")
@@ -769,31 +888,53 @@ def split_texts():
         f.write("FLAGGED LINES FOR MANUAL REVIEW\n")
         f.write("-" * 40 + "\n")
         f.write("These lines look like delegate speeches but failed strict pattern validation.\n\n")
-        if flagged_lines:
-            f.write(f"Found {len(flagged_lines)} flagged lines:\n\n")
-            for item in flagged_lines:
+        if flagged_count:
+            f.write(f"Found {flagged_count} flagged lines:\n\n")
+            for item in review.iter_items('flagged_line'):
                 f.write(f"File: {item['file']}\n")
                 f.write(f"Line: {item['line']}\n")
                 f.write(f"Reason: {item['reason']}\n")
                 f.write("-" * 40 + "\n")
         else:
             f.write("No flagged lines - all potential speeches matched strict pattern.\n")
+    review.close()
 
     # Print summary
-    print(f"\n✅ Extracted {len(all_speeches)} speeches from {len(all_meetings)} meetings across {df['session'].nunique()} sessions")
+    print(f"\n✅ Extracted {len(all_speeches)} speeches from {len(all_meetings)} meetings across {len(session_counts)} sessions")
+    print(f"♻️  Reused cached extraction for {reused_meetings} meetings; wrote {written_speeches} new or changed speech files, removed {removed_speeches} stale ones")
     print(f"📊 Speech metadata saved to: {metadata_csv}")
     print(f"📊 Meeting metadata saved to: {meeting_metadata_csv}")
     print(f"📊 ATLAS.ti document variables saved to: {atlasti_variables_csv}")
+    if store is not None:
+        print(f"📚 Corpus store saved to: {corpus_store_path}")
+    if parquet:
+        print(f"📦 Typed Parquet metadata saved to: {metadata_parquet}, {meeting_metadata_parquet}")
     print(f"📋 Extraction log written to: {log_file}")
-    if head_of_state_speeches:
-        print(f"   ℹ️  {len(head_of_state_speeches)} head-of-state/government speeches noted for review")
-    if skipped_files:
-        print(f"   ℹ️  {len(skipped_files)} files skipped (no general debate pattern)")
-    if flagged_lines:
-        print(f"   ⚠️  {len(flagged_lines)} potential speeches flagged for manual review")
+    print(f"📋 Review queue saved to: {review_store_path} (query with review_store.py)")
+    if head_of_state_total:
+        print(f"   ℹ️  {head_of_state_total} head-of-state/government speeches noted for review")
+    if skipped_count:
+        print(f"   ℹ️  {skipped_count} files skipped (no general debate pattern)")
+    if flagged_count:
+        print(f"   ⚠️  {flagged_count} potential speeches flagged for manual review")
     else:
         print("   ✓ No flagged lines - all potential speeches matched strict pattern")
 
 
 if __name__ == "__main__":
-    split_texts()
+    parser = argparse.ArgumentParser(description="Split full-text meeting records into per-speech files.")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Number of processes used to extract meetings (default: 1, serial)")
+    parser.add_argument("--force", action="store_true",
+                        help="Ignore the build manifest: re-extract every meeting and rewrite every speech file")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Also write the speech and meeting metadata as typed Parquet files")
+    parser.add_argument("--output", choices=["files", "store", "both"], default="files",
+                        help="Write one .txt file per speech (files, the default), a single corpus store "
+                             "(store, see corpus_store.py), or both")
+    parser.add_argument("--metrics", nargs="?", const=METRICS_PATH, default=None, metavar="PATH",
+                        help=f"Record stage and per-meeting timings as JSON lines (default path: {METRICS_PATH})")
+    args = parser.parse_args()
+    metrics = Instrumentation(args.metrics) if args.metrics else DISABLED
+    split_texts(workers=args.workers, force=args.force, parquet=args.parquet, output=args.output, metrics=metrics)
+    metrics.print_summary()
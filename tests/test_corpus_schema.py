@@ -0,0 +1,44 @@
+import os
+
+import pandas as pd
+
+from corpus_schema import MEETING_DTYPES, TableWriter, load_meeting_metadata
+
+
+def meeting_row(i):
+    return dict(meeting_id=f"meeting_48_{i:02d}", session='session_48', meeting_file=f"meeting_48_{i:02d}.txt",
+                speech_count=2, country_count=2, countries='Kenya; Peru', languages='English',
+                total_word_count=1000 + i, head_of_state_count=0, flagged_count=1)
+
+
+def test_interrupted_writer_leaves_csv_batches_and_no_parquet(tmp_path):
+    csv_path, parquet_path = str(tmp_path / 'meetings.csv'), str(tmp_path / 'meetings.parquet')
+    writer = TableWriter(MEETING_DTYPES, csv_path, parquet_path, batch_size=2)
+    for i in range(5):
+        writer.append(**meeting_row(i))
+    # Not closed, as if the run were killed: two full batches are on disk
+    assert len(pd.read_csv(csv_path)) == 4
+    assert not os.path.exists(parquet_path)
+
+    writer.close()
+    assert not os.path.exists(parquet_path + ".tmp")
+    df = load_meeting_metadata(parquet_path, csv_path)
+    assert len(df) == 5
+    assert str(df['session'].dtype) == 'category'
+
+
+def test_stale_parquet_is_ignored_for_newer_csv(tmp_path):
+    csv_path, parquet_path = str(tmp_path / 'meetings.csv'), str(tmp_path / 'meetings.parquet')
+    writer = TableWriter(MEETING_DTYPES, csv_path, parquet_path)
+    writer.append(**meeting_row(1))
+    writer.close()
+
+    writer = TableWriter(MEETING_DTYPES, csv_path)
+    for i in range(3):
+        writer.append(**meeting_row(i))
+    writer.close()
+    # A run without --parquet rewrote the CSV after the Parquet file
+    os.utime(parquet_path, (os.path.getmtime(csv_path) - 60,) * 2)
+    df = load_meeting_metadata(parquet_path, csv_path)
+    assert df['meeting_id'].tolist() == ['meeting_48_00', 'meeting_48_01', 'meeting_48_02']
+    assert str(df['total_word_count'].dtype) == 'Int32'
@@ -0,0 +1,47 @@
+import pytest
+
+from countries import ALIAS_CODES, by_code, country_code
+
+
+@pytest.mark.parametrize("name, code", [
+    ("Canada", "CAN"),
+    ("Cape Verde", "CPV"),
+    ("Sao Tomé and Principe", "STP"),
+    ("Tanzania, United Republic of", "TZA"),
+    ("Iran (Islamic Republic of)", "IRN"),
+    ("Cote d'Ivoire", "CIV"),
+    ("St. Lucia", "LCA"),
+    ("the Bahamas", "BHS"),
+])
+def test_known_spellings_resolve(name, code):
+    assert country_code(name) == code
+
+
+def test_codes_only_resolve_as_written():
+    assert country_code("CAN") == "CAN"
+    assert country_code("AND") == "AND"
+    for word in ("can", "and", "Can", "chn"):
+        assert country_code(word) is None
+    assert "can" not in ALIAS_CODES and "and" not in ALIAS_CODES
+
+
+def test_fuzzy_fallback_tolerates_typos_but_not_neighbours():
+    assert country_code("Phillipines") == "PHL"
+    assert country_code("Phillipines", fuzzy=False) is None
+    assert country_code("Niger") == "NER"
+    assert country_code("Nigeria") == "NGA"
+    assert country_code("Guinea") != country_code("Guyana")
+
+
+def test_unknown_and_non_strings():
+    assert country_code("Atlantis") is None
+    assert country_code("") is None
+    assert country_code(float('nan')) is None
+
+
+def test_by_code_rekeys_and_rejects_duplicates():
+    assert by_code({"Viet Nam": 1, "CHN": 2}) == {"VNM": 1, "CHN": 2}
+    with pytest.raises(KeyError):
+        by_code({"Atlantis": 1})
+    with pytest.raises(ValueError):
+        by_code({"Vietnam": 1, "Viet Nam": 2})
@@ -0,0 +1,28 @@
+import os
+
+from frame_lexicon import FrameMatcher, load_lexicon
+
+LEXICON_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'frame-lexicon.csv')
+
+
+def test_lexicon_compiles():
+    lexicon = load_lexicon(LEXICON_PATH)
+    matcher = FrameMatcher(lexicon)
+    assert len(matcher.phrases) == len(lexicon)
+
+
+def test_overlapping_phrases_count_once_per_frame():
+    matcher = FrameMatcher([('shared_future', 'community with a shared future'),
+                            ('shared_future', 'community with a shared future for mankind'),
+                            ('shared_future', 'shared future for mankind'),
+                            ('win_win', 'win-win')])
+    text = "We seek a community with a shared future for mankind and win–win cooperation."
+    assert matcher.count(text) == [1, 1]
+    frame, phrase, start, end = matcher.find(text)[0]
+    assert text[start:end] == "community with a shared future for mankind"
+
+
+def test_phrases_do_not_match_across_sentences():
+    matcher = FrameMatcher([('win_win', 'mutual benefit')])
+    assert matcher.count("It is mutual. Benefit follows.") == [0]
+    assert matcher.count("For MUTUAL benefit, and mutual  benefit") == [2]
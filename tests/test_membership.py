@@ -0,0 +1,28 @@
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from membership import MembershipIndex
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_join_marks_membership_at_speech_time():
+    speeches = pd.DataFrame({'country': ['Kenya', 'Italy', 'Italy', 'Atlantis'], 'year': [2010, 2019, 2024, 2010]})
+    joined = MembershipIndex().join(speeches)
+    assert joined['is_focac_member'].tolist() == [True, False, False, False]
+    assert joined['focac_joined'][0] == 2000
+    # Italy joined the BRI in 2019 and left in 2023
+    assert joined['bri_at_speech'].tolist() == [False, True, False, False]
+    assert joined['bri_exited'][2] == 2023
+
+
+def test_cli_writes_years_as_split_txt_does(tmp_path):
+    metadata_csv = tmp_path / 'speech_metadata.csv'
+    pd.DataFrame({'country': ['Kenya', 'Atlantis'], 'year': [2010, 2010]}).to_csv(metadata_csv, index=False)
+    subprocess.run([sys.executable, os.path.join(REPO_DIR, 'membership.py'), str(metadata_csv)],
+                   cwd=REPO_DIR, check=True, capture_output=True)
+    written = pd.read_csv(metadata_csv, dtype=str, keep_default_na=False)
+    assert written['focac_joined'].tolist() == ['2000.0', '']
@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from speech_dedup import (EMPTY_SIGNATURE_VALUE, candidate_pairs, find_duplicates, hash_functions, meeting_signatures,
+                          minhash, shingle_hashes)
+
+WORDS = ("peace development cooperation sovereignty security climate trade poverty health education "
+         "dialogue region partnership future justice equality growth reform charter nations").split()
+
+
+def speech(seed, length=200):
+    rng = np.random.default_rng(seed)
+    return ' '.join(rng.choice(WORDS, length))
+
+
+def signature(text):
+    a, b = hash_functions()
+    return minhash(shingle_hashes(text), a, b)
+
+
+def test_shingles():
+    assert len(shingle_hashes("one two three four five six")) == 2
+    # Shorter than a shingle: the whole text is one shingle
+    assert len(shingle_hashes("one two")) == 1
+    assert len(shingle_hashes("")) == 0
+    # Case and punctuation don't change the shingles
+    assert np.array_equal(shingle_hashes("Win-win cooperation, for all of us"),
+                          shingle_hashes("win win cooperation for all of us"))
+
+
+def test_minhash_estimates_jaccard():
+    a, b = hash_functions()
+    left, right = np.arange(0, 1000, dtype=np.uint64), np.arange(500, 1500, dtype=np.uint64)
+    estimate = (minhash(left, a, b) == minhash(right, a, b)).mean()
+    # True Jaccard similarity is 500 / 1500
+    assert abs(estimate - 1 / 3) < 0.15
+    assert (minhash(np.empty(0, dtype=np.uint64), a, b) == EMPTY_SIGNATURE_VALUE).all()
+
+
+def test_candidate_pairs_share_a_band():
+    signatures = np.zeros((3, 8), dtype=np.uint32)
+    signatures[1, :4] = 1  # Row 1 only shares the second band with row 0
+    signatures[2] = 2
+    assert candidate_pairs(signatures, bands=2).tolist() == [[0, 1]]
+    with pytest.raises(ValueError):
+        candidate_pairs(signatures, bands=3)
+
+
+def test_near_duplicates_grouped_under_first_speech():
+    original = speech(1)
+    edited = original.replace(WORDS[0], "peacekeeping", 2)
+    texts = [speech(0), original, speech(2), edited, original, ""]
+    signatures = np.vstack([signature(text) for text in texts])
+    valid = (signatures != EMPTY_SIGNATURE_VALUE).any(axis=1)
+    duplicates = find_duplicates(signatures, threshold=0.8, valid=valid)
+    assert [(row, first) for row, first, _ in duplicates] == [(3, 1), (4, 1)]
+    assert duplicates[1][2] == 1.0
+
+
+def test_meeting_signature_is_minimum_over_speeches():
+    signatures = np.array([[5, 1], [2, 7], [9, 9]], dtype=np.uint32)
+    meetings, merged = meeting_signatures(np.array(['m1', 'm2', 'm1'], dtype=object), signatures)
+    assert meetings.tolist() == ['m1', 'm2']
+    assert merged.tolist() == [[5, 1], [2, 7]]
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from speech_index import _parse_query, decode_varints, encode_varints, parse_filter
+
+
+def test_varint_bytes():
+    data, lengths = encode_varints([0, 1, 127, 128, 300, 16384])
+    assert data.tolist() == [0x00, 0x01, 0x7f, 0x80, 0x01, 0xac, 0x02, 0x80, 0x80, 0x01]
+    assert lengths.tolist() == [1, 1, 1, 2, 2, 3]
+
+
+def test_varint_round_trip():
+    rng = np.random.default_rng(0)
+    values = np.concatenate([rng.integers(0, 2 ** 7, 100), rng.integers(0, 2 ** 21, 100),
+                             rng.integers(0, 2 ** 62, 100), [0, 2 ** 63 - 1]])
+    data, lengths = encode_varints(values)
+    assert lengths.sum() == len(data)
+    assert decode_varints(data).tolist() == values.tolist()
+
+
+def test_varints_empty():
+    data, lengths = encode_varints([])
+    assert len(data) == 0 and len(lengths) == 0
+    assert len(decode_varints(data)) == 0
+
+
+def test_parse_query():
+    assert _parse_query('taiwan "one china"') == [(False, [[(0, 'taiwan')]]), (False, [[(0, 'one china')]])]
+    assert _parse_query('taiwan OR tibet -hegemonism') == [(False, [[(0, 'taiwan')], [(0, 'tibet')]]),
+                                                           (True, [[(0, 'hegemonism')]])]
+    assert _parse_query('taiwan NEAR/5 sovereignty') == [(False, [[(0, 'taiwan'), (5, 'sovereignty')]])]
+    assert _parse_query('china OR taiwan -"one china"') == [(False, [[(0, 'china')], [(0, 'taiwan')]]),
+                                                            (True, [[(0, 'one china')]])]
+    for query in ('', 'OR taiwan', 'taiwan OR', 'NEAR/3 taiwan', 'china OR -taiwan', '-china OR taiwan',
+                  'a NEAR/3 -b', '-a NEAR/3 b', 'a OR "b" OR -"c d"'):
+        with pytest.raises(ValueError):
+            _parse_query(query)
+
+
+def test_parse_filter():
+    assert parse_filter('year', '2013..2019') == range(2013, 2020)
+    assert parse_filter('bri_at_speech', 'true') is True
+    assert parse_filter('region', 'Africa,WEOG') == ['Africa', 'WEOG']
+    assert parse_filter('word_count', '10,20') == [10, 20]
+    with pytest.raises(KeyError):
+        parse_filter('speaker_title', 'x')
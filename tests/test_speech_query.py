@@ -0,0 +1,112 @@
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+
+import pandas as pd
+import pytest
+
+from corpus_schema import SPEECH_DTYPES
+from corpus_store import METADATA_END
+from speech_index import build_index
+from speech_query import BitmapIndex, QueryService, make_server
+
+# (country, region, year, bri_at_speech, text)
+SPEECHES = [
+    ("Kenya", "Africa", 2014, False, "Roads and railways improve connectivity across the region."),
+    ("Kenya", "Africa", 2019, True, "The railway has brought connectivity and win-win cooperation."),
+    ("Italy", "WEOG", 2019, True, "Connectivity between Europe and Asia matters to us."),
+    ("Italy", "WEOG", 2024, False, "We speak of climate and connectivity."),
+    ("Pakistan", "Asia-Pacific", 2016, True, "The economic corridor is a model of win-win cooperation."),
+    ("Peru", "GRULAC", 2017, False, "Peace and development remain our priorities."),
+]
+
+
+def metadata_row(i, country, region, year, bri_at_speech):
+    row = {column: None for column in SPEECH_DTYPES}
+    row.update({column: False for column, dtype in SPEECH_DTYPES.items() if dtype == 'boolean'})
+    session = f"session_{year - 1945}"
+    row.update(speech_id=f"speech_{i:05d}", meeting_id=f"meeting_{year - 1945}_01", session=session, year=year,
+               source_file=f"meeting_{year - 1945}_01.txt", output_file=f"speech_{i:05d}.txt",
+               output_path=os.path.join('.', 'data', 'speech', session, f"speech_{i:05d}.txt"),
+               speaker="Speaker", country=country, region=region, language="English", word_count=9,
+               paragraph_count=1, is_bri_member=bri_at_speech, bri_at_speech=bri_at_speech)
+    return row
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    """A QueryService over a six-speech corpus of per-speech files, with a speech index."""
+    monkeypatch.chdir(tmp_path)
+    rows = [metadata_row(i, *speech[:4]) for i, speech in enumerate(SPEECHES, start=1)]
+    for row, speech in zip(rows, SPEECHES):
+        os.makedirs(os.path.dirname(row['output_path']), exist_ok=True)
+        with open(row['output_path'], 'w', encoding='utf-8') as f:
+            f.write(f"[METADATA]\nspeech_id: {row['speech_id']}\n" + METADATA_END + speech[4])
+    pd.DataFrame(rows, columns=list(SPEECH_DTYPES)).to_csv('./data/speech/speech_metadata.csv', index=False)
+    build_index('./data/index')
+    return QueryService('./data/index')
+
+
+def test_bitmap_index_matches_pandas():
+    df = pd.DataFrame({'region': ['Africa', 'WEOG', 'Africa', None], 'year': [2014, 2019, 2019, 2019],
+                       'word_count': [10, 20, 30, 40]})
+    index = BitmapIndex(df, columns=['region', 'year'])
+    selected = index.select(region='Africa', year=range(2015, 2020))
+    assert index.count(selected) == 1
+    assert index.mask(selected).tolist() == [False, False, True, False]
+    assert index.count(index.select(region=['Africa', 'WEOG'])) == 3
+    # word_count isn't bitmap-indexed and is compared directly
+    assert index.count(index.select(word_count=[20, 40])) == 2
+    assert index.facets('year', index.all) == {2019: 3, 2014: 1}
+    with pytest.raises(KeyError):
+        index.select(speaker='x')
+
+
+def test_count_and_facets(service):
+    filters = service.parse_filters([('bri_at_speech', 'true'), ('year', '2013..2019')])
+    assert service.count(**filters) == 3
+    assert service.count(country='Italy') == 2
+    assert service.count() == len(SPEECHES)
+    assert service.facets('region', **filters) == {'Africa': 1, 'WEOG': 1, 'Asia-Pacific': 1}
+
+
+def test_search_within_filters(service):
+    speeches, hits, results = service.search('connectivity', bri_at_speech=True)
+    assert speeches == 2
+    assert hits == 2
+    assert {result['speech_id'] for result in results} == {'speech_00002', 'speech_00003'}
+    speeches, _, _ = service.search('"win-win cooperation"', region='Asia-Pacific')
+    assert speeches == 1
+
+
+def test_speech_reads_text(service):
+    speech = service.speech('speech_00006')
+    assert speech['country'] == 'Peru'
+    assert speech['text'] == SPEECHES[5][4]
+    assert service.speech('speech_99999') is None
+
+
+def test_http_round_trip(service):
+    server = make_server(service, port=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base_url = f"http://127.0.0.1:{server.server_port}"
+    try:
+        with urllib.request.urlopen(f"{base_url}/count?bri_at_speech=true&year=2013..2019") as response:
+            assert json.load(response)['count'] == 3
+        with urllib.request.urlopen(f"{base_url}/search?q=connectivity&country=Italy&limit=1") as response:
+            body = json.load(response)
+        assert body['speeches'] == 2
+        assert len(body['results']) == 1
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base_url}/count?no_such_column=1")
+        assert error.value.code == 400
+        assert 'no_such_column' in json.load(error.value)['error']
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base_url}/speech/speech_99999")
+        assert error.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
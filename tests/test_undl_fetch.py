@@ -0,0 +1,227 @@
+"""
+undl-fetch.py against a local stub of the UN Digital Library: rate limiting,
+retries on 429/5xx, conditional requests and resumed (Range) downloads.
+"""
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from http_cache import HttpCache
+from script_loader import load_script
+
+undl = load_script('undl-fetch.py')
+
+PDF = b'%PDF-1.4\n' + bytes(range(256)) * 400
+ETAG = '"' + hashlib.md5(PDF).hexdigest() + '"'
+PDF_PATH = '/record/1/files/A_48_PV.5-EN.pdf'
+
+
+class StubLibrary(ThreadingHTTPServer):
+    """
+    Serves one search result and one PDF, and records every request.
+    fail_next holds statuses to answer the next requests with (e.g. 503);
+    truncate_next cuts the next full PDF response short after that many bytes.
+    """
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.base_url = f"http://127.0.0.1:{self.server_address[1]}"
+        self.requests = []  # (path, headers) per request
+        self.fail_next = []
+        self.truncate_next = None
+        self.extra_headers = {}  # Added to full PDF responses
+
+    def pdf_requests(self):
+        return [headers for path, headers in self.requests if path == PDF_PATH]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        path = self.path.split('?')[0]
+        server.requests.append((path, dict(self.headers)))
+        if server.fail_next:
+            return self.send(server.fail_next.pop(0), b'busy', {'Retry-After': '0'})
+        if path == '/search':
+            body = json.dumps([{'recid': 1, 'files': [{'description': 'English',
+                                                       'url': server.base_url + PDF_PATH}]}]).encode()
+            etag = '"' + hashlib.md5(body).hexdigest() + '"'
+            if self.headers.get('If-None-Match') == etag:
+                return self.send(304, headers={'ETag': etag})
+            return self.send(200, body, {'ETag': etag, 'Content-Type': 'application/json'})
+        if path != PDF_PATH:
+            return self.send(404)
+        if self.headers.get('If-None-Match') == ETAG:
+            return self.send(304, headers={'ETag': ETAG})
+        range_header = self.headers.get('Range')
+        if range_header and self.headers.get('If-Range') == ETAG:
+            start = int(range_header.split('=')[1].split('-')[0])
+            if start >= len(PDF):
+                return self.send(416, headers={'Content-Range': f'bytes */{len(PDF)}'})
+            return self.send(206, PDF[start:], {'ETag': ETAG,
+                                                'Content-Range': f'bytes {start}-{len(PDF) - 1}/{len(PDF)}'})
+        if server.truncate_next is not None:
+            # Announce the full length, send part of it and drop the connection
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(PDF)))
+            self.send_header('ETag', ETAG)
+            self.end_headers()
+            self.wfile.write(PDF[:server.truncate_next])
+            server.truncate_next = None
+            self.close_connection = True
+            return
+        self.send(200, PDF, {'ETag': ETAG, **server.extra_headers})
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """A running stub library, with undl-fetch.py's cache, rate limiter and backoff pointed at test settings."""
+    server = StubLibrary()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(undl, 'url', server.base_url)
+    monkeypatch.setattr(undl, 'http_cache', HttpCache(str(tmp_path / 'http-cache')))
+    monkeypatch.setattr(undl, 'http_session', undl.make_session(2))
+    monkeypatch.setattr(undl, 'rate_limiter', undl.RateLimiter(1000, 1000))
+    monkeypatch.setattr(undl, 'BACKOFF_SECONDS', 0.01)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def downloaded_path(tmp_path):
+    return tmp_path / 'pdf' / 'session_48' / 'meeting_48_05.pdf'
+
+
+def test_rate_limiter_allows_burst_then_limits_rate():
+    limiter = undl.RateLimiter(rate=50, burst=3)
+    started = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - started < 0.05
+    for _ in range(5):
+        limiter.acquire()
+    # 5 requests past the burst at 50/s take at least 0.1s
+    assert time.monotonic() - started >= 0.09
+
+
+def test_http_get_retries_on_server_errors(library):
+    library.fail_next = [503, 429]
+    response = undl.http_get(library.base_url + '/search')
+    assert response.status_code == 200
+    assert len(library.requests) == 3
+
+
+def test_http_get_returns_last_error_after_max_retries(library, monkeypatch):
+    monkeypatch.setattr(undl, 'MAX_RETRIES', 2)
+    library.fail_next = [503] * 5
+    response = undl.http_get(library.base_url + '/search')
+    assert response.status_code == 503
+    assert len(library.requests) == 3
+
+
+def test_search_is_revalidated_with_etag(library):
+    first = undl.fetch_meeting_records(1)
+    second = undl.fetch_meeting_records(1)
+    assert first == second
+    assert first[0]['recid'] == 1
+    assert 'If-None-Match' not in library.requests[0][1]
+    assert library.requests[1][1]['If-None-Match']
+
+
+def test_download_then_revalidate_without_transfer(library, tmp_path):
+    pdf_url = library.base_url + PDF_PATH
+    undl.download_pdf(pdf_url, save_folder=str(tmp_path / 'pdf'))
+    assert downloaded_path(tmp_path).read_bytes() == PDF
+
+    undl.download_pdf(pdf_url, save_folder=str(tmp_path / 'pdf'))
+    second = library.pdf_requests()[-1]
+    assert second['If-None-Match'] == ETAG
+    assert downloaded_path(tmp_path).read_bytes() == PDF
+
+
+def test_interrupted_download_resumes_with_range(library, tmp_path):
+    library.truncate_next = 8192
+    undl.download_pdf(library.base_url + PDF_PATH, save_folder=str(tmp_path / 'pdf'), chunk_size=4096)
+    assert downloaded_path(tmp_path).read_bytes() == PDF
+    resumed = library.pdf_requests()[-1]
+    assert resumed['Range'] == 'bytes=8192-'
+    assert resumed['If-Range'] == ETAG
+
+
+def test_checksum_mismatch_discards_download(library, tmp_path, monkeypatch):
+    monkeypatch.setattr(undl, 'MAX_RETRIES', 1)
+    library.extra_headers = {'Content-MD5': 'AAAAAAAAAAAAAAAAAAAAAA=='}
+    undl.download_pdf(library.base_url + PDF_PATH, save_folder=str(tmp_path / 'pdf'))
+    assert not downloaded_path(tmp_path).exists()
+    assert not (tmp_path / 'pdf' / 'session_48' / 'meeting_48_05.pdf.part').exists()
+    assert len(library.pdf_requests()) == 2
+
+
+def test_connection_errors_propagate_after_retries(monkeypatch):
+    monkeypatch.setattr(undl, 'MAX_RETRIES', 1)
+    monkeypatch.setattr(undl, 'BACKOFF_SECONDS', 0.01)
+    monkeypatch.setattr(undl, 'rate_limiter', undl.RateLimiter(1000, 1000))
+    # Bind and close a socket to get a port nothing listens on
+    server = ThreadingHTTPServer(('127.0.0.1', 0), BaseHTTPRequestHandler)
+    port = server.server_address[1]
+    server.server_close()
+    with pytest.raises(requests.ConnectionError):
+        undl.http_get(f"http://127.0.0.1:{port}/search")
+
+
+def test_malformed_checksum_headers_are_ignored():
+    response = requests.Response()
+    response.headers.update({'Digest': 'sha-256=not base64!', 'Content-MD5': '%%%'})
+    assert undl.expected_checksum(response) is None
+    response.headers['Repr-Digest'] = 'sha-256=:' + 'A' * 43 + '=:'
+    assert undl.expected_checksum(response) == ('sha256', bytes(32))
+
+
+def test_download_succeeds_despite_malformed_checksum(library, tmp_path):
+    library.extra_headers = {'Digest': 'md5=***'}
+    undl.download_pdf(library.base_url + PDF_PATH, save_folder=str(tmp_path / 'pdf'))
+    assert downloaded_path(tmp_path).read_bytes() == PDF
+
+
+def interrupted_before_rename(library, tmp_path, part):
+    """Download the PDF, then leave `part` as its .part file, as if the run died before the final rename."""
+    pdf_url = library.base_url + PDF_PATH
+    undl.download_pdf(pdf_url, save_folder=str(tmp_path / 'pdf'))
+    path = downloaded_path(tmp_path)
+    path.unlink()
+    (tmp_path / 'pdf' / 'session_48' / 'meeting_48_05.pdf.part').write_bytes(part)
+    return pdf_url, path
+
+
+def test_complete_part_is_finalized_on_416(library, tmp_path):
+    pdf_url, path = interrupted_before_rename(library, tmp_path, PDF)
+    sha256 = undl.stream_pdf(pdf_url, str(path), {})
+    assert sha256 == hashlib.sha256(PDF).hexdigest()
+    assert path.read_bytes() == PDF
+    assert library.pdf_requests()[-1]['Range'] == f'bytes={len(PDF)}-'
+
+
+def test_overlong_part_is_restarted_on_416(library, tmp_path):
+    pdf_url, path = interrupted_before_rename(library, tmp_path, PDF + b'junk')
+    undl.download_pdf(pdf_url, save_folder=str(tmp_path / 'pdf'))
+    assert path.read_bytes() == PDF
+    assert 'Range' not in library.pdf_requests()[-1]
@@ -1,7 +1,20 @@
 import requests
 import os
 import time
+import re
+import json
+import base64
+import binascii
+import hashlib
+import random
+import argparse
+import threading
 from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from requests.adapters import HTTPAdapter
+from build_manifest import BuildManifest, hash_params
+from http_cache import HttpCache
+from instrumentation import DISABLED, METRICS_PATH, Instrumentation
 
 
 dhlauth_ids = [
@@ -46,7 +59,130 @@ dhlauth_ids = [
 
 url = "https://digitallibrary.un.org"
 
-session_counts: defaultdict[int, int] = defaultdict(int)
+session_counts: defaultdict[str, int] = defaultdict(int)
+session_counts_lock = threading.Lock()
+
+# HTTP settings (overridable from the command line)
+DEFAULT_CONCURRENCY = 4     # Parallel requests
+DEFAULT_RATE = 2.0          # Average requests per second across all threads
+DEFAULT_BURST = 4           # Requests allowed back-to-back before rate limiting kicks in
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0       # First retry delay; doubles on each attempt
+REQUEST_TIMEOUT = 60        # Seconds to wait for the server to respond
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+DEFAULT_CHUNK_SIZE = 1024 * 1024  # Bytes per read when streaming PDFs
+
+# "bytes <first>-<last>/<total or *>" from a 206 Partial Content response
+CONTENT_RANGE_PATTERN = re.compile(r'bytes (\d+)-(\d+)/(\d+|\*)')
+# "bytes */<total>" from a 416 Range Not Satisfiable response
+UNSATISFIED_RANGE_PATTERN = re.compile(r'bytes \*/(\d+)')
+
+# Checksum algorithms a server may announce in Digest / Repr-Digest headers -> hashlib names
+DIGEST_ALGORITHMS = {"sha-256": "sha256", "sha-512": "sha512", "md5": "md5"}
+
+
+class DownloadError(Exception):
+    """A download finished but failed verification (short, overlong, or checksum mismatch)."""
+
+
+class RateLimiter:
+    """
+    Thread-safe token bucket: allows `rate` requests per second on average,
+    with bursts of up to `burst` requests.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+def make_session(concurrency):
+    """Create a requests Session whose connection pool can hold `concurrency` keep-alive connections."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+http_session = make_session(DEFAULT_CONCURRENCY)
+rate_limiter = RateLimiter(DEFAULT_RATE, DEFAULT_BURST)
+http_cache = HttpCache()
+metrics = DISABLED  # Replaced with an Instrumentation when run with --metrics
+
+
+def configure_http(concurrency=DEFAULT_CONCURRENCY, rate=DEFAULT_RATE, burst=DEFAULT_BURST):
+    """Replace the shared session and rate limiter (e.g. from command-line options)."""
+    global http_session, rate_limiter
+    http_session = make_session(concurrency)
+    rate_limiter = RateLimiter(rate, burst)
+
+
+def retry_delay(response, attempt):
+    """Seconds to wait before retrying: the server's Retry-After if given, else exponential backoff with jitter."""
+    if response is not None:
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return float(retry_after)
+    return BACKOFF_SECONDS * (2 ** attempt) * (1 + random.random() / 2)
+
+
+def http_get(endpoint, **kwargs) -> requests.Response:
+    """
+    GET through the shared session and rate limiter, retrying with exponential
+    backoff on 429/5xx responses and connection errors.
+    Returns the last response (which may still be an error status).
+    """
+    for attempt in range(MAX_RETRIES + 1):
+        rate_limiter.acquire()
+        try:
+            response = http_session.get(endpoint, timeout=REQUEST_TIMEOUT, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_RETRIES:
+                raise
+            time.sleep(retry_delay(None, attempt))
+            continue
+        if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+            return response
+        delay = retry_delay(response, attempt)
+        print(f"Got {response.status_code} for {endpoint}, retrying in {delay:.1f}s")
+        response.close()
+        time.sleep(delay)
+    raise AssertionError("unreachable")
+
+
+def get_json(endpoint):
+    """
+    GET a JSON endpoint, revalidating any cached copy with If-None-Match/If-Modified-Since.
+    Returns (status code, parsed JSON or None). A 304 returns (200, cached JSON).
+    """
+    cached_body = http_cache.body(endpoint)
+    headers = http_cache.conditional_headers(endpoint) if cached_body is not None else {}
+    response = http_get(endpoint, headers=headers)
+    if response.status_code == 304 and cached_body is not None:
+        print("Not modified since last fetch: 304")
+        return 200, json.loads(cached_body)
+    if response.status_code != 200:
+        return response.status_code, None
+    response_json = response.json()
+    http_cache.store(endpoint, response, body=response.content)
+    return 200, response_json
 
 
 def fetch_meeting_records(dhlauth_id) -> list | None:
@@ -56,17 +192,16 @@ def fetch_meeting_records(dhlauth_id) -> list | None:
 
     try:
         print("Fetching results for DHLAUTH ID:", dhlauth_id)
-        response = requests.get(endpoint)
-        if response.status_code == 200:
+        status_code, response_json = get_json(endpoint)
+        if status_code == 200:
             print("Data fetched successfully: 200")
-            response_json = response.json()
             if isinstance(response_json, list) and response_json:
                 return response_json
             else:
                 print("Unexpected JSON structure: json")
                 return None
         else:
-            print(f"Error fetching data: {response.status_code}")
+            print(f"Error fetching data: {status_code}")
             return None
 
     except requests.RequestException as e:
@@ -78,9 +213,8 @@ def fetch_record_data(record_id) -> dict | None:
     endpoint = f"{url}/record/{record_id}?of=recjson"
 
     try:
-        response = requests.get(endpoint)
-        if response.status_code == 200:
-            response_json = response.json()
+        status_code, response_json = get_json(endpoint)
+        if status_code == 200:
             if isinstance(response_json, list) and response_json:
                 return response_json[0]
             elif isinstance(response_json, dict):
@@ -89,7 +223,7 @@ def fetch_record_data(record_id) -> dict | None:
                 print("Unexpected JSON structure: json")
                 return None
         else:
-            print(f"Error fetching data: {response.status_code}")
+            print(f"Error fetching data: {status_code}")
             return None
 
     except requests.RequestException as e:
@@ -112,10 +246,137 @@ def get_transcript_pdf_url(record_data: dict) -> str | None:
     return None
 
 
-def download_pdf(url, save_folder="./data"):
+def count_download(session_number):
+    """Count a PDF that is present (downloaded or already current) for its session."""
+    with session_counts_lock:
+        session_counts[session_number] += 1
+
+
+def expected_checksum(response):
+    """
+    (hashlib algorithm name, expected digest bytes) announced by a Repr-Digest,
+    Digest or Content-MD5 header, or None if the server sent no checksum.
+    Malformed (not base64) values are ignored, as if the header were absent.
+    """
+    for header in ("Repr-Digest", "Digest"):
+        for item in response.headers.get(header, "").split(","):
+            name, _, value = item.strip().partition("=")
+            algorithm = DIGEST_ALGORITHMS.get(name.lower())
+            if algorithm and value:
+                try:
+                    return algorithm, base64.b64decode(value.strip(":"), validate=True)
+                except binascii.Error:
+                    continue
+    content_md5 = response.headers.get("Content-MD5")
+    if content_md5:
+        try:
+            return "md5", base64.b64decode(content_md5, validate=True)
+        except binascii.Error:
+            pass
+    return None
+
+
+def stream_pdf(url, file_path, conditional_headers, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Stream url into <file_path>.part, then verify it and atomically rename it to file_path.
+    If a .part file is left from an interrupted download, only the rest is requested
+    (Range + If-Range, so a changed file on the server is fetched from scratch).
+    If the server answers that range with 416, the .part file is finalized when
+    it already has the file's full size and deleted otherwise.
+    The finished file is checked against the expected size and, if the server
+    sends one, its checksum.
+
+    Returns the SHA-256 of the completed file, or None if the server answered
+    the conditional request with 304 (local copy is current).
+    Raises requests exceptions on network errors, leaving the .part file to
+    resume from, and DownloadError if verification fails.
+    """
+    part_path = file_path + ".part"
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    headers = dict(conditional_headers)
+    cached = http_cache.metadata(url) or {}
+    if offset:
+        validator = cached.get("etag") or cached.get("last_modified")
+        if validator:
+            headers = {"Range": f"bytes={offset}-", "If-Range": validator}
+        else:
+            offset = 0  # Can't tell whether the partial file is still valid
+
+    sha256 = hashlib.sha256()
+    with http_get(url, stream=True, headers=headers) as r:
+        if r.status_code == 304:
+            return None
+        if r.status_code == 416 and offset:
+            # Nothing left after the .part file: either it's complete (interrupted
+            # before the rename) or it's longer than the file on the server
+            match = UNSATISFIED_RANGE_PATTERN.match(r.headers.get("Content-Range", ""))
+            total = int(match.group(1)) if match else cached.get("content_length")
+            if total != offset:
+                os.remove(part_path)
+                raise DownloadError(f"Partial download of {url} doesn't match the server's size, restarting")
+            with open(part_path, "rb") as f:
+                for block in iter(lambda: f.read(chunk_size), b""):
+                    sha256.update(block)
+            os.replace(part_path, file_path)
+            return sha256.hexdigest()
+        r.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
+
+        if r.status_code == 206:
+            match = CONTENT_RANGE_PATTERN.match(r.headers.get("Content-Range", ""))
+            if not match or int(match.group(1)) != offset:
+                os.remove(part_path)
+                raise DownloadError(f"Unexpected Content-Range for {url}: {r.headers.get('Content-Range')}")
+            total = int(match.group(3)) if match.group(3) != "*" else None
+        else:
+            offset = 0  # Full response: the server ignored the range or the file changed
+            length = r.headers.get("Content-Length", "")
+            total = int(length) if length.isdigit() else None
+        if r.headers.get("Content-Encoding", "identity") != "identity":
+            total = None  # Content-Length counts compressed bytes
+
+        # Remember the validators now, so an interrupted download can be resumed next time
+        http_cache.store(url, r, content_length=total)
+
+        if offset:
+            with open(part_path, "rb") as f:
+                for block in iter(lambda: f.read(chunk_size), b""):
+                    sha256.update(block)
+        # A checksum header describes the whole file, so only check it on full responses
+        checksum = expected_checksum(r) if r.status_code == 200 else None
+        checksum_hash = hashlib.new(checksum[0]) if checksum else None
+
+        with open(part_path, "ab" if offset else "wb") as f:
+            for chunk in r.iter_content(chunk_size=chunk_size):
+                if chunk: # Filter out keep-alive new chunks
+                    f.write(chunk)
+                    sha256.update(chunk)
+                    if checksum_hash:
+                        checksum_hash.update(chunk)
+
+    size = os.path.getsize(part_path)
+    if total is not None and size != total:
+        if size > total:
+            os.remove(part_path)
+        raise DownloadError(f"Incomplete download of {url}: got {size} of {total} bytes")
+    if checksum and checksum_hash and checksum_hash.digest() != checksum[1]:
+        os.remove(part_path)
+        raise DownloadError(f"Checksum mismatch for {url}")
+    os.replace(part_path, file_path)
+    return sha256.hexdigest()
+
+
+
+def download_pdf(url, save_folder="./data", manifest=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Download one transcript PDF to <save_folder>/session_XX/meeting_XX_YY.pdf. Safe to call from worker threads.
+    If the local file is intact (unchanged since it was fetched from the same URL,
+    per the build manifest, or the same size as the cached Content-Length), the
+    PDF is revalidated with a conditional request and only re-downloaded if the
+    server says it changed.
+    Interrupted downloads are resumed from the partial file, both on retry and on the next run.
+    """
     # Ensure the destination folder exists
-    if not os.path.exists(save_folder):
-        os.makedirs(save_folder)
+    os.makedirs(save_folder, exist_ok=True)
 
     # Extract the filename from the URL or specify a custom one
     document_name = url.split("/")[-1]
@@ -125,43 +386,100 @@ def download_pdf(url, save_folder="./data"):
 
     # Create a subdirectory for the session number
     subdir_path = os.path.join(save_folder, f"session_{session_number}")
-    if not os.path.exists(subdir_path):
-        os.makedirs(subdir_path)
+    os.makedirs(subdir_path, exist_ok=True)
 
     file_path = os.path.join(subdir_path, f"meeting_{session_number}_{meeting_number}.{file_extension}")
 
-    try:
-        # Send a GET request to the URL, stream=True allows handling large files efficiently
-        with requests.get(url, stream=True) as r:
-            r.raise_for_status() # Raise an exception for bad status codes (4xx or 5xx)
-
-            # Open the local file in write-binary mode and write the content in chunks
-            with open(file_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192): # 8 KB chunks
-                    if chunk: # Filter out keep-alive new chunks
-                        f.write(chunk)
-        session_counts[session_number] += 1
-    except requests.exceptions.RequestException as e:
-        print(f"Download failed: {e}")
+    source_hash = hash_params(url)
+    headers = {}
+    if os.path.exists(file_path):
+        if manifest is not None and manifest.get("fetch", file_path) is not None:
+            intact = manifest.is_fresh("fetch", file_path, source_hash, output_path=file_path)
+        else:
+            cached = http_cache.metadata(url)
+            intact = cached is not None and cached.get("content_length") == os.path.getsize(file_path)
+        if intact:
+            headers = http_cache.conditional_headers(url)
+            if not headers:
+                # Nothing to revalidate with: trust the intact local copy
+                count_download(session_number)
+                return
+
+    with metrics.timed(file_path, step='download') as record:
+        record['status'] = "failed"
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                sha256 = stream_pdf(url, file_path, headers, chunk_size)
+                break
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError, DownloadError) as e:
+                if attempt == MAX_RETRIES:
+                    print(f"Download failed: {e}")
+                    return
+                delay = retry_delay(None, attempt)
+                print(f"Download interrupted ({e}), resuming in {delay:.1f}s")
+                time.sleep(delay)
+            except requests.exceptions.RequestException as e:
+                print(f"Download failed: {e}")
+                return
+        record['status'] = "not modified" if sha256 is None else None
+        record['bytes_written'] = 0 if sha256 is None else os.path.getsize(file_path)
+
+    if sha256 is not None and manifest is not None:
+        manifest.record("fetch", file_path, source_hash, output_path=file_path, output_hash=sha256)
+        manifest.commit()
+    count_download(session_number)
 
 
 
 if __name__ == "__main__":
-    for dhlauth_id in dhlauth_ids:
-        results = fetch_meeting_records(dhlauth_id)
-        time.sleep(2)  # brief pause before downloading
-        if not results:
-            print("No results found for DHLAUTH ID: ", dhlauth_id)
-            continue
-        for result in results:
-            pdf_url = get_transcript_pdf_url(result)
-            if not pdf_url:
-                print("  Transcript PDF URL not found for Record ID: ", result.get("recid"))
+    parser = argparse.ArgumentParser(description="Download General Debate meeting record PDFs from the UN Digital Library.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help=f"Parallel requests (default: {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help=f"Average requests per second (default: {DEFAULT_RATE})")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST,
+                        help=f"Requests allowed back-to-back before rate limiting (default: {DEFAULT_BURST})")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                        help=f"Bytes per read when streaming PDFs (default: {DEFAULT_CHUNK_SIZE})")
+    parser.add_argument("--base-url", default=url,
+                        help="Digital Library base URL (e.g. a local stub server for testing)")
+    parser.add_argument("--metrics", nargs="?", const=METRICS_PATH, default=None, metavar="PATH",
+                        help=f"Record stage and per-PDF download timings as JSON lines (default path: {METRICS_PATH})")
+    args = parser.parse_args()
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    if args.rate <= 0:
+        parser.error("--rate must be positive")
+    if args.burst < 1:
+        parser.error("--burst must be at least 1")
+    if args.chunk_size < 1:
+        parser.error("--chunk-size must be at least 1")
+    url = args.base_url.rstrip("/")
+    configure_http(args.concurrency, args.rate, args.burst)
+    if args.metrics:
+        metrics = Instrumentation(args.metrics)
+
+    manifest = BuildManifest()
+    with metrics.stage('fetch'), ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        # Searches run in parallel; map yields their results in DHLAUTH ID order
+        search_results = executor.map(fetch_meeting_records, dhlauth_ids)
+        downloads = []
+        for dhlauth_id, results in zip(dhlauth_ids, search_results):
+            if not results:
+                print("No results found for DHLAUTH ID: ", dhlauth_id)
                 continue
-            print("  Downloading PDF for Record ID: ", result.get("recid"))
-            download_pdf(pdf_url)
-            time.sleep(2)  # brief pause between downloads
-        print("Completed DHLAUTH ID: ", dhlauth_id, "\n")
+            for result in results:
+                pdf_url = get_transcript_pdf_url(result)
+                if not pdf_url:
+                    print("  Transcript PDF URL not found for Record ID: ", result.get("recid"))
+                    continue
+                print("  Queued PDF for Record ID: ", result.get("recid"))
+                downloads.append(executor.submit(download_pdf, pdf_url, manifest=manifest, chunk_size=args.chunk_size))
+            print("Queued DHLAUTH ID: ", dhlauth_id, "\n")
+        for future in as_completed(downloads):
+            future.result()
+    manifest.close()
+    metrics.print_summary()
 
     try:
         with open("./session_counts.txt", "w", encoding="utf-8") as f: